@@ -0,0 +1,68 @@
+"""
+Measures the throughput of AspectAnnotator.annotate (reviews per second) for different numbers
+of worker processes and checks that the rows are the same as with a single process.
+Run from the project root with: python -m benchmarks.annotation_benchmark [--reviews N]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.keyword_matcher_benchmark import (
+    syntheticDictionary,
+    syntheticReviews,
+    syntheticVocabulary,
+)
+from src.utils.aspect_annotator import AspectAnnotator
+from src.utils.token_store import TokenStoreWriter
+
+
+def benchmark(path: str, keyWords: dict, workers: int, shardSize: int):
+    annotator = AspectAnnotator(
+        path, useIndex=False, workers=workers, shardSize=shardSize
+    )
+    # src/data/aspectDict.json takes precedence over the keyWords argument
+    annotator.keyWords = keyWords
+    annotator.loadCSV()
+    start = time.perf_counter()
+    annotator.annotate()
+    return time.perf_counter() - start, annotator.df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--keywords", type=int, default=300)
+    parser.add_argument("--shard-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = syntheticVocabulary(50000, rng)
+    keyWords = syntheticDictionary(args.keywords, vocabulary, rng)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = tmpdir + "/"
+        writer = TokenStoreWriter(path + "tokens/")
+        writer.addMany(syntheticReviews(args.reviews, vocabulary, rng))
+        writer.close()
+        pd.DataFrame({"review_text_raw": [""] * args.reviews}).to_csv(
+            path + "data_preprocessed.csv", index=False
+        )
+
+        cores = os.cpu_count()
+        workerCounts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+        print("%8s %10s %12s %8s" % ("workers", "seconds", "reviews/s", "speedup"))
+        baseline, expected = None, None
+        for workers in workerCounts:
+            seconds, df = benchmark(path, keyWords, workers, args.shard_size)
+            if expected is None:
+                baseline, expected = seconds, df
+            assert df.equals(expected), "rows differ"
+            print(
+                "%8d %9.2fs %12.0f %7.1fx"
+                % (workers, seconds, args.reviews / seconds, baseline / seconds)
+            )
@@ -0,0 +1,101 @@
+"""
+Compares the keyword loop of the AspectAnnotator with the Aho-Corasick KeywordMatcher for
+growing aspect dictionaries and checks that both find the same rows.
+Run from the project root with: python -m benchmarks.keyword_matcher_benchmark [--reviews N]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+
+from src.utils.keyword_matcher import KeywordMatcher
+
+LETTERS = "abcdefghijklmnoprstuvwzäöüß"
+
+
+def syntheticVocabulary(size: int, rng: random.Random) -> list[str]:
+    return [
+        "".join(rng.choice(LETTERS) for _ in range(rng.randint(2, 14)))
+        for _ in range(size)
+    ]
+
+
+def syntheticReviews(numReviews: int, vocabulary: list[str], rng: random.Random):
+    # skewed word frequencies, like real text
+    weights = list(
+        itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary)))
+    )
+    return [
+        [
+            rng.choices(vocabulary, cum_weights=weights, k=rng.randint(3, 20))
+            for _ in range(rng.randint(1, 8))
+        ]
+        for _ in range(numReviews)
+    ]
+
+
+def syntheticDictionary(
+    numKeywords: int, vocabulary: list[str], rng: random.Random
+) -> dict:
+    """
+    the aspect dictionary of the project plus parts of random words of the vocabulary
+    """
+    with open("src/data/aspectDict.json") as f:
+        keyWords = json.load(f)
+    aspects = list(keyWords)
+    for i in range(numKeywords - sum(len(i) for i in keyWords.values())):
+        word = rng.choice(vocabulary[: len(vocabulary) // 10])
+        start = rng.randint(0, max(0, len(word) - 4))
+        keyWords[aspects[i % len(aspects)]].append(word[start : start + 6])
+    return keyWords
+
+
+def findAspectsLoop(keyWords: dict, reviews: list) -> list:
+    rows = []
+    for tokens in reviews:
+        for aspect in keyWords:
+            compare = keyWords[aspect]
+            for i, sent in enumerate(tokens):
+                for j, word in enumerate(sent):
+                    for e in compare:
+                        if e in word.lower():
+                            rows.append((word, i, j, aspect))
+    return rows
+
+
+def findAspectsMatcher(keyWords: dict, reviews: list) -> list:
+    matcher = KeywordMatcher(keyWords)
+    rows = []
+    for tokens in reviews:
+        rows.extend(matcher.findAspects(tokens))
+    return rows
+
+
+def timeit(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--keywords", type=int, nargs="*", default=[18, 100, 300, 1000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = syntheticVocabulary(args.vocabulary, rng)
+    reviews = syntheticReviews(args.reviews, vocabulary, rng)
+    print("%8s %10s %10s %8s %8s" % ("keywords", "loop", "matcher", "speedup", "rows"))
+    for numKeywords in args.keywords:
+        keyWords = syntheticDictionary(numKeywords, vocabulary, rng)
+        before, expected = timeit(findAspectsLoop, keyWords, reviews)
+        after, rows = timeit(findAspectsMatcher, keyWords, reviews)
+        assert rows == expected, "rows differ"
+        print(
+            "%8d %9.2fs %9.2fs %7.1fx %8d"
+            % (numKeywords, before, after, before / after, len(rows))
+        )
@@ -0,0 +1,126 @@
+"""
+Compares lookups per second in the sentiment lexicon: probing the indexed DataFrame with .loc like
+the detector used to against the compiled SentimentLexicon, and checks that both give the same
+polarities and multipliers. Also measures loading the lexicon from the csv and from its cache.
+Uses src/data/sentiment_lexicon.csv if it exists, a synthetic lexicon otherwise.
+Run from the project root with: python -m benchmarks.lexicon_benchmark [--lookups N]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.keyword_matcher_benchmark import syntheticVocabulary
+from src.utils.sentiment_lexicon import SentimentLexicon
+
+QUALIFIERS = ["POS", "NEG", "NEU", "INT", "SHI"]
+
+
+def syntheticLexicon(size: int, rng: random.Random) -> pd.DataFrame:
+    words = syntheticVocabulary(size, rng)
+    # about a tenth of the words has several qualifiers, like in germanlex
+    words += rng.sample(words, size // 10)
+    return pd.DataFrame(
+        {
+            "word": words,
+            "qualifier": [rng.choice(QUALIFIERS) for _ in words],
+            "polarity_strength": [round(rng.random(), 2) for _ in words],
+        }
+    )
+
+
+def loadDataFrame(filename: str) -> pd.DataFrame:
+    df = pd.read_csv(filename)
+    df.drop_duplicates(subset=["word", "qualifier"], inplace=True)
+    df.set_index("word", inplace=True)
+    return df
+
+
+def lookupDataFrame(df: pd.DataFrame, word: str) -> tuple:
+    """
+    polarity and multiplier of a word the way the detector resolved them with .loc
+    """
+    try:
+        lexEntry = df.loc[word]
+    except KeyError:
+        return None
+
+    if isinstance(lexEntry["qualifier"], str):
+        polarity = lexEntry["polarity_strength"]
+        if lexEntry["qualifier"] == "NEG":
+            polarity = -polarity
+        multiplier = None
+        if lexEntry["qualifier"] == "INT":
+            multiplier = lexEntry["polarity_strength"]
+        elif lexEntry["qualifier"] == "SHI":
+            multiplier = -1
+        return polarity, multiplier
+
+    polarity, multiplier = 0, None
+    strengths = lexEntry["polarity_strength"].values
+    for i, qualifier in enumerate(lexEntry["qualifier"].values):
+        if qualifier in ["POS", "NEG"]:
+            polarity = -strengths[i] if qualifier == "NEG" else strengths[i]
+            break
+    for i, qualifier in enumerate(lexEntry["qualifier"].values):
+        if qualifier in ["INT", "SHI"]:
+            multiplier = strengths[i] if qualifier == "INT" else -1
+            break
+    return polarity, multiplier
+
+
+def lookupCompiled(lexicon: SentimentLexicon, word: str) -> tuple:
+    lexEntry = lexicon.get(word)
+    if lexEntry is None:
+        return None
+    return lexEntry.polarity, lexEntry.multiplier
+
+
+def timeit(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--size", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = "src/data/sentiment_lexicon.csv"
+        if not os.path.exists(filename):
+            filename = os.path.join(tmpdir, "sentiment_lexicon.csv")
+            syntheticLexicon(args.size, rng).to_csv(filename, index=False)
+        cacheFilename = os.path.join(tmpdir, "sentiment_lexicon.compiled.json")
+
+        seconds, df = timeit(loadDataFrame, filename)
+        print("%-28s %8.1fms" % ("load csv into DataFrame", 1000 * seconds))
+        seconds, lexicon = timeit(SentimentLexicon.load, filename, cacheFilename)
+        print("%-28s %8.1fms" % ("compile and cache", 1000 * seconds))
+        seconds, lexicon = timeit(SentimentLexicon.load, filename, cacheFilename)
+        print("%-28s %8.1fms" % ("load compiled cache", 1000 * seconds))
+
+        # half hits, half misses like the lowercase and lemma fallbacks of the detector
+        known = [word for word in df.index.unique() if isinstance(word, str)]
+        words = [
+            rng.choice(known) if rng.random() < 0.5 else rng.choice(known) + "x"
+            for _ in range(args.lookups)
+        ]
+
+        results = {}
+        for name, lookup, table in [
+            ("DataFrame.loc", lookupDataFrame, df),
+            ("SentimentLexicon", lookupCompiled, lexicon),
+        ]:
+            start = time.perf_counter()
+            results[name] = [lookup(table, word) for word in words]
+            seconds = time.perf_counter() - start
+            print("%-28s %12.0f lookups/s" % (name, len(words) / seconds))
+        assert results["DataFrame.loc"] == results["SentimentLexicon"], "results differ"
@@ -0,0 +1,77 @@
+"""
+Compares the separate normalization passes of the Preprocessor with the compiled Normalizer
+and checks that both produce the same text.
+Run from the project root with: python -m benchmarks.normalization_benchmark [--reviews N]
+"""
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from src.utils.preprocessing import Preprocessor
+
+PHRASES = [
+    "Von Hamstergaming  (2): ",
+    "Die Grafik ist schön, der Sound – naja?!",
+    "Atmosphäre & Steuerung: großartig; Spaß pur.\n",
+    "Ist diese Meinung hilfreich?",
+    " 12 von 15 Lesern fanden diese Meinung hilfreich. Ist sie hilfreich?",
+    "ÜBER 9000 Stunden gespielt :-)\r\n",
+]
+
+
+def syntheticReviews(numReviews: int) -> pd.Series:
+    rng = random.Random(0)
+    return pd.Series(
+        [
+            "".join(rng.choice(PHRASES) for _ in range(rng.randint(3, 12)))
+            for _ in range(numReviews)
+        ]
+    )
+
+
+def createPreprocessor(texts: pd.Series, **flags) -> Preprocessor:
+    preprocessor = Preprocessor(**flags)
+    preprocessor.data = pd.DataFrame({preprocessor.normalizeColumn: texts})
+    return preprocessor
+
+
+def separatePasses(preprocessor: Preprocessor) -> None:
+    if preprocessor.rmdefault:
+        preprocessor.removeDefaultStrings()
+    if preprocessor.substituespecial:
+        preprocessor.substitueSpecial()
+    if preprocessor.rmnonalphanumeric:
+        preprocessor.rmNonAlphaNumeric()
+    if preprocessor.lower:
+        preprocessor.removeCapitalization()
+
+
+def timeit(function, preprocessor: Preprocessor):
+    start = time.perf_counter()
+    function(preprocessor)
+    return time.perf_counter() - start, preprocessor.data[preprocessor.normalizeColumn]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=100000)
+    args = parser.parse_args()
+
+    texts = syntheticReviews(args.reviews)
+    configurations = [
+        {},
+        {"substituespecial": True},
+        {"lower": False, "rmnonalphanumeric": False},
+        {"rmdefault": False, "substituespecial": True},
+    ]
+    print("%-60s %10s %10s %8s" % ("flags", "passes", "compiled", "speedup"))
+    for flags in configurations:
+        before, expected = timeit(separatePasses, createPreprocessor(texts, **flags))
+        after, result = timeit(
+            Preprocessor.normalize, createPreprocessor(texts, **flags)
+        )
+        assert result.tolist() == expected.tolist(), "normalized texts differ"
+        print("%-60s %9.2fs %9.2fs %7.1fx" % (flags, before, after, before / after))
@@ -0,0 +1,186 @@
+"""
+p50 and p99 latency of analyzing single reviews with the OnlineAnalyzer, in process and through the
+local HTTP service, after the models are loaded and warmed up.
+The reviews are synthetic sentences around the project aspects. Without the spacy model or the
+nltk sentence splitter a blank pipeline and a split at full stops are used, without
+sentiment_lexicon.csv in --path a small lexicon is written to a temporary directory. The blank
+pipeline doesn't parse, so its numbers are a lower bound of the model latency.
+Run from the project root with: python -m benchmarks.online_benchmark [--reviews N]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+
+import nltk
+import numpy as np
+import pandas as pd
+import spacy
+
+# the analyzer imports its helpers like main.py, relative to src/
+sys.path.insert(0, "src")
+
+from src.online_analysis import AnalysisServer, OnlineAnalyzer  # noqa: E402
+from src.sentiment_detection import SentimentDetector  # noqa: E402
+from src.utils.normalizer import Normalizer  # noqa: E402
+
+DESCRIPTORS = ["gute", "schlechte", "schöne", "tolle", "langweilige", "super"]
+INTENSIFIERS = ["sehr", "kaum", "nicht", "extrem", ""]
+FILLERS = ["Das Spiel macht Spaß.", "Ich habe es lange gespielt.", "Der Preis ist ok."]
+
+
+def syntheticReviews(numReviews: int, rng: random.Random) -> list[str]:
+    with open("src/data/aspectDict.json") as f:
+        keyWords = [word for words in json.load(f).values() for word in words]
+    reviews = []
+    for _ in range(numReviews):
+        sentences = []
+        for _ in range(rng.randint(1, 6)):
+            if rng.random() < 0.5:
+                sentences.append(rng.choice(FILLERS))
+                continue
+            sentences.append(
+                "Die %s %s %s ist da."
+                % (
+                    rng.choice(INTENSIFIERS),
+                    rng.choice(DESCRIPTORS),
+                    rng.choice(keyWords).capitalize(),
+                )
+            )
+        reviews.append(" ".join(sentences))
+    return reviews
+
+
+class BlankPreprocessor:
+    def __init__(self):
+        self.normalizer = None
+
+    def compileNormalizer(self) -> Normalizer:
+        self.normalizer = Normalizer(lower=False, rmnonalphanumeric=False)
+        return self.normalizer
+
+
+class BlankDetector(SentimentDetector):
+    def loadSpacyModel(self, model="de_core_news_lg", disableList=[]) -> bool:
+        self.modelName = model
+        self.nlp = spacy.blank("de")
+        return True
+
+
+class BlankAnalyzer(OnlineAnalyzer):
+    """
+    OnlineAnalyzer without the model and nltk data
+    """
+
+    def loadPreprocessor(self):
+        return BlankPreprocessor()
+
+    def loadDetector(self) -> SentimentDetector:
+        return BlankDetector(self.path, useDocStore=False)
+
+    def splitSentences(self, text: str) -> list[str]:
+        return [sentence for sentence in text.split(". ") if sentence]
+
+
+def writeLexicon(path: str) -> None:
+    pd.DataFrame(
+        {
+            "word": ["%%"] + DESCRIPTORS + ["sehr", "kaum", "nicht", "extrem"],
+            "qualifier": [""]
+            + ["POS", "NEG", "POS", "POS", "NEG", "POS"]
+            + ["INT", "SHI", "SHI", "INT"],
+            "polarity_strength": [0, 0.5, 0.7, 0.9, 0.8, 0.6, 1, 2, 0, 0, 3],
+        }
+    ).to_csv(path + "sentiment_lexicon.csv", index=False)
+
+
+def percentiles(seconds: list) -> tuple:
+    milliseconds = 1000 * np.array(seconds)
+    return np.percentile(milliseconds, 50), np.percentile(milliseconds, 99)
+
+
+def measureInProcess(analyzer: OnlineAnalyzer, reviews: list[str]) -> list:
+    seconds = []
+    for review in reviews:
+        start = time.perf_counter()
+        analyzer.analyze(review)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def measureHttp(url: str, reviews: list[str]) -> list:
+    seconds = []
+    for review in reviews:
+        request = urllib.request.Request(
+            url + "/analyze",
+            data=json.dumps({"text": review}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        start = time.perf_counter()
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default="src/data/")
+    parser.add_argument("--model", default="de_core_news_lg")
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    args = parser.parse_args()
+
+    try:
+        nltk.data.find("tokenizers/punkt")
+        hasPunkt = True
+    except LookupError:
+        hasPunkt = False
+    blank = not spacy.util.is_package(args.model) or not hasPunkt
+
+    tmpdir = tempfile.mkdtemp()
+    path = args.path
+    if not os.path.exists(path + "sentiment_lexicon.csv"):
+        path = tmpdir + "/"
+        writeLexicon(path)
+        print("Using a synthetic lexicon")
+
+    start = time.perf_counter()
+    analyzer = (BlankAnalyzer if blank else OnlineAnalyzer)(path, args.model)
+    if not analyzer.load():
+        raise SystemExit("Unable to load the analyzer")
+    print(
+        "Loaded %s in %.2fs"
+        % ("a blank pipeline" if blank else args.model, time.perf_counter() - start)
+    )
+
+    rng = random.Random(0)
+    warmup = syntheticReviews(args.warmup, rng)
+    reviews = syntheticReviews(args.reviews, rng)
+    measureInProcess(analyzer, warmup)
+
+    server = AnalysisServer(analyzer)
+    url = server.start()
+    try:
+        measureHttp(url, warmup)
+        results = [
+            ("in process", measureInProcess(analyzer, reviews)),
+            ("http", measureHttp(url, reviews)),
+        ]
+    finally:
+        server.stop()
+        shutil.rmtree(tmpdir)
+
+    print("%d single reviews of 1 to 6 sentences" % len(reviews))
+    print("%-12s %10s %10s %12s" % ("", "p50 [ms]", "p99 [ms]", "reviews/s"))
+    for name, seconds in results:
+        p50, p99 = percentiles(seconds)
+        print(
+            "%-12s %10.2f %10.2f %12.0f" % (name, p50, p99, len(seconds) / sum(seconds))
+        )
@@ -0,0 +1,147 @@
+"""
+Measures how often the sentiment detector parses a sentence with and without its ParseCache, and
+the batched parsing of all distinct sentences with nlp.pipe.
+With --path the aspect rows and tokens of a previous run are used (e.g. src/data/), otherwise the
+project dictionary is annotated on a synthetic corpus. Without the spacy model the sentences are
+parsed by a blank pipeline, the number of parses then matters more than the seconds.
+Run from the project root with: python -m benchmarks.parse_cache_benchmark [--path src/data/]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import spacy
+
+from benchmarks.keyword_matcher_benchmark import syntheticReviews, syntheticVocabulary
+from src.utils.aspect_annotator import AspectAnnotator
+from src.utils.token_store import TokenStore, TokenStoreWriter
+
+# the detector imports its helpers like main.py, relative to src/
+sys.path.insert(0, "src")
+
+from src.sentiment_detection import SentimentDetector  # noqa: E402
+
+
+def loadRows(path: str):
+    """
+    aspect rows and tokens of the detector in path
+    """
+    rows = pd.read_csv(path + "data_aspects_tokens.csv")
+    rows = rows[["reviewnumber", "word_found", "sent_idx", "word_idx", "aspect"]]
+    preprocessed = pd.read_csv(path + "data_preprocessed.csv")
+    tokenStore = None
+    if "tokens" in preprocessed.columns:
+        preprocessed["tokens"] = preprocessed["tokens"].apply(json.loads)
+    else:
+        tokenStore = TokenStore(path + "tokens/")
+        tokenStore.load()
+    return rows, preprocessed, tokenStore
+
+
+def syntheticRows(path: str, numReviews: int):
+    rng = random.Random(0)
+    with open("src/data/aspectDict.json") as f:
+        keyWords = json.load(f)
+    # the aspect words among the frequent words, several aspects per sentence are common
+    vocabulary = syntheticVocabulary(50, rng)
+    vocabulary += [word for words in keyWords.values() for word in words]
+    vocabulary += syntheticVocabulary(20000, rng)
+
+    writer = TokenStoreWriter(path + "tokens/")
+    writer.addMany(syntheticReviews(numReviews, vocabulary, rng))
+    writer.close()
+    pd.DataFrame({"review_text_raw": [""] * numReviews}).to_csv(
+        path + "data_preprocessed.csv", index=False
+    )
+    annotator = AspectAnnotator(path, useIndex=False)
+    annotator.keyWords = keyWords
+    annotator.loadCSV()
+    annotator.annotate()
+    annotator.saveCSV()
+    return loadRows(path)
+
+
+def benchmark(nlp, rows, preprocessed, tokenStore, parseCacheTokens: int):
+    detector = SentimentDetector(useDocStore=False, parseCacheTokens=parseCacheTokens)
+    detector.nlp = nlp
+    detector.df_preprocessed = preprocessed
+    detector.tokenStore = tokenStore
+    start = time.perf_counter()
+    for reviewnumber, sent_idx in zip(rows["reviewnumber"], rows["sent_idx"]):
+        detector.getSentenceDoc(reviewnumber, sent_idx)
+    return time.perf_counter() - start, detector.parseCache
+
+
+def benchmarkBatched(nlp, rows, preprocessed, tokenStore, batchSize, nProcess):
+    detector = SentimentDetector(
+        useDocStore=False, batchSize=batchSize, nProcess=nProcess
+    )
+    detector.nlp = nlp
+    detector.df_preprocessed = preprocessed
+    detector.tokenStore = tokenStore
+    start = time.perf_counter()
+    keys = zip(rows["reviewnumber"].tolist(), rows["sent_idx"].tolist())
+    detector.parsedDocs = detector.parseSentences(keys)
+    for reviewnumber, sent_idx in zip(rows["reviewnumber"], rows["sent_idx"]):
+        detector.getSentenceDoc(reviewnumber, sent_idx)
+    return time.perf_counter() - start, len(detector.parsedDocs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=None, help="directory of a previous run")
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--model", default="de_core_news_lg")
+    parser.add_argument("--cache-tokens", type=int, nargs="*", default=[1000, 100000])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--processes", type=int, nargs="*", default=[1, 2])
+    args = parser.parse_args()
+
+    try:
+        nlp = spacy.load(args.model, disable=["ner", "textcat"])
+    except OSError:
+        print("%s not found, parsing with a blank pipeline" % args.model)
+        nlp = spacy.blank("de")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if args.path is None:
+            rows, preprocessed, tokenStore = syntheticRows(tmpdir + "/", args.reviews)
+        else:
+            rows, preprocessed, tokenStore = loadRows(args.path)
+        distinct = len(rows.drop_duplicates(["reviewnumber", "sent_idx"]))
+        print("%d aspect rows in %d distinct sentences" % (len(rows), distinct))
+
+        print(
+            "%12s %10s %10s %8s %8s"
+            % ("cache tokens", "parses", "seconds", "hits", "speedup")
+        )
+        # warms up the vocabulary of the pipeline and the memory mapped tokens
+        benchmark(nlp, rows, preprocessed, tokenStore, 0)
+        baseline = None
+        for cacheTokens in [0] + args.cache_tokens:
+            seconds, cache = benchmark(nlp, rows, preprocessed, tokenStore, cacheTokens)
+            if baseline is None:
+                baseline = seconds
+            print(
+                "%12d %10d %9.2fs %7.1f%% %7.1fx"
+                % (
+                    cacheTokens,
+                    cache.misses,
+                    seconds,
+                    100 * cache.hitRate(),
+                    baseline / seconds,
+                )
+            )
+        for nProcess in args.processes:
+            seconds, parses = benchmarkBatched(
+                nlp, rows, preprocessed, tokenStore, args.batch_size, nProcess
+            )
+            print(
+                "%12s %10d %9.2fs %8s %7.1fx"
+                % ("pipe x%d" % nProcess, parses, seconds, "-", baseline / seconds)
+            )
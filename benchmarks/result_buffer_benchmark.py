@@ -0,0 +1,101 @@
+"""
+Memory and time of collecting the results of the sentiment detector for a million aspect rows:
+python lists in every cell of the frame, filled through chained indexing and written with
+json.dumps like the detector used to, against the RaggedBuffer of the detector. Both produce the
+same csv columns, which is checked.
+Run from the project root with: python -m benchmarks.result_buffer_benchmark [--rows N]
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.utils.record_buffer import RaggedBuffer
+
+WORDS = ["gut", "schön", "schlecht", "toll", "langweilig", "super"]
+INTENSIFIERS = ["sehr", "kaum", "nicht"]
+
+
+def syntheticResults(numRows: int, rng: random.Random) -> list:
+    """
+    (row, descriptor, polarity, intensifiers) for the rows with a descriptor, about a third
+    """
+    results = []
+    for row in range(numRows):
+        if rng.random() < 0.3:
+            intensifiers = [rng.choice(INTENSIFIERS)] if rng.random() < 0.2 else []
+            results.append((row, rng.choice(WORDS), rng.random(), intensifiers))
+    return results
+
+
+def listCells(numRows: int, results: list) -> pd.DataFrame:
+    df = pd.DataFrame({"reviewnumber": range(numRows)})
+    for column in ["polarity_strength", "sentiment_words", "intensifier_words"]:
+        df[column] = [[] for _ in range(numRows)]
+    polarities = df["polarity_strength"]
+    words = df["sentiment_words"]
+    intensifierWords = df["intensifier_words"]
+    for row, word, polarity, intensifiers in results:
+        for intensifier in intensifiers:
+            intensifierWords[row].append(intensifier)
+        polarities[row].append(polarity)
+        words[row].append(word)
+    df["sentiment_words"] = df["sentiment_words"].apply(lambda x: json.dumps(x))
+    return df
+
+
+def raggedBuffer(numRows: int, results: list) -> pd.DataFrame:
+    df = pd.DataFrame({"reviewnumber": range(numRows)})
+    columns = {
+        "polarity_strength": str,
+        "sentiment_words": json.dumps,
+        "intensifier_words": str,
+    }
+    buffer = RaggedBuffer(numRows, list(columns))
+    for row, word, polarity, intensifiers in results:
+        for intensifier in intensifiers:
+            buffer.add("intensifier_words", row, intensifier)
+        buffer.add("polarity_strength", row, polarity)
+        buffer.add("sentiment_words", row, word)
+    for column, formatter in columns.items():
+        df[column] = buffer.formatColumn(column, formatter)
+    return df
+
+
+def measure(function, *args) -> tuple:
+    """
+    seconds, peak and retained MB of the python allocations of a call
+    """
+    start = time.perf_counter()
+    function(*args)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = function(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20, current / 2**20, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    results = syntheticResults(args.rows, random.Random(0))
+    print("%d aspect rows, %d with a descriptor" % (args.rows, len(results)))
+    print("%-16s %10s %12s %14s" % ("", "seconds", "peak [MB]", "retained [MB]"))
+    frames = {}
+    for name, function in [("list cells", listCells), ("RaggedBuffer", raggedBuffer)]:
+        seconds, peak, retained, frames[name] = measure(function, args.rows, results)
+        print("%-16s %9.2fs %12.1f %14.1f" % (name, seconds, peak, retained))
+
+    # the csv columns as saveCSV writes them
+    expected, df = frames["list cells"], frames["RaggedBuffer"]
+    for column in ["polarity_strength", "intensifier_words"]:
+        expected[column] = expected[column].astype(str)
+    assert expected.equals(df), "results differ"
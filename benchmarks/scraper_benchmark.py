@@ -0,0 +1,135 @@
+"""
+Measures the throughput of the WebScraper against a local ReplayServer for different numbers
+of workers, so no internet connection is needed.
+Run from the project root with: python -m benchmarks.scraper_benchmark [--cache DIR --urls FILE]
+Without --cache the server replays generated games.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as NP
+
+from benchmarks.scraper_parse_benchmark import syntheticPage
+from src.utils.http_cache import ResponseCache
+from src.utils.replay_server import ReplayServer
+from src.utils.scheduler import RequestScheduler
+from src.utils.web_scraper import WebScraper
+
+
+def recordSyntheticGames(
+    cache: ResponseCache, numGames: int, numReviews: int
+) -> list[str]:
+    """
+    store the game pages and opinion pages of generated games in the cache
+
+    Args:
+        cache (ResponseCache): cache to record to
+        numGames (int): number of games
+        numReviews (int): number of reviews per game
+
+    Returns:
+        list[str]: urls of the games
+    """
+    scraper = WebScraper([])
+    urls = []
+    for game in range(numGames):
+        url = "https://www.spieletipps.de/game/benchmark-%d/" % game
+        html = (
+            '<div class="stiContents stiNoDeco stiOptionsLoadMore mb-3" '
+            'data-gameid="%d"></div>' % game
+        )
+        cache.store(url, None, html.encode("utf-8"))
+
+        contentUrl = "https://www.spieletipps.de/gameopinion/opinion-xhr/"
+        for offset, limit in [(0, 1)] + [
+            (offset, scraper.pageSize) for offset in scraper.getOffsets(numReviews)
+        ]:
+            size = max(0, min(limit, numReviews - offset))
+            page = syntheticPage(game * numReviews + offset, size)
+            page["response"]["data"]["more"] = numReviews
+            cache.store(
+                contentUrl,
+                {"id": str(game), "offset": offset, "limit": limit},
+                json.dumps(page).encode("utf-8"),
+                content_type="application/json",
+            )
+        urls.append(url)
+    return urls
+
+
+def benchmark(urls: list[str], baseUrl: str, workers: int, rate: float = None):
+    """
+    scrape all urls from the server
+
+    Args:
+        urls (list[str]): urls of the games
+        baseUrl (str): url of the ReplayServer
+        workers (int): maximum number of requests in flight
+        rate (float, optional): requests per second, None for no limit. Defaults to None.
+
+    Returns:
+        tuple[float, WebScraper]: seconds needed and the scraper holding the data
+    """
+    scheduler = RequestScheduler(
+        rate=rate, backoffBase=0.05, initialConcurrency=workers, maxConcurrency=workers
+    )
+    scraper = WebScraper(urls, maxWorkers=workers, baseUrl=baseUrl, scheduler=scheduler)
+    start = time.perf_counter()
+    scraper.startScraping(concurrent=workers > 1)
+    return time.perf_counter() - start, scraper
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cache", help="directory of recorded responses")
+    parser.add_argument("--urls", default="src/utils/urls.txt")
+    parser.add_argument("--games", type=int, default=8)
+    parser.add_argument("--reviews", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, help="requests per second")
+    parser.add_argument("--workers", default="1,2,4,8,16")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.cache:
+        cache = ResponseCache(args.cache, mode="replay")
+        urls = NP.loadtxt(args.urls, dtype=str, comments="!")
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        cache = ResponseCache(tmpdir.name, mode="replay")
+        urls = recordSyntheticGames(cache, args.games, args.reviews)
+
+    server = ReplayServer(cache, delay=args.delay, errorRate=args.error_rate)
+    baseUrl = server.start()
+
+    reference = None
+    print(
+        "%8s %10s %12s %12s %8s"
+        % ("workers", "seconds", "requests/s", "reviews/s", "retries")
+    )
+    for workers in [int(i) for i in args.workers.split(",")]:
+        seconds, scraper = benchmark(urls, baseUrl, workers, args.rate)
+        data = scraper.data
+        if reference is None:
+            reference = data
+        assert data.equals(reference), "concurrent scraping changed the data"
+
+        stats = scraper.scheduler.stats
+        print(
+            "%8d %10.3f %12.1f %12.1f %8d"
+            % (
+                workers,
+                seconds,
+                stats["requests"] / seconds,
+                len(data) / seconds,
+                stats["retries"],
+            )
+        )
+
+    server.stop()
+    if tmpdir is not None:
+        tmpdir.cleanup()
@@ -0,0 +1,64 @@
+"""
+Measures how the cost of WebScraper.parseResponse grows with the number of scraped reviews.
+Run from the project root with: python -m benchmarks.scraper_parse_benchmark
+"""
+
+import time
+
+from src.utils.web_scraper import WebScraper
+
+
+def syntheticPage(start: int, size: int = 10) -> dict:
+    """
+    create a response of the opinion api with generated reviews
+
+    Args:
+        start (int): number of the first review
+        size (int, optional): number of reviews on the page. Defaults to 10.
+
+    Returns:
+        dict: response in the format returned by WebScraper.getResponse
+    """
+    reviews = [
+        {
+            "id": i,
+            "game": "Benchmark Game",
+            "content": "Die Grafik ist sehr schön.<br />Der Sound &quot;passt&quot;.\r\n"
+            * 5,
+            "ratingDetail": {
+                "score_graphics": i % 6,
+                "score_sound": (i + 1) % 6,
+                "score_gameplay": (i + 2) % 6,
+                "score_atmosphere": (i + 3) % 6,
+            },
+        }
+        for i in range(start, start + size)
+    ]
+    return {"response": {"data": {"more": size, "data": reviews}}}
+
+
+def benchmark(numReviews: int) -> float:
+    """
+    parse numReviews reviews in pages of 10 and build the DataFrame
+
+    Args:
+        numReviews (int): number of reviews
+
+    Returns:
+        float: seconds needed
+    """
+    pages = [syntheticPage(start) for start in range(0, numReviews, 10)]
+    scraper = WebScraper([])
+
+    start = time.perf_counter()
+    for page in pages:
+        scraper.parseResponse(page)
+    assert len(scraper.data) == numReviews
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print("%10s %10s %14s" % ("reviews", "seconds", "µs per review"))
+    for numReviews in [1000, 10000, 50000, 100000, 200000, 400000]:
+        seconds = benchmark(numReviews)
+        print("%10d %10.3f %14.2f" % (numReviews, seconds, seconds / numReviews * 1e6))
@@ -0,0 +1,185 @@
+"""
+Measures the cold start of every stage of src/main.py: the time to import the modules of the
+stage and every load step of it (spacy models, GermaLemma, the compiled lexicon, the first fit of
+the evaluation), each stage in a fresh interpreter. With --check the medians are compared to
+benchmarks/startup_budget.json and the script fails if a step got slower than its budget or a
+budgeted step couldn't run (e.g. because its model is missing).
+Run from the project root with: python -m benchmarks.startup_benchmark [--check] [--update]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+
+# modules imported by the stage and the load steps run after the import
+STAGES = {
+    "main": (["main"], {}),
+    "scraping": (["utils.web_scraper"], {}),
+    "processing": (
+        ["utils.preprocessing"],
+        {"model": "loadSpacyModel('de_core_news_sm', ['tagger', 'parser', 'ner'])"},
+    ),
+    "annotation": (["utils.aspect_annotator"], {}),
+    "sentimentanalysis": (
+        ["sentiment_detection"],
+        {
+            "model": "loadSpacyModel('de_core_news_lg', ['ner', 'textcat'])",
+            "lemmatizer": "__import__('germalemma').GermaLemma()",
+            # from the compiled cache, like every run after the first
+            "lexicon": "from utils.sentiment_lexicon import SentimentLexicon; "
+            "SentimentLexicon.load(lexiconPath(), "
+            "'src/data/sentiment_lexicon.compiled.json')",
+        },
+    ),
+    "evaluation": (
+        ["utils.train"],
+        {
+            "fit": "import numpy as np; "
+            "from sklearn.linear_model import LogisticRegression; "
+            "LogisticRegression().fit(np.random.rand(300, 4), np.arange(300) % 3)",
+        },
+    ),
+}
+
+CHILD = """
+import importlib, json, sys, time
+sys.path.insert(0, "src")
+modules, loads, resourceDir = json.loads(sys.argv[1])
+result = {"errors": {}}
+
+if resourceDir is not None:
+    from utils.resources import ResourceManager
+    resources = ResourceManager(resourceDir)
+    loadSpacyModel = resources.loadSpacyModel
+    lexiconPath = resources.lexiconPath
+else:
+    def loadSpacyModel(model, disable):
+        import spacy
+        return spacy.load(model, disable=disable)
+    def lexiconPath():
+        return "src/data/sentiment_lexicon.csv"
+
+steps = [("import", lambda: [importlib.import_module(m) for m in modules])]
+steps += [(name, lambda code=code: exec(code)) for name, code in loads.items()]
+for name, step in steps:
+    try:
+        start = time.perf_counter()
+        step()
+        result[name] = time.perf_counter() - start
+    except Exception as e:
+        result["errors"][name] = "%s: %s" % (type(e).__name__, e)
+        if name == "import":
+            break
+print(json.dumps(result))
+"""
+
+
+def measureStage(stage: str, resourceDir: str = None) -> dict:
+    """
+    import the modules of a stage and run its load steps in a new interpreter
+
+    Returns:
+        dict: seconds of "import" and every load step, "errors" of the steps that failed
+    """
+    modules, loads = STAGES[stage]
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps([modules, loads, resourceDir])],
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark(stages: list[str], repeat: int, resourceDir: str = None) -> dict:
+    """
+    Returns:
+        dict: by stage the median seconds of every step that ran each time and the "errors"
+    """
+    results = {}
+    for stage in stages:
+        runs = [measureStage(stage, resourceDir) for _ in range(repeat)]
+        steps = ["import"] + list(STAGES[stage][1])
+        results[stage] = {
+            step: statistics.median(run[step] for run in runs)
+            for step in steps
+            if all(step in run for run in runs)
+        }
+        results[stage]["errors"] = {}
+        for run in runs:
+            for step, error in run["errors"].items():
+                results[stage]["errors"].setdefault(step, error)
+    return results
+
+
+def checkBudget(results: dict, budget: dict) -> list[str]:
+    exceeded = []
+    for stage, seconds in results.items():
+        for step, limit in budget.get(stage, {}).items():
+            if step not in seconds:
+                error = seconds["errors"].get(step, "not measured")
+                exceeded.append("%s %s: %s" % (stage, step, error))
+            elif seconds[step] > limit:
+                exceeded.append(
+                    "%s %s: %.3fs > %.3fs" % (stage, step, seconds[step], limit)
+                )
+    return exceeded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stages", nargs="*", default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--resources", default=None, help="ResourceManager directory")
+    parser.add_argument("--check", action="store_true", help="fail above the budget")
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="write the results plus 50%% to the budget",
+    )
+    args = parser.parse_args()
+
+    results = benchmark(args.stages, args.repeat, args.resources)
+
+    budget = {}
+    if os.path.exists(BUDGET):
+        with open(BUDGET) as f:
+            budget = json.load(f)
+
+    print("%-18s %-11s %10s %10s" % ("stage", "step", "seconds", "budget"))
+    for stage, seconds in results.items():
+        steps = ["import"] + list(STAGES[stage][1])
+        for step in steps:
+            limit = budget.get(stage, {}).get(step)
+            print(
+                "%-18s %-11s %10s %10s %s"
+                % (
+                    stage,
+                    step,
+                    "%.3f" % seconds[step] if step in seconds else "-",
+                    "%.3f" % limit if limit is not None else "-",
+                    seconds["errors"].get(step, ""),
+                )
+            )
+
+    if args.update:
+        # at least 50ms, very short steps are dominated by noise
+        for stage, seconds in results.items():
+            for step, value in seconds.items():
+                if step != "errors":
+                    budget.setdefault(stage, {})[step] = max(
+                        round(value * 1.5, 3), 0.05
+                    )
+        with open(BUDGET, "w") as f:
+            json.dump(budget, f, indent=4, sort_keys=True)
+            f.write("\n")
+
+    if args.check:
+        exceeded = checkBudget(results, budget)
+        for line in exceeded:
+            print("failed:", line)
+        sys.exit(1 if exceeded else 0)
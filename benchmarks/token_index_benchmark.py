@@ -0,0 +1,76 @@
+"""
+Compares annotating a synthetic corpus by scanning every token with the KeywordMatcher against a
+lookup in the TokenIndex, and measures the latency of ad-hoc queries on the index.
+Run from the project root with: python -m benchmarks.token_index_benchmark [--reviews N]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from benchmarks.keyword_matcher_benchmark import (
+    syntheticDictionary,
+    syntheticReviews,
+    syntheticVocabulary,
+)
+from src.utils.keyword_matcher import KeywordMatcher
+from src.utils.token_index import TokenIndex
+from src.utils.token_store import TokenStore, TokenStoreWriter
+
+QUERIES = ["steuerung*", "*grafik*", "sound", "*ung"]
+
+
+def scan(store: TokenStore, keyWords: dict) -> list:
+    matcher = KeywordMatcher(keyWords)
+    rows = []
+    for reviewnumber, tokens in enumerate(store.iterReviews()):
+        rows.extend((reviewnumber,) + row for row in matcher.findAspects(tokens))
+    return rows
+
+
+def timeit(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--vocabulary", type=int, default=100000)
+    parser.add_argument("--keywords", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = syntheticVocabulary(args.vocabulary, rng)
+    with open("src/data/aspectDict.json") as f:
+        vocabulary += [word for words in json.load(f).values() for word in words]
+    keyWords = syntheticDictionary(args.keywords, vocabulary, rng)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = TokenStoreWriter(tmpdir + "/tokens/")
+        writer.addMany(syntheticReviews(args.reviews, vocabulary, rng))
+        writer.close()
+        store = TokenStore(tmpdir + "/tokens/")
+        store.load()
+        print("%d reviews, %d tokens" % (len(store), store.meta["tokens"]))
+
+        seconds, index = timeit(TokenIndex.build, store, tmpdir + "/token_index/")
+        print("%-24s %9.3fs" % ("build index", seconds))
+        seconds, _ = timeit(TokenIndex(tmpdir + "/token_index/").load, store)
+        print("%-24s %9.3fs" % ("load index", seconds))
+
+        before, expected = timeit(scan, store, keyWords)
+        after, rows = timeit(index.annotate, keyWords)
+        assert list(rows.itertuples(index=False, name=None)) == expected
+        print("%-24s %9.3fs" % ("annotate by scan", before))
+        print("%-24s %9.3fs %7.1fx" % ("annotate by index", after, before / after))
+
+        for query in QUERIES:
+            seconds, result = timeit(index.query, query)
+            print(
+                "%-24s %8.1fms %8d positions"
+                % ("query " + query, seconds * 1000, len(result))
+            )
@@ -0,0 +1,92 @@
+"""
+Measures the throughput of Preprocessor.tokenizeSentences (sentences per second) for different
+numbers of worker processes and checks that the tokens are the same as with a single process.
+Run from the project root with: python -m benchmarks.tokenize_benchmark [--sentences N]
+"""
+
+import argparse
+import os
+import random
+import time
+
+import pandas as pd
+import spacy
+
+from src.utils.preprocessing import Preprocessor
+
+WORDS = (
+    "die grafik ist sehr schön und der sound passt perfekt zur düsteren atmosphäre , "
+    "aber die steuerung wirkt auf dem pc etwas hakelig . leider ist die story kurz !"
+).split()
+
+
+def syntheticReviews(numSentences: int, sentencesPerReview: int = 5) -> pd.DataFrame:
+    """
+    create reviews that are already split into sentences
+
+    Args:
+        numSentences (int): total number of sentences
+        sentencesPerReview (int, optional): Defaults to 5.
+
+    Returns:
+        pd.DataFrame: frame with a "tokens" column holding the sentences of every review
+    """
+    rng = random.Random(0)
+    sentences = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25)))
+        for _ in range(numSentences)
+    ]
+    reviews = [
+        sentences[i : i + sentencesPerReview]
+        for i in range(0, numSentences, sentencesPerReview)
+    ]
+    return pd.DataFrame({"tokens": reviews})
+
+
+def loadModel(model: str):
+    try:
+        return spacy.load(model, disable=["tagger", "parser", "ner"])
+    except OSError:
+        print("Model %s not found, using the blank german tokenizer" % model)
+        return spacy.blank("de")
+
+
+def benchmark(nlp, data: pd.DataFrame, nProcess: int, batchSize: int):
+    """
+    tokenize all sentences of data
+
+    Returns:
+        tuple[float, pd.Series]: seconds needed and the tokens
+    """
+    preprocessor = Preprocessor(batchSize=batchSize, nProcess=nProcess)
+    preprocessor.nlp = nlp
+    preprocessor.data = data.copy()
+
+    start = time.perf_counter()
+    preprocessor.tokenizeSentences()
+    return time.perf_counter() - start, preprocessor.data["tokens"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="de_core_news_sm")
+    parser.add_argument("--sentences", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    nlp = loadModel(args.model)
+    data = syntheticReviews(args.sentences)
+
+    # reference: one call of the pipeline per sentence as before batching
+    start = time.perf_counter()
+    reference = data["tokens"].apply(lambda x: [[t.text for t in nlp(i)] for i in x])
+    seconds = time.perf_counter() - start
+    print("%10s %10s %14s" % ("workers", "seconds", "sentences/s"))
+    print("%10s %10.2f %14.0f" % ("unbatched", seconds, args.sentences / seconds))
+
+    workers = 1
+    while workers <= os.cpu_count():
+        seconds, tokens = benchmark(nlp, data, workers, args.batch_size)
+        assert tokens.tolist() == reference.tolist(), "batched tokens differ"
+        print("%10d %10.2f %14.0f" % (workers, seconds, args.sentences / seconds))
+        workers *= 2
@@ -0,0 +1,80 @@
+"""
+Measures attaching the true labels to millions of aspect rows: the iterrows loop the detector used
+to run, on a sample of the rows, against the melt and merge of SentimentDetector.attachTrueLabels,
+and checks that both give the same labels on the sample.
+Run from the project root with: python -m benchmarks.true_label_benchmark [--rows N]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# the detector imports its helpers like main.py, relative to src/
+sys.path.insert(0, "src")
+
+from src.sentiment_detection import SentimentDetector  # noqa: E402
+
+ASPECTS = ["Grafik", "Sound", "Steuerung", "Atmosphäre"]
+
+
+def trueLabelsLoop(df_aspect_tokens: pd.DataFrame, df_preprocessed: pd.DataFrame):
+    true_labels = list()
+    for index, row in df_aspect_tokens.iterrows():
+        true_labels.append(
+            df_preprocessed.iloc[row["reviewnumber"]][
+                df_aspect_tokens.iloc[index]["aspect"]
+            ]
+        )
+    return true_labels
+
+
+def trueLabelsJoin(df_aspect_tokens: pd.DataFrame, df_preprocessed: pd.DataFrame):
+    detector = SentimentDetector(useDocStore=False)
+    detector.df_aspect_tokens = df_aspect_tokens
+    detector.df_preprocessed = df_preprocessed
+    detector.attachTrueLabels()
+    return detector.df_aspect_tokens["true_label"].tolist()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=3000000)
+    parser.add_argument("--reviews", type=int, default=500000)
+    parser.add_argument("--loop-rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df_preprocessed = pd.DataFrame(
+        {aspect: rng.integers(1, 6, args.reviews) for aspect in ASPECTS}
+    )
+    df_preprocessed["text_normalized"] = "text"
+    df_aspect_tokens = pd.DataFrame(
+        {
+            "reviewnumber": np.sort(rng.integers(0, args.reviews, args.rows)),
+            "word_found": "grafik",
+            "aspect": rng.choice(ASPECTS, args.rows),
+        }
+    )
+
+    sample = df_aspect_tokens[: args.loop_rows].copy()
+    start = time.perf_counter()
+    expected = trueLabelsLoop(sample, df_preprocessed)
+    loopSeconds = (time.perf_counter() - start) * args.rows / len(sample)
+    assert trueLabelsJoin(sample, df_preprocessed) == expected, "labels differ"
+
+    start = time.perf_counter()
+    trueLabelsJoin(df_aspect_tokens, df_preprocessed)
+    joinSeconds = time.perf_counter() - start
+
+    print("%d aspect rows of %d reviews" % (args.rows, args.reviews))
+    print(
+        "%-16s %10.2fs (extrapolated from %d rows)"
+        % ("iterrows", loopSeconds, len(sample))
+    )
+    print(
+        "%-16s %10.2fs %8.0fx"
+        % ("melt and merge", joinSeconds, loopSeconds / joinSeconds)
+    )
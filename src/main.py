@@ -1,16 +1,11 @@
 import os
 
-import numpy as NP
-import requests
-from sentiment_detection import SentimentDetector
-from utils.aspect_annotator import AspectAnnotator
-from utils.preprocessing import Preprocessor
-from utils.train import Evaluator
-from utils.web_scraper import WebScraper
+from utils.resources import ResourceManager
 
 """
 This script should serve as entrypoint to your program.
-Every module or package it relies on has to be imported at the beginning.
+The modules of every stage are imported when the stage runs, so that a run of
+a single stage doesn't pay for the imports (spacy, sklearn, ...) of the others.
 The code that is actually executed is the one below 'if __name__ ...' (if run
 as script).
 """
@@ -21,6 +16,32 @@ do_annotation = True
 do_sentimentanalysis = True
 do_evaluation = True
 
+scraping_workers = 8
+incremental_scraping = True
+http_cache_mode = "off"  # one of "off", "record", "replay", "auto"
+raw_chunk_size = (
+    None  # stream the scraped reviews to src/data/data_raw/ in parts of this size
+)
+raw_filename = "data_raw.csv" if raw_chunk_size is None else "data_raw"
+processing_workers = -1  # spacy worker processes, -1 uses all cores
+processing_chunk_size = (
+    None  # preprocess the raw data in chunks of this many reviews to bound the memory
+)
+token_store = False  # keep the tokens in src/data/tokens/ instead of a csv column
+store_docs = (
+    False  # parse every sentence once while preprocessing and reuse the analyses
+)
+incremental_annotation = True  # only process the changes of aspectDict.json
+annotation_workers = -1  # annotation worker processes, -1 uses all cores
+parse_cache_tokens = (
+    100000  # tokens of the parsed sentences the detector keeps, 0 disables the cache
+)
+detection_batch_size = (
+    256  # parse the aspect sentences with nlp.pipe, None parses row by row
+)
+detection_workers = 1  # spacy worker processes of the detector, -1 uses all cores
+resource_dir = None  # e.g. "src/data/resources/", load nltk data, spacy models and lexicon from there
+
 Scraper = None
 Preper = None
 Annotator = None
@@ -28,33 +49,92 @@ Detector = None
 
 
 if __name__ == "__main__":
-    if not os.path.exists("src/data/data_raw.csv") or do_scraping:
+    resources = None
+    if resource_dir is not None:
+        resources = ResourceManager(resource_dir)
+
+    if not os.path.exists("src/data/" + raw_filename) or do_scraping:
+        import numpy as NP
+        from utils.checkpoint import CheckpointStore
+        from utils.http_cache import ResponseCache
+        from utils.web_scraper import WebScraper
+
         urls = NP.loadtxt("src/utils/urls.txt", dtype=str, comments="!")
-        Scraper = WebScraper(urls)
-        Scraper.startScraping()
+        checkpoint = None
+        if incremental_scraping:
+            checkpoint = CheckpointStore("src/data/scrape_checkpoint.json")
+        cache = None
+        if http_cache_mode != "off":
+            cache = ResponseCache("src/data/http_cache/", mode=http_cache_mode)
+        Scraper = WebScraper(
+            urls,
+            maxWorkers=scraping_workers,
+            checkpoint=checkpoint,
+            filename=raw_filename,
+            cache=cache,
+            chunkSize=raw_chunk_size,
+        )
+        Scraper.startScraping(concurrent=scraping_workers > 1)
         Scraper.storeData()
+        print(Scraper.scheduler.stats)
 
     if not os.path.exists("src/data/data_preprocessed.csv") or do_processing:
+        from utils.preprocessing import Preprocessor
+
         Preper = Preprocessor(
-            lemmatize=False, lower=False, rmnonalphanumeric=False, rmstopwords=False
+            lemmatize=False,
+            lower=False,
+            rmnonalphanumeric=False,
+            rmstopwords=False,
+            nProcess=processing_workers,
+            storeDocs=store_docs,
+            tokenStore=token_store,
+            resources=resources,
         )
-        Preper.loadSpacyModel(model="de_core_news_md")
-        Preper.prep()
-        Preper.saveCSV()
+        if processing_chunk_size is None:
+            Preper.loadSpacyModel(model="de_core_news_md")
+            Preper.loadCSV(raw_filename)
+            Preper.prep()
+            Preper.saveCSV()
+        else:
+            Preper.prepChunked(raw_filename, chunkSize=processing_chunk_size)
 
     if not os.path.exists("src/data/data_aspects_tokens.csv") or do_annotation:
-        Annotator = AspectAnnotator()
-        Annotator.loadCSV()
-        Annotator.annotate()
-        Annotator.saveCSV()
+        from utils.aspect_annotator import AspectAnnotator
+
+        Annotator = AspectAnnotator(workers=annotation_workers)
+        if not (store_docs and Annotator.loadDocStore()):
+            Annotator.loadCSV()
+        if incremental_annotation:
+            Annotator.annotateDelta()
+        else:
+            Annotator.annotateFull()
 
     if do_sentimentanalysis:
-        Detector = SentimentDetector()
-        Detector.run()
+        from sentiment_detection import SentimentDetector
+
+        Detector = SentimentDetector(
+            useDocStore=store_docs,
+            resources=resources,
+            parseCacheTokens=parse_cache_tokens,
+            batchSize=detection_batch_size,
+            nProcess=detection_workers,
+        )
+        if incremental_annotation:
+            Detector.runDelta()
+        else:
+            Detector.run()
         Detector.saveCSV()
+        print(Detector.parseCache)
+        print(Detector.lemmaCache)
 
     if do_evaluation:
+        from utils.train import Evaluator
+
         evaluator = Evaluator()
         evaluator.generate_train_test()
         evaluator.train_model()
         evaluator.evaluate()
+
+    if resources is not None:
+        print(resources.report())
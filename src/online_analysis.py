@@ -0,0 +1,303 @@
+import argparse
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as PD
+from sentiment_detection import SentimentDetector
+from utils.aspect_annotator import AspectAnnotator
+from utils.record_buffer import RaggedBuffer
+from utils.resources import ResourceError, ResourceManager
+from utils.sentiment_aggregator import SentimentAggregator
+
+
+class OnlineAnalyzer:
+    """
+    Scores single reviews with the steps of the batch pipeline: the normalization of the
+    Preprocessor, the keyword matching of the AspectAnnotator and the dependency rules of the
+    SentimentDetector. The spacy model, the lexicon and the lemmatizer are loaded once by load and
+    kept for all reviews, a review only pays for parsing its sentences that mention an aspect.
+    """
+
+    def __init__(
+        self,
+        path: str = "src/data/",
+        model: str = "de_core_news_lg",
+        resources: ResourceManager = None,
+    ):
+        """
+        Constructor for OnlineAnalyzer class
+
+        Args:
+            path (str, optional): directory of aspectDict.json, the lexicon and the lemma cache. Defaults to "src/data/".
+            model (str, optional): spacy model of the detector. Defaults to "de_core_news_lg".
+            resources (ResourceManager, optional): load the models and the lexicon from a local directory. Defaults to None.
+        """
+        self.path = path
+        self.model = model
+        self.resources = resources
+        self.preprocessor = None
+        self.annotator = None
+        self.detector = None
+        # the detector keeps the state of the review it is working on
+        self.lock = threading.Lock()
+
+    def loadPreprocessor(self):
+        """
+        the Preprocessor with the settings of main.py, only its normalizer is used
+        """
+        from utils.preprocessing import Preprocessor
+
+        return Preprocessor(
+            self.path,
+            lemmatize=False,
+            lower=False,
+            rmnonalphanumeric=False,
+            rmstopwords=False,
+            resources=self.resources,
+        )
+
+    def loadDetector(self) -> SentimentDetector:
+        return SentimentDetector(self.path, useDocStore=False, resources=self.resources)
+
+    def load(self) -> bool:
+        """
+        load everything needed to analyze reviews
+
+        Returns:
+            bool: successful execution
+        """
+        self.preprocessor = self.loadPreprocessor()
+        self.preprocessor.compileNormalizer()
+        self.annotator = AspectAnnotator(self.path)
+
+        self.detector = self.loadDetector()
+        if not self.detector.loadSpacyModel(self.model):
+            return False
+        try:
+            self.detector.loadLexicon()
+        except (IOError, ResourceError) as e:
+            print(e)
+            return False
+        self.detector.lemmaCache.loadLemmatizer()
+        return True
+
+    def close(self) -> None:
+        """
+        keep the lemmas of the analyzed reviews for later runs
+        """
+        if self.detector is not None:
+            self.detector.lemmaCache.save()
+
+    def splitSentences(self, text: str) -> list[str]:
+        from nltk.tokenize import sent_tokenize
+
+        return sent_tokenize(text, language="german")
+
+    def tokenize(self, text: str) -> list[list[str]]:
+        """
+        tokens of every sentence of a normalized review, like Preprocessor.tokenize but with the
+        tokenizer of the detector model, which has the same german rules
+
+        Args:
+            text (str): normalized text of the review
+
+        Returns:
+            list[list[str]]: tokens of every sentence
+        """
+        tokenizer = self.detector.nlp.tokenizer
+        return [
+            [token.text for token in tokenizer(sentence)]
+            for sentence in self.splitSentences(text)
+        ]
+
+    def analyze(self, text: str) -> dict:
+        """
+        sentiment of every aspect mentioned in a review
+
+        Args:
+            text (str): raw text of the review
+
+        Returns:
+            dict: normalized text and sentiment of the review and, for every aspect, its sentiment
+            and the mentions with their descriptors, polarities and intensifiers. Sentiments are
+            None without a descriptor.
+        """
+        text = self.preprocessor.normalizer.normalize(text)
+        tokens = self.tokenize(text)
+        rows = self.annotator.matcher.findAspects(tokens)
+        df = PD.DataFrame(
+            rows, columns=["word_found", "sent_idx", "word_idx", "aspect"]
+        ).assign(reviewnumber=0)
+        df["word_found"] = df["word_found"].str.replace(r"[^\w]*", "", regex=True)
+
+        with self.lock:
+            detector = self.detector
+            detector.df_aspect_tokens = df
+            detector.results = RaggedBuffer(len(df), list(detector.resultColumns))
+            # only the sentences that mention an aspect are parsed, each once
+            sentences = sorted(set(df["sent_idx"].tolist()))
+            docs = detector.nlp.pipe(" ".join(tokens[i]) for i in sentences)
+            detector.parsedDocs = {(0, i): doc for i, doc in zip(sentences, docs)}
+            for _, row in df.iterrows():
+                detector.detectRow(row)
+            columns = {
+                column: detector.results.offsets(column)
+                for column in detector.resultColumns
+            }
+            detector.parsedDocs = {}
+
+        aggregator = SentimentAggregator()
+        aspects = {}
+        for i, (_, sent_idx, word_idx, aspect) in enumerate(rows):
+            mention = {
+                "word_found": df["word_found"][i],
+                "sent_idx": sent_idx,
+                "word_idx": word_idx,
+            }
+            for column, (values, offsets) in columns.items():
+                mention[column] = values[offsets[i] : offsets[i + 1]]
+            polarities = mention["polarity_strength"]
+            aggregator.add(
+                0, aspect, sum(polarities) / len(polarities) if polarities else math.nan
+            )
+            aspects.setdefault(aspect, []).append(mention)
+
+        return {
+            "text_normalized": text,
+            "sentiment": self.score(aggregator.reviewSentiment(0)),
+            "aspects": [
+                {
+                    "aspect": aspect,
+                    "sentiment": self.score(aggregator.aspectSentiment(0, aspect)),
+                    "mentions": mentions,
+                }
+                for aspect, mentions in aspects.items()
+            ],
+        }
+
+    @staticmethod
+    def score(sentiment: float) -> float:
+        # json has no nan
+        return None if math.isnan(sentiment) else float(sentiment)
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    """
+    POST /analyze with {"text": "..."} answers with the result of OnlineAnalyzer.analyze,
+    GET /health answers once the analyzer is loaded
+    """
+
+    def sendJson(self, status: int, content: dict) -> None:
+        body = json.dumps(content, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self.sendJson(404, {"error": "Unknown path %s" % self.path})
+            return
+        self.sendJson(200, {"status": "ok"})
+
+    def do_POST(self) -> None:
+        if self.path != "/analyze":
+            self.sendJson(404, {"error": "Unknown path %s" % self.path})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            text = request["text"]
+            if not isinstance(text, str):
+                raise ValueError("text has to be a string")
+        except (TypeError, ValueError, KeyError) as e:
+            self.sendJson(400, {"error": "Invalid request: %s" % e})
+            return
+
+        start = time.perf_counter()
+        try:
+            result = self.server.analyzer.analyze(text)
+        except Exception as e:
+            # the client gets an answer, the server keeps serving the next reviews
+            self.sendJson(500, {"error": "Analysis failed: %s" % e})
+            return
+        result["seconds"] = time.perf_counter() - start
+        self.sendJson(200, result)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    Local HTTP service around a loaded OnlineAnalyzer
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self, analyzer: OnlineAnalyzer, host: str = "127.0.0.1", port: int = 0
+    ):
+        """
+        Constructor for AnalysisServer class
+
+        Args:
+            analyzer (OnlineAnalyzer): the loaded analyzer
+            host (str, optional): Defaults to "127.0.0.1".
+            port (int, optional): port to listen on, 0 picks a free one. Defaults to 0.
+        """
+        super().__init__((host, port), AnalysisHandler)
+        self.analyzer = analyzer
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def start(self) -> str:
+        """
+        serve in a background thread
+
+        Returns:
+            str: base url of the server
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve the sentiment analysis of reviews"
+    )
+    parser.add_argument("--path", default="src/data/")
+    parser.add_argument("--model", default="de_core_news_lg")
+    parser.add_argument("--resources", default=None, help="ResourceManager directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    resources = None if args.resources is None else ResourceManager(args.resources)
+    analyzer = OnlineAnalyzer(args.path, args.model, resources)
+    if not analyzer.load():
+        raise SystemExit("Unable to load the analyzer")
+
+    server = AnalysisServer(analyzer, args.host, args.port)
+    print("Analyzing reviews on %s/analyze" % server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        analyzer.close()
@@ -4,11 +4,17 @@ from enum import Enum
 
 import numpy as NP
 import pandas as PD
-import requests
 import spacy
-from germalemma import GermaLemma
-from spacy import displacy
 from tqdm import tqdm
+from utils.aspect_annotator import loadAspectState
+from utils.doc_store import DocStore
+from utils.lemma_cache import LemmaCache
+from utils.parse_cache import ParseCache
+from utils.record_buffer import RaggedBuffer
+from utils.resources import ResourceError, ResourceManager
+from utils.sentiment_aggregator import SentimentAggregator
+from utils.sentiment_lexicon import LexiconEntry, SentimentLexicon
+from utils.token_store import TokenStore
 
 
 class ChildType(Enum):
@@ -17,15 +23,54 @@ class ChildType(Enum):
 
 
 class SentimentDetector:
-    def __init__(self, path: str = "src/data/", windowSize=5) -> None:
+    # multi-valued result columns and how their lists are written to the csv
+    resultColumns = {
+        "polarity_strength": str,
+        "sentiment_words": json.dumps,
+        "intensifier_words": str,
+    }
+
+    def __init__(
+        self,
+        path: str = "src/data/",
+        windowSize=5,
+        useDocStore: bool = True,
+        resources: ResourceManager = None,
+        parseCacheTokens: int = 100000,
+        batchSize: int = None,
+        nProcess: int = 1,
+        blockRows: int = 50000,
+        lemmaFilename: str = "lemma_cache.json",
+        aggregate: bool = False,
+    ) -> None:
         self.path = path
+        self.resources = resources
         self.windowSize = windowSize
+        self.useDocStore = useDocStore
 
         self.df_aspect_tokens = None
         self.df_preprocessed = None
-        self.df_lexicon = None
-
-        self.lemmatizer = GermaLemma()
+        self.lexicon = None
+        self.nlp = None
+        self.modelName = None
+        self.docStore = None
+        self.tokenStore = None
+        self.appliedDelta = None
+        # every sentence is parsed once, however many aspects it mentions
+        self.parseCache = ParseCache(parseCacheTokens)
+        # batched mode: the sentences of blockRows rows are parsed with nlp.pipe up front
+        self.batchSize = batchSize
+        self.nProcess = nProcess
+        self.blockRows = blockRows
+        self.parsedDocs = {}
+        self.results = None
+        # running means of the reviews and aspects, updated while detecting
+        self.aggregator = SentimentAggregator() if aggregate else None
+
+        # lemmas of earlier runs are kept in lemmaFilename in self.path, None keeps them in memory only
+        self.lemmaCache = LemmaCache(
+            None if lemmaFilename is None else self.path + lemmaFilename
+        )
 
     def downloadLexicon(
         self,
@@ -41,6 +86,8 @@ class SentimentDetector:
             url (str, optional):  Defaults to "https://raw.githubusercontent.com/sebastiansauer/pradadata/master/data-raw/germanlex.csv".
             chunk_size (int, optional): Defines chunk size for downloads of bigger files. Defaults to 128.
         """
+        import requests
+
         r = requests.get(url, stream=True)
 
         file_size = int(r.headers.get("Content-Length", None))
@@ -61,14 +108,17 @@ class SentimentDetector:
         tokenFilename: str = "data_aspects_tokens.csv",
         preprocessedFilename: str = "data_preprocessed.csv",
         lexiconFilename: str = "sentiment_lexicon.csv",
+        tokenDirname: str = "tokens/",
     ) -> bool:
         """
-        load all necessary CSV for execution of the detector and set indices as appropriate
+        load all necessary CSV for execution of the detector and set indices as appropriate,
+        without a "tokens" column in the preprocessed data the tokens are read from the TokenStore
 
         Args:
             tokenFilename (str, optional): Defaults to "data_aspects_tokens.csv".
             preprocessedFilename (str, optional): Defaults to "data_preprocessed.csv".
             lexiconFilename (str, optional): Defaults to "sentiment_lexicon.csv".
+            tokenDirname (str, optional): directory of the TokenStore in self.path. Defaults to "tokens/".
 
         Returns:
             bool: successful execution
@@ -76,55 +126,75 @@ class SentimentDetector:
         """
         try:
             if self.df_aspect_tokens is None or self.df_aspect_tokens.empty:
-                self.df_aspect_tokens = PD.read_csv(self.path + tokenFilename)
-
-                self.df_aspect_tokens["polarity_strength"] = PD.NaT
-                self.df_aspect_tokens["polarity_strength"].fillna(
-                    {i: [] for i in self.df_aspect_tokens.index}, inplace=True
+                self.df_aspect_tokens = self.prepareAspectRows(
+                    PD.read_csv(self.path + tokenFilename)
                 )
 
-                self.df_aspect_tokens["sentiment_words"] = PD.NaT
-                self.df_aspect_tokens["sentiment_words"].fillna(
-                    {i: [] for i in self.df_aspect_tokens.index}, inplace=True
-                )
-
-                self.df_aspect_tokens["intensifier_words"] = PD.NaT
-                self.df_aspect_tokens["intensifier_words"].fillna(
-                    {i: [] for i in self.df_aspect_tokens.index}, inplace=True
-                )
-
-                self.df_aspect_tokens["word_found"] = self.df_aspect_tokens[
-                    "word_found"
-                ].str.replace(r"[^\w]*", "", regex=True)
-
                 # TODO remove after debugging
                 # self.df_aspect_tokens = self.df_aspect_tokens[:100]
 
             if self.df_preprocessed is None or self.df_preprocessed.empty:
                 self.df_preprocessed = PD.read_csv(self.path + preprocessedFilename)
 
-                # pandas read_csv does not read arrays correctly so we need to adjust those
-                tqdm.pandas(desc="Applying Datatype Transformations....")
-                self.df_preprocessed["tokens"] = self.df_preprocessed[
-                    "tokens"
-                ].progress_apply(lambda x: json.loads(x))
-
-            if self.df_lexicon is None or self.df_lexicon.empty:
-                if not os.path.exists(self.path + lexiconFilename):
-                    self.downloadLexicon()
+                if "tokens" in self.df_preprocessed.columns:
+                    # pandas read_csv does not read arrays correctly so we need to adjust those
+                    tqdm.pandas(desc="Applying Datatype Transformations....")
+                    self.df_preprocessed["tokens"] = self.df_preprocessed[
+                        "tokens"
+                    ].progress_apply(lambda x: json.loads(x))
+                else:
+                    self.tokenStore = TokenStore(self.path + tokenDirname)
+                    if not self.tokenStore.load():
+                        raise IOError(
+                            "No tokens found for %s"
+                            % (self.path + preprocessedFilename)
+                        )
 
-                self.df_lexicon = PD.read_csv(self.path + lexiconFilename)
-                self.df_lexicon.drop_duplicates(
-                    subset=["word", "qualifier"], inplace=True
-                )
-                self.df_lexicon.set_index("word", inplace=True)
-                self.df_lexicon.drop("%%")
+            if self.lexicon is None:
+                self.loadLexicon(lexiconFilename)
 
             return True
-        except IOError as e:
+        except (IOError, ResourceError) as e:
             print(e)
             return False
 
+    def loadLexicon(self, lexiconFilename: str = "sentiment_lexicon.csv") -> None:
+        """
+        load the compiled sentiment lexicon, it is cached next to the data and loads without pandas
+
+        Args:
+            lexiconFilename (str, optional): Defaults to "sentiment_lexicon.csv".
+
+        Raises:
+            IOError, ResourceError: if the lexicon can't be read
+        """
+        compiledFilename = (
+            self.path + os.path.splitext(lexiconFilename)[0] + ".compiled.json"
+        )
+        if self.resources is not None:
+            lexiconPath = self.resources.lexiconPath(lexiconFilename)
+            with self.resources.timed("lexicon/" + lexiconFilename):
+                self.lexicon = SentimentLexicon.load(lexiconPath, compiledFilename)
+        else:
+            if not os.path.exists(self.path + lexiconFilename):
+                self.downloadLexicon()
+            self.lexicon = SentimentLexicon.load(
+                self.path + lexiconFilename, compiledFilename
+            )
+
+    def prepareAspectRows(self, df: PD.DataFrame) -> PD.DataFrame:
+        """
+        clean the found words of the rows of the AspectAnnotator, the result columns are added by detectRows
+
+        Args:
+            df (PD.DataFrame): rows of the AspectAnnotator
+
+        Returns:
+            PD.DataFrame: the same frame
+        """
+        df["word_found"] = df["word_found"].str.replace(r"[^\w]*", "", regex=True)
+        return df
+
     def loadSpacyModel(
         self,
         model: str = "de_core_news_lg",
@@ -137,6 +207,15 @@ class SentimentDetector:
             model (str, optional): name of the mode. Defaults to "de_core_news_sm".
             disableList (list[str], optional): list of things to be disabled. Defaults to ["tagger", "parser", "ner"].
         """
+        self.modelName = model
+        if self.resources is not None:
+            try:
+                self.nlp = self.resources.loadSpacyModel(model, disableList)
+                return True
+            except ResourceError as e:
+                print(e)
+                return False
+
         try:
             self.nlp = spacy.load(model, disable=disableList)
             return True
@@ -150,6 +229,87 @@ class SentimentDetector:
             self.nlp = spacy.load(model, disable=disableList)
             return True
 
+    def loadDocStore(self, dirname: str = "docs/") -> bool:
+        """
+        use the sentences parsed by the Preprocessor (storeDocs=True) instead of parsing them again
+
+        Args:
+            dirname (str, optional): directory of the DocStore in self.path. Defaults to "docs/".
+
+        Returns:
+            bool: whenever a store matching the model and the preprocessed data was found
+        """
+        docStore = DocStore(self.path + dirname)
+        if not docStore.load(self.nlp.vocab):
+            return False
+
+        if docStore.model != self.modelName or len(docStore) != len(
+            self.df_preprocessed
+        ):
+            print("Ignoring DocStore, it doesn't match the model or the data.")
+            return False
+
+        # the sentences are parsed from the joined tokens, see Preprocessor.iterDocs
+        reviews = (
+            self.tokenStore.iterReviews()
+            if self.tokenStore is not None
+            else self.df_preprocessed["tokens"]
+        )
+        if docStore.checksum != DocStore.sentenceChecksum(
+            [" ".join(sentence) for sentence in review] for review in reviews
+        ):
+            print("Ignoring DocStore, it was parsed from other sentences.")
+            return False
+
+        self.docStore = docStore
+        return True
+
+    def getSentenceDoc(self, reviewnumber: int, sent_idx: int):
+        """
+        get the parsed sentence of a review, from the parse cache or the DocStore if there is one
+
+        Args:
+            reviewnumber (int): position of the review in self.df_preprocessed
+            sent_idx (int): index of the sentence in the review
+
+        Returns:
+            spacy.tokens.Doc: parsed sentence
+        """
+        doc = self.parsedDocs.get((reviewnumber, sent_idx))
+        if doc is not None:
+            return doc
+        return self.parseCache.get(
+            (reviewnumber, sent_idx), lambda: self.parseSentence(reviewnumber, sent_idx)
+        )
+
+    def sentenceText(self, reviewnumber: int, sent_idx: int) -> str:
+        if self.tokenStore is not None:
+            return " ".join(self.tokenStore.sentence(reviewnumber, sent_idx))
+        return " ".join(self.df_preprocessed.iloc[reviewnumber]["tokens"][sent_idx])
+
+    def parseSentence(self, reviewnumber: int, sent_idx: int):
+        if self.docStore is not None:
+            return self.docStore.getDoc(reviewnumber, sent_idx)
+        return self.nlp(self.sentenceText(reviewnumber, sent_idx))
+
+    def parseSentences(self, keys) -> dict:
+        """
+        parse distinct sentences in batches of self.batchSize with self.nProcess workers
+
+        Args:
+            keys (iterable[tuple]): (reviewnumber, sent_idx) of the sentences, may repeat
+
+        Returns:
+            dict: spacy.tokens.Doc by (reviewnumber, sent_idx)
+        """
+        keys = list(dict.fromkeys(keys))
+        docs = self.nlp.pipe(
+            (self.sentenceText(*key) for key in keys),
+            batch_size=self.batchSize,
+            n_process=self.nProcess,
+        )
+        return dict(zip(keys, docs))
+
     def checkValidChild(self, child, childType: ChildType) -> bool:
         if childType == ChildType.DESCRIPTOR:
             if (child.tag_ == "ADJA" and child.pos_ == "ADJ") or (
@@ -175,7 +335,22 @@ class SentimentDetector:
         Returns:
             pol_strength (float): polarity_strength of given word found in sentiment lexicon
         """
+        lexEntry = self.lookupWord(child)
+
+        if lexEntry is None:
+            return 1
+        return lexEntry.polarity
 
+    def lookupWord(self, child) -> LexiconEntry:
+        """
+        look up a word as it is, lowercased and as its lemma
+
+        Args:
+            child (spacy.Token): tokenized word with tagged 'pos_' and 'text'
+
+        Returns:
+            LexiconEntry: the first entry found or None
+        """
         child_normalized = child.text.replace(r"[^\w]*", "")
 
         lexEntry = self.checkLexicon(child_normalized)
@@ -184,26 +359,12 @@ class SentimentDetector:
             lexEntry = self.checkLexicon(child_normalized.lower())
 
         if lexEntry is None:
-            lemma = self.lemmatizer.find_lemma(child_normalized, child.pos_)
+            lemma = self.lemmaCache.findLemma(child_normalized, child.pos_)
             lexEntry = self.checkLexicon(lemma)
 
-        if lexEntry is None:
-            return 1
-
-        if type(lexEntry["qualifier"]) == str:
-            pol_strength = lexEntry["polarity_strength"]
-            if lexEntry["qualifier"] == "NEG":
-                return -pol_strength
-            return pol_strength
-        else:
-            for i, qualifier in enumerate(lexEntry["qualifier"].values):
-                if qualifier == "POS":
-                    return lexEntry["polarity_strength"][i]
-                if qualifier == "NEG":
-                    return -lexEntry["polarity_strength"][i]
-            return 0
+        return lexEntry
 
-    def checkLexicon(self, word) -> PD.Series:
+    def checkLexicon(self, word) -> LexiconEntry:
         """
         Check for valid lexicon entries return None if not found
 
@@ -211,12 +372,9 @@ class SentimentDetector:
             word (str): word to be use as key
 
         Returns:
-            PD.Series: Series that is found for the given key or None
+            LexiconEntry: entry that is found for the given key or None
         """
-        try:
-            return self.df_lexicon.loc[word]
-        except KeyError:
-            return None
+        return self.lexicon.get(word)
 
     def checkForIntensifier(self, child, rowIdx) -> float:
         """
@@ -228,47 +386,15 @@ class SentimentDetector:
         Returns:
             polarity_multiplier (float): polarity_multiplier of found intensifier word
         """
-        child_normalized = child.text.replace(r"[^\w]*", "")
         # catch words that are not in the sentiment lexicon
+        lexEntry = self.lookupWord(child)
 
-        lexEntry = self.checkLexicon(child_normalized)
-
-        if lexEntry is None:
-            lexEntry = self.checkLexicon(child_normalized.lower())
-
-        if lexEntry is None:
-            lemma = self.lemmatizer.find_lemma(child_normalized, child.pos_)
-            lexEntry = self.checkLexicon(lemma)
-
-        if lexEntry is None:
+        # TODO currently the first qualifier found is taken, without considering which the most fitting one is
+        if lexEntry is None or lexEntry.multiplier is None:
             return 1
 
-        if type(lexEntry["qualifier"]) == str:
-            if lexEntry["qualifier"] == "INT":
-
-                self.df_aspect_tokens["intensifier_words"][rowIdx].append(child.text)
-                return lexEntry["polarity_strength"]
-            elif lexEntry["qualifier"] == "SHI":
-                self.df_aspect_tokens["intensifier_words"][rowIdx].append(child.text)
-                return -1
-            else:
-                return 1
-
-        else:
-            for i, qualifier in enumerate(lexEntry["qualifier"].values):
-                # TODO currently the first qualifier found is taken, without considering which the most fitting one is
-                if qualifier == "INT":
-
-                    self.df_aspect_tokens["intensifier_words"][rowIdx].append(
-                        child.text
-                    )
-                    return lexEntry["polarity_strength"][i]
-                elif qualifier == "SHI":
-                    self.df_aspect_tokens["intensifier_words"][rowIdx].append(
-                        child.text
-                    )
-                    return -1
-            return 1
+        self.results.add("intensifier_words", rowIdx, child.text)
+        return lexEntry.multiplier
 
     def calcTotalPolarityStrength(self, child, rowIdx) -> float:
         """
@@ -296,78 +422,118 @@ class SentimentDetector:
         Args:
             rowDF (PD.Series): row of the Dataframe
         """
-        doc = self.nlp(
-            " ".join(
-                self.df_preprocessed.iloc[rowDF["reviewnumber"]]["tokens"][
-                    rowDF["sent_idx"]
-                ]
-            )
-        )
+        doc = self.getSentenceDoc(rowDF["reviewnumber"], rowDF["sent_idx"])
 
         for child in doc[rowDF["word_idx"]].children:
             # if child.tag_ == "ADJA":
             if self.checkValidChild(child, ChildType.DESCRIPTOR):
-                pol_strength = self.calcTotalPolarityStrength(child, rowDF.name)
-
-                self.df_aspect_tokens["polarity_strength"][rowDF.name].append(
-                    pol_strength
-                )
-
-                self.df_aspect_tokens["sentiment_words"][rowDF.name].append(child.text)
+                self.addSentiment(child, rowDF.name)
                 return
 
         for token in doc[rowDF["word_idx"]].ancestors:
             if token.pos_ == "AUX" or token.pos_ == "VERB":
                 for child in token.children:
                     if self.checkValidChild(child, ChildType.DESCRIPTOR):
-                        pol_strength = self.calcTotalPolarityStrength(child, rowDF.name)
+                        self.addSentiment(child, rowDF.name)
+                        return
 
-                        self.df_aspect_tokens["polarity_strength"][rowDF.name].append(
-                            pol_strength
-                        )
+    def detectRow(self, rowDF: PD.Series) -> None:
+        """
+        detect the sentiment of a row and add it to the running means if the detector aggregates
 
-                        self.df_aspect_tokens["sentiment_words"][rowDF.name].append(
-                            child.text
-                        )
-                        return
+        Args:
+            rowDF (PD.Series): row of the Dataframe
+        """
+        start = len(self.results.values["polarity_strength"])
+        self.detectSentiment(rowDF)
+        if self.aggregator is not None:
+            polarities = self.results.values["polarity_strength"][start:]
+            self.aggregator.add(
+                int(rowDF["reviewnumber"]),
+                rowDF["aspect"],
+                NP.mean(polarities) if polarities else NP.nan,
+            )
 
-    def convert_polarity(self, qualifier, polarity):
-        sentiment_polarity = []
-        for i, elem in enumerate(qualifier):
-            if elem == "NEG":
-                sentiment_polarity.append(polarity[i] * -1)
-            else:
-                sentiment_polarity.append(polarity[i])
-        sentiment_polarity = NP.mean(NP.array(sentiment_polarity))
-        return sentiment_polarity
-
-    def createReadableOutput(self, rowDF):
-        appenddict = {
-            "review_number": rowDF["reviewnumber"],
-            "sentiment": self.convert_polarity(
-                rowDF["qualifier"], rowDF["polarity_strength"]
-            ),
-        }
-
-        self.overall_sentiment = self.overall_sentiment.append(
-            appenddict, ignore_index=True
-        )
+    def addSentiment(self, child, rowIdx) -> None:
+        """
+        add a descriptor of the aspect and its polarity to the results of a row
 
-    def returnSentimentsforReviews(self) -> PD.DataFrame:
-        self.overall_sentiment = PD.DataFrame(columns=["review_text", "sentiment"])
-        tqdm.pandas(desc="Calculating Sentiments")
-        self.df_aspect_tokens.progress_apply(
-            lambda x: self.createReadableOutput(x), axis=1
+        Args:
+            child (spacy.Token): the descriptor
+            rowIdx (int): position of the row in self.df_aspect_tokens
+        """
+        pol_strength = self.calcTotalPolarityStrength(child, rowIdx)
+        self.results.add("polarity_strength", rowIdx, pol_strength)
+        self.results.add("sentiment_words", rowIdx, child.text)
+
+    def rowSentiments(self, df: PD.DataFrame = None) -> PD.Series:
+        """
+        mean polarity of every aspect row, parsed from the formatted polarity_strength column
+
+        Args:
+            df (PD.DataFrame, optional): aspect rows with results. Defaults to self.df_aspect_tokens.
+
+        Returns:
+            PD.Series: sentiment of every row, nan for rows without a polarity
+        """
+        if df is None:
+            df = self.df_aspect_tokens
+        values = (
+            df["polarity_strength"]
+            .reset_index(drop=True)
+            .str.strip("[]")
+            .str.split(",")
+            .explode()
+            .str.strip()
         )
+        values = PD.to_numeric(values.mask(values == ""))
+        return values.groupby(level=0).mean().reindex(NP.arange(len(df)))
 
-        self.overall_sentiment = (
-            self.overall_sentiment.groupby("review_number").mean().reset_index()
+    def returnSentimentsforAspects(self) -> PD.DataFrame:
+        """
+        sentiment of every aspect of every review, the mean of its rows with a polarity
+
+        Returns:
+            PD.DataFrame: review_number, aspect and sentiment sorted by review and aspect
+        """
+        if self.aggregator is not None:
+            return self.aggregator.aspectFrame()
+
+        df = PD.DataFrame(
+            {
+                "review_number": self.df_aspect_tokens["reviewnumber"].to_numpy(),
+                "aspect": self.df_aspect_tokens["aspect"].to_numpy(),
+                "sentiment": self.rowSentiments().to_numpy(),
+            }
         )
-        # print(self.overall_sentiment)
-        self.overall_sentiment["review_text"] = self.df_preprocessed["text_normalized"][
-            self.overall_sentiment["review_number"].astype(int).tolist()
-        ].tolist()
+        return df.groupby(["review_number", "aspect"], as_index=False)[
+            "sentiment"
+        ].mean()
 
+    def returnSentimentsforReviews(self) -> PD.DataFrame:
+        """
+        sentiment of every review, the mean of its aspect rows with a polarity, from the running
+        means if the detector aggregates while detecting
+
+        Returns:
+            PD.DataFrame: review_number, sentiment and review_text sorted by review
+        """
+        if self.aggregator is not None:
+            self.overall_sentiment = self.aggregator.reviewFrame()
+        else:
+            df = PD.DataFrame(
+                {
+                    "review_number": self.df_aspect_tokens["reviewnumber"].to_numpy(),
+                    "sentiment": self.rowSentiments().to_numpy(),
+                }
+            )
+            self.overall_sentiment = df.groupby("review_number", as_index=False)[
+                "sentiment"
+            ].mean()
+
+        self.overall_sentiment["review_text"] = self.df_preprocessed[
+            "text_normalized"
+        ].to_numpy()[self.overall_sentiment["review_number"].to_numpy(dtype=int)]
         return self.overall_sentiment
 
     def run(self) -> bool:
@@ -384,23 +550,177 @@ class SentimentDetector:
         if not self.loadSpacyModel():
             return
 
-        true_labels = list()
-        for index, row in self.df_aspect_tokens.iterrows():
-            true_labels.append(
-                self.df_preprocessed.iloc[row["reviewnumber"]][
-                    self.df_aspect_tokens.iloc[index]["aspect"]
-                ]
+        if self.useDocStore:
+            self.loadDocStore()
+
+        self.detectRows()
+        return True
+
+    def detectRows(self) -> None:
+        """
+        look up the true labels and detect the sentiments of all rows of self.df_aspect_tokens
+        """
+        self.parseCache.clear()
+        self.attachTrueLabels()
+        # the running means start over, a second run would count every row twice
+        if self.aggregator is not None:
+            self.aggregator = SentimentAggregator()
+
+        self.results = RaggedBuffer(
+            len(self.df_aspect_tokens), list(self.resultColumns)
+        )
+        if self.batchSize is None or self.docStore is not None:
+            tqdm.pandas(desc="Looking up Sentiments...")
+            self.df_aspect_tokens.progress_apply(lambda x: self.detectRow(x), axis=1)
+        else:
+            self.detectRowsBatched()
+        self.lemmaCache.save()
+
+        # the lists of every row are written to the frame once, in the format of the csv
+        for column, formatter in self.resultColumns.items():
+            self.df_aspect_tokens[column] = self.results.formatColumn(column, formatter)
+        self.df_aspect_tokens["true_label"] = self.df_aspect_tokens.pop("true_label")
+
+    def attachTrueLabels(self) -> None:
+        """
+        add the score of the review for the aspect of every row as true_label, by a join with the
+        aspect columns of self.df_preprocessed melted to one row per (reviewnumber, aspect)
+        """
+        aspects = self.df_aspect_tokens["aspect"].unique().tolist()
+        if not aspects:
+            self.df_aspect_tokens["true_label"] = []
+            return
+
+        # reviewnumber is the position of the review in self.df_preprocessed
+        labels = self.df_preprocessed[aspects].reset_index(drop=True)
+        labels["reviewnumber"] = NP.arange(len(labels))
+        labels = labels.melt(
+            id_vars="reviewnumber",
+            value_vars=aspects,
+            var_name="aspect",
+            value_name="true_label",
+        )
+        self.df_aspect_tokens["true_label"] = (
+            self.df_aspect_tokens[["reviewnumber", "aspect"]]
+            .merge(labels, on=["reviewnumber", "aspect"], how="left")["true_label"]
+            .to_numpy()
+        )
+
+    def detectRowsBatched(self) -> None:
+        """
+        detect the sentiments block by block, the distinct sentences of a block of self.blockRows
+        rows are parsed with nlp.pipe first, so memory is bounded by the block and not the corpus
+        """
+        progress = tqdm(
+            total=len(self.df_aspect_tokens), desc="Looking up Sentiments..."
+        )
+        for start in range(0, len(self.df_aspect_tokens), self.blockRows):
+            block = self.df_aspect_tokens.iloc[start : start + self.blockRows]
+            self.parsedDocs = self.parseSentences(
+                zip(block["reviewnumber"].tolist(), block["sent_idx"].tolist())
             )
-        self.df_aspect_tokens["true_label"] = true_labels
+            for _, row in block.iterrows():
+                self.detectRow(row)
+            progress.update(len(block))
+        progress.close()
+        self.parsedDocs = {}
 
-        tqdm.pandas(desc="Looking up Sentiments...")
-        self.df_aspect_tokens.progress_apply(lambda x: self.detectSentiment(x), axis=1)
+    def runDelta(
+        self,
+        tokenFilename: str = "data_aspects_tokens.csv",
+        deltaFilename: str = "data_aspects_delta.csv",
+        stateFilename: str = "aspect_state.json",
+    ) -> bool:
+        """
+        update the results in tokenFilename with the rows added and removed by
+        AspectAnnotator.annotateDelta, only the added rows are processed. Without a delta
+        everything is processed like in run. saveCSV removes the applied delta.
+
+        Args:
+            tokenFilename (str, optional): results of the last run. Defaults to "data_aspects_tokens.csv".
+            deltaFilename (str, optional): Defaults to "data_aspects_delta.csv".
+            stateFilename (str, optional): keywords of the annotation. Defaults to "aspect_state.json".
+
+        Returns:
+            bool: successful execution of command
+        """
+        if not os.path.exists(self.path + deltaFilename):
+            return self.run()
+
+        keys = ["reviewnumber", "sent_idx", "word_idx", "aspect"]
+        results = PD.read_csv(self.path + tokenFilename)
+        delta = PD.read_csv(self.path + deltaFilename)
+
+        # identical rows can't be told apart, so only the net number of rows per position counts
+        delta["net"] = NP.where(delta["change"] == "added", 1, -1)
+        net = delta.groupby(keys, as_index=False)["net"].sum()
+
+        results["occurrence"] = results.groupby(keys).cumcount()
+        results = results.merge(
+            net[net["net"] < 0], on=keys, how="left", validate="many_to_one"
+        )
+        results = results[
+            results["occurrence"]
+            < results.groupby(keys)["occurrence"].transform("size")
+            + results["net"].fillna(0)
+        ].drop(columns=["occurrence", "net"])
+
+        added = delta[delta["change"] == "added"].drop(columns="net")
+        added["occurrence"] = added.groupby(keys).cumcount()
+        added = added.merge(net[net["net"] > 0], on=keys, validate="many_to_one")
+        added = added[added["occurrence"] < added["net"]]
+
+        self.df_aspect_tokens = self.prepareAspectRows(
+            added[["reviewnumber", "word_found", "sent_idx", "word_idx", "aspect"]]
+            .sort_values(keys, kind="stable")
+            .reset_index(drop=True)
+        )
+        if not self.df_aspect_tokens.empty:
+            if not self.loadCSVs():
+                print("Couldn't load CSV's.")
+                return False
+            if not self.loadSpacyModel():
+                return False
+            if self.useDocStore:
+                self.loadDocStore()
+            self.detectRows()
+
+        # detectRows starts new running means, the kept rows are added to them afterwards.
+        # Their result columns are already formatted like detectRows does
+        if self.aggregator is not None:
+            if self.df_aspect_tokens.empty:
+                self.aggregator = SentimentAggregator()
+            for reviewnumber, aspect, sentiment in zip(
+                results["reviewnumber"].tolist(),
+                results["aspect"].tolist(),
+                self.rowSentiments(results).tolist(),
+            ):
+                self.aggregator.add(reviewnumber, aspect, sentiment)
+
+        # same order as the rows of a full annotation: review, aspect, sentence, word
+        aspects = list(loadAspectState(self.path + stateFilename)["keyWords"])
+        merged = results
+        if not self.df_aspect_tokens.empty:
+            merged = PD.concat([results, self.df_aspect_tokens], ignore_index=True)
+        merged["aspect_rank"] = merged["aspect"].map(
+            {aspect: rank for rank, aspect in enumerate(aspects)}
+        )
+        self.df_aspect_tokens = (
+            merged.sort_values(
+                ["reviewnumber", "aspect_rank", "sent_idx", "word_idx"], kind="stable"
+            )
+            .drop(columns="aspect_rank")
+            .reset_index(drop=True)
+        )
+        # the delta is removed once the results are saved
+        self.appliedDelta = self.path + deltaFilename
+        return True
 
     def saveCSV(self, filename: str = "data_aspects_tokens.csv"):
-        self.df_aspect_tokens["sentiment_words"] = self.df_aspect_tokens[
-            "sentiment_words"
-        ].apply(lambda x: json.dumps(x))
         self.df_aspect_tokens.to_csv(self.path + filename, index=False)
+        if self.appliedDelta is not None:
+            os.remove(self.appliedDelta)
+            self.appliedDelta = None
 
 
 if __name__ == "__main__":
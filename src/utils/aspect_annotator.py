@@ -1,12 +1,97 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import json
 import os
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from .keyword_matcher import KeywordMatcher
+from .record_buffer import RecordBuffer
+from .token_index import TokenIndex
+from .token_store import TokenStore
+
+aspectColumns = ["reviewnumber", "word_found", "sent_idx", "word_idx", "aspect"]
+
+
+def annotateShard(keyWords: dict, reviewnumbers: list, source) -> dict:
+    """
+    find the aspects of a shard of reviews, runs in the worker processes
+
+    Args:
+        keyWords (dict): lists of keywords by aspect
+        reviewnumbers (list): numbers of the reviews of the shard
+        source (TokenStore or list): the store of all reviews or the tokens of the shard
+
+    Returns:
+        dict: lists of values for every column of aspectColumns
+    """
+    matcher = KeywordMatcher(keyWords)
+    buffer = RecordBuffer(aspectColumns)
+    for k, reviewnumber in enumerate(reviewnumbers):
+        if isinstance(source, TokenStore):
+            tokens = source.review(reviewnumber)
+        else:
+            tokens = source[k]
+        for word, i, j, aspect in matcher.findAspects(tokens):
+            buffer.append(
+                {
+                    "reviewnumber": reviewnumber,
+                    "word_found": word,
+                    "sent_idx": i,
+                    "word_idx": j,
+                    "aspect": aspect,
+                }
+            )
+    return buffer.data
+
+
+def dictionaryVersion(keyWords: dict) -> str:
+    return hashlib.sha1(
+        json.dumps(keyWords, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:12]
+
+
+def diffKeyWords(old: dict, new: dict) -> tuple:
+    """
+    keywords added to and removed from every aspect, a keyword listed twice counts twice
+
+    Args:
+        old (dict): lists of keywords by aspect
+        new (dict): lists of keywords by aspect
+
+    Returns:
+        tuple[dict, dict]: added and removed keywords by aspect
+    """
+    added, removed = {}, {}
+    for aspect in new:
+        keywords = list(
+            (Counter(new[aspect]) - Counter(old.get(aspect, []))).elements()
+        )
+        if keywords:
+            added[aspect] = keywords
+    for aspect in old:
+        keywords = list(
+            (Counter(old[aspect]) - Counter(new.get(aspect, []))).elements()
+        )
+        if keywords:
+            removed[aspect] = keywords
+    return added, removed
+
+
+def loadAspectState(filename: str) -> dict:
+    """
+    dictionary version, corpus version and keywords of the last annotation, None if there was none
+    """
+    if not os.path.exists(filename):
+        return None
+    with open(filename) as f:
+        return json.load(f)
+
 
 class AspectAnnotator:
     def __init__(
@@ -19,31 +104,153 @@ class AspectAnnotator:
             "Steuerung": ["steuerung", "bedienung"],
             "Atmosphäre": ["atmosphäre", "stimmung"],
         },
+        useIndex: bool = True,
+        workers: int = 1,
+        shardSize: int = 5000,
     ) -> None:
 
         self.path = path
         self.data = data
+        self.useIndex = useIndex
+        self.workers = workers if workers > 0 else os.cpu_count()
+        self.shardSize = shardSize
+        self.tokenStore = None
+        self.tokenIndex = None
+        self.dataFilename = None
         self.keyWords = keyWords
         if os.path.exists("src/data/aspectDict.json"):
             with open("src/data/aspectDict.json") as f:
                 self.keyWords = json.load(f)
-        self.df = pd.DataFrame(
-            columns=["reviewnumber", "word_found", "sent_idx", "word_idx", "aspect"]
-        )
+        self.matcher = KeywordMatcher(self.keyWords)
+        # rows of findAspects, they are added to self.df when it is read
+        self.buffer = RecordBuffer(aspectColumns)
+        self.df = pd.DataFrame(columns=aspectColumns)
 
-    def loadCSV(self, filename: str = "data_preprocessed.csv") -> None:
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        rows of the last annotation followed by the rows found by findAspects since
+        """
+        if len(self.buffer):
+            rows = self.buffer.toDataFrame()
+            self.buffer.clear()
+            self._df = (
+                rows
+                if self._df.empty
+                else pd.concat([self._df, rows], ignore_index=True)
+            )
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame) -> None:
+        self._df = df
+
+    def loadCSV(
+        self, filename: str = "data_preprocessed.csv", tokenDirname: str = "tokens/"
+    ) -> None:
         """
-        load CSV from the given filename
+        load CSV from the given filename, without a "tokens" column the tokens are read from the TokenStore
 
         Args:
             filename (str, optional): String of path to the preprocessed data. Defaults to "data_preprocessed.csv".
+            tokenDirname (str, optional): directory of the TokenStore in self.path. Defaults to "tokens/".
         """
-        self.data = pd.read_csv(self.path + filename)
+        self.dataFilename = self.path + filename
+        self.data = pd.read_csv(self.dataFilename)
+        if "tokens" not in self.data.columns:
+            self.tokenStore = TokenStore(self.path + tokenDirname)
+            if not self.tokenStore.load():
+                print("No tokens found in %s" % (self.path + filename))
+                self.tokenStore = None
+            return
+
         tqdm.pandas(desc="Loading Tokens..")
         self.data["tokens"] = self.data["tokens"].progress_apply(
             lambda x: json.loads(x)
         )
 
+    def loadDocStore(self, dirname: str = "docs/") -> bool:
+        """
+        load the tokens from the sentences parsed by the Preprocessor (storeDocs=True), the word
+        indices then refer to the tokens of the parsed sentences used by the SentimentDetector
+
+        Args:
+            dirname (str, optional): directory of the DocStore in self.path. Defaults to "docs/".
+
+        Returns:
+            bool: whenever the store was found
+        """
+        # imports spacy, which isn't needed for the annotation otherwise
+        from .doc_store import DocStore
+
+        docStore = DocStore(self.path + dirname)
+        if not docStore.load():
+            return False
+
+        self.dataFilename = None
+        self.data = pd.DataFrame(
+            {
+                "tokens": [
+                    [[t.text for t in doc] for doc in review]
+                    for review in tqdm(
+                        docStore.iterReviews(),
+                        total=len(docStore),
+                        desc="Loading Docs..",
+                    )
+                ]
+            }
+        )
+        return True
+
+    def loadIndex(self, dirname: str = "token_index/") -> TokenIndex:
+        """
+        open the TokenIndex of self.tokenStore, it is built if it's missing or outdated
+
+        Args:
+            dirname (str, optional): directory of the index in self.path. Defaults to "token_index/".
+
+        Returns:
+            TokenIndex: the index
+        """
+        if self.tokenIndex is None:
+            self.tokenIndex = TokenIndex(self.path + dirname)
+            if not self.tokenIndex.load(self.tokenStore):
+                print("Building token index..")
+                self.tokenIndex = TokenIndex.build(self.tokenStore, self.path + dirname)
+        return self.tokenIndex
+
+    def corpusVersion(self) -> str:
+        """
+        identifies the loaded reviews and their tokens, the rows of an annotation are only valid
+        for the corpus they were found in
+
+        Returns:
+            str: sha256 of the preprocessed csv and the tokens
+        """
+        digest = hashlib.sha256()
+        if self.dataFilename is not None:
+            with open(self.dataFilename, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+
+        if self.tokenStore is not None:
+            checksum = self.tokenStore.meta.get("checksum")
+            if checksum is not None:
+                digest.update(checksum.encode("utf-8"))
+            else:
+                for array in [
+                    self.tokenStore.ids,
+                    self.tokenStore.sentOffsets,
+                    self.tokenStore.reviewOffsets,
+                ]:
+                    digest.update(np.asarray(array).tobytes())
+                digest.update("\n".join(self.tokenStore.vocab).encode("utf-8"))
+        elif self.dataFilename is None:
+            # tokens of the DocStore
+            for tokens in self.data["tokens"]:
+                digest.update(json.dumps(tokens, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
     def findAspects(self, rowDf: pd.DataFrame) -> None:
         """
         function to be vectorized for the dataset
@@ -51,27 +258,173 @@ class AspectAnnotator:
         Args:
             rowDf (pd.Dataframe): Row of a dataframe containing "index (rowDF.name)" and "tokens"
         """
-        aspects = {}
-        for aspect in self.keyWords:
-            compare = self.keyWords[aspect]
-
-            for i, sent in enumerate(rowDf["tokens"]):
-                for j, word in enumerate(sent):
-                    for e in compare:
-                        if e in word.lower():
-                            aspects["reviewnumber"] = rowDf.name
-                            aspects["word_found"] = word
-                            aspects["sent_idx"] = i
-                            aspects["word_idx"] = j
-                            aspects["aspect"] = aspect
-                            self.df = self.df.append(aspects, ignore_index=True)
+        self.findReviewAspects(rowDf.name, rowDf["tokens"])
+
+    def findReviewAspects(self, reviewnumber: int, tokens: list[list[str]]) -> None:
+        """
+        add a row to self.buffer for every keyword found in the tokens of a review
+
+        Args:
+            reviewnumber (int): position of the review
+            tokens (list[list[str]]): tokens of every sentence of the review
+        """
+        self.buffer.extend(annotateShard(self.keyWords, [reviewnumber], [tokens]))
+
+    def iterShards(self):
+        """
+        split the reviews into shards of self.shardSize
+
+        Yields:
+            tuple: review numbers of the shard and the TokenStore or the tokens of the shard
+        """
+        if self.tokenStore is not None:
+            for start in range(0, len(self.tokenStore), self.shardSize):
+                stop = min(start + self.shardSize, len(self.tokenStore))
+                # the store is pickled by path, the workers map the files themselves
+                yield list(range(start, stop)), self.tokenStore
+            return
+
+        for start in range(0, len(self.data), self.shardSize):
+            shard = self.data["tokens"].iloc[start : start + self.shardSize]
+            yield shard.index.tolist(), shard.tolist()
+
+    def findRows(self, keyWords: dict) -> pd.DataFrame:
+        """
+        find the aspects of every review in shards of self.shardSize with self.workers processes,
+        with a TokenStore and self.useIndex the rows are looked up in the TokenIndex instead
+
+        Args:
+            keyWords (dict): lists of keywords by aspect
+
+        Returns:
+            pd.DataFrame: the aspect rows
+        """
+        if not keyWords:
+            return pd.DataFrame(columns=aspectColumns)
+        if self.tokenStore is not None and self.useIndex:
+            return self.loadIndex().annotate(keyWords)
+
+        shards = list(self.iterShards())
+        buffer = RecordBuffer(aspectColumns)
+        if self.workers == 1 or len(shards) <= 1:
+            results = (annotateShard(keyWords, *shard) for shard in shards)
+            for result in tqdm(results, total=len(shards), desc="Finding Aspects!"):
+                buffer.extend(result)
+        else:
+            with ProcessPoolExecutor(self.workers) as executor:
+                # map keeps the order of the shards, so the rows are ordered as without workers
+                results = executor.map(
+                    annotateShard,
+                    [keyWords] * len(shards),
+                    *zip(*shards),
+                )
+                for result in tqdm(results, total=len(shards), desc="Finding Aspects!"):
+                    buffer.extend(result)
+        return buffer.toDataFrame()
 
     def annotate(self) -> None:
         """
-        function to call the "findAspects()" function for every row
+        find the aspects of self.keyWords in every review
+        """
+        self.df = self.findRows(self.keyWords)
+
+    def annotateFull(
+        self,
+        filename: str = "data_aspects_tokens.csv",
+        deltaFilename: str = "data_aspects_delta.csv",
+        stateFilename: str = "aspect_state.json",
+        corpus: str = None,
+    ) -> None:
+        """
+        annotate everything and save it to filename. A pending delta of an earlier annotateDelta is
+        removed and the state is saved, so a later annotateDelta starts from this annotation.
+
+        Args:
+            filename (str, optional): Defaults to "data_aspects_tokens.csv".
+            deltaFilename (str, optional): Defaults to "data_aspects_delta.csv".
+            stateFilename (str, optional): keywords and corpus of the last run. Defaults to "aspect_state.json".
+            corpus (str, optional): corpusVersion, if it is already known. Defaults to None.
+        """
+        self.annotate()
+        self.saveCSV(filename)
+        if os.path.exists(self.path + deltaFilename):
+            os.remove(self.path + deltaFilename)
+        self.saveState(stateFilename, corpus)
+
+    def annotateDelta(
+        self,
+        filename: str = "data_aspects_tokens.csv",
+        deltaFilename: str = "data_aspects_delta.csv",
+        stateFilename: str = "aspect_state.json",
+    ) -> bool:
+        """
+        find only the rows added or removed by the changes to self.keyWords since the last run.
+        If the SentimentDetector already processed filename, the rows are appended to deltaFilename
+        (column "change" is "added" or "removed") for SentimentDetector.runDelta and filename is
+        kept. Otherwise, or if the corpus changed since the last run, everything is annotated and
+        saved to filename.
+
+        Args:
+            filename (str, optional): Defaults to "data_aspects_tokens.csv".
+            deltaFilename (str, optional): Defaults to "data_aspects_delta.csv".
+            stateFilename (str, optional): keywords and corpus of the last run. Defaults to "aspect_state.json".
+
+        Returns:
+            bool: whenever a delta was written instead of a full annotation
+        """
+        state = loadAspectState(self.path + stateFilename)
+        detected = os.path.exists(self.path + filename) and (
+            "polarity_strength" in pd.read_csv(self.path + filename, nrows=0).columns
+        )
+
+        corpus = self.corpusVersion()
+        # rows of another corpus point at the wrong reviews, a delta can't fix them
+        if state is None or not detected or state.get("corpus") != corpus:
+            self.annotateFull(filename, deltaFilename, stateFilename, corpus)
+            return False
+
+        added, removed = diffKeyWords(state["keyWords"], self.keyWords)
+        self.df = pd.concat(
+            [
+                self.findRows(keyWords).assign(change=change)
+                for keyWords, change in [(removed, "removed"), (added, "added")]
+            ],
+            ignore_index=True,
+        )
+        self.df["dict_version"] = dictionaryVersion(self.keyWords)
+
+        # a delta the detector hasn't applied yet is extended, the changes add up
+        exists = os.path.exists(self.path + deltaFilename)
+        self.df.to_csv(
+            self.path + deltaFilename,
+            mode="a" if exists else "w",
+            header=not exists,
+            index=False,
+        )
+        self.saveState(stateFilename, corpus)
+        return True
+
+    def saveState(
+        self, stateFilename: str = "aspect_state.json", corpus: str = None
+    ) -> None:
+        """
+        keep the keywords and the corpus of this annotation for the next annotateDelta
+
+        Args:
+            stateFilename (str, optional): Defaults to "aspect_state.json".
+            corpus (str, optional): corpusVersion, if it is already known. Defaults to None.
         """
-        tqdm.pandas(desc="Finding Aspects!")
-        self.data.progress_apply(lambda x: self.findAspects(x), axis=1)
+        with open(self.path + stateFilename, "w") as f:
+            json.dump(
+                {
+                    "version": dictionaryVersion(self.keyWords),
+                    "corpus": corpus if corpus is not None else self.corpusVersion(),
+                    "keyWords": self.keyWords,
+                },
+                f,
+                ensure_ascii=False,
+                indent=4,
+            )
 
     def saveCSV(self, filename: str = "data_aspects_tokens.csv") -> None:
         """
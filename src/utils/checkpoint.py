@@ -0,0 +1,90 @@
+import json
+import os
+
+
+class CheckpointStore:
+    """
+    Stores the scraping progress of every game so that a crawl can be resumed
+
+    Every game id maps to a dict with the keys:
+        offset: offset of the last page that was written to disk
+        total: number of reviews the crawl of this game was planned with
+        newest: identity of the newest review known for the game (high-water mark)
+        complete: whenever all pages of the game have been written to disk
+
+    outputSize is the size of the output when the checkpoint was saved (bytes of the csv file or parts
+    of a chunked dataset), rows written after that belong to pages that are not committed yet.
+    """
+
+    def __init__(self, filename: str = "src/data/scrape_checkpoint.json"):
+        """
+        Constructor for CheckpointStore class
+
+        Args:
+            filename (str, optional): json file of the checkpoint. Defaults to "src/data/scrape_checkpoint.json".
+        """
+        self.filename = filename
+        self.games = {}
+        self.outputSize = None
+        self.load()
+
+    def load(self) -> bool:
+        """
+        load the checkpoint from self.filename if it exists
+
+        Returns:
+            bool: whenever a checkpoint was found
+        """
+        if not os.path.exists(self.filename):
+            return False
+
+        with open(self.filename) as f:
+            content = json.load(f)
+        if "games" in content:
+            self.games = content["games"]
+            self.outputSize = content["outputSize"]
+        else:
+            # checkpoints of older versions only hold the games
+            self.games = content
+        return True
+
+    def save(self) -> None:
+        """
+        write the checkpoint, the old file is only replaced once the new one is complete
+        """
+        tmpFilename = self.filename + ".tmp"
+        with open(tmpFilename, "w") as f:
+            json.dump({"games": self.games, "outputSize": self.outputSize}, f)
+        os.replace(tmpFilename, self.filename)
+
+    def reset(self) -> None:
+        """
+        forget the progress of all games, the change is persisted by the next save()
+        """
+        self.games = {}
+        self.outputSize = None
+
+    def isEmpty(self) -> bool:
+        return len(self.games) == 0
+
+    def get(self, game_id) -> dict:
+        """
+        get the progress of a game
+
+        Args:
+            game_id: id of the game
+
+        Returns:
+            dict: progress of the game or None if the game was never scraped
+        """
+        return self.games.get(str(game_id))
+
+    def update(self, game_id, **progress) -> None:
+        """
+        update the progress of a game, the change is persisted by the next save()
+
+        Args:
+            game_id: id of the game
+            **progress: keys of the progress dict to be set
+        """
+        self.games.setdefault(str(game_id), {}).update(progress)
@@ -0,0 +1,168 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from .record_buffer import RecordBuffer
+
+
+class ChunkedCSVWriter:
+    """
+    Writes records into numbered csv part files of a directory as they arrive
+
+    The directory contains a manifest.json with the columns, the part files in order and the
+    number of rows of every part. The manifest is only updated after a part is complete, so
+    readers never see partially written parts.
+    """
+
+    manifestName = "manifest.json"
+
+    def __init__(
+        self,
+        path: str,
+        columns: list[str],
+        chunkSize: int = 10000,
+        append: bool = False,
+    ):
+        """
+        Constructor for ChunkedCSVWriter class
+
+        Args:
+            path (str): directory of the dataset
+            columns (list[str]): columns of the records
+            chunkSize (int, optional): rows after which a part is written. Defaults to 10000.
+            append (bool, optional): keep the parts of an existing dataset, otherwise it is removed. Defaults to False.
+        """
+        self.path = path
+        self.columns = columns
+        self.chunkSize = chunkSize
+        self.buffer = RecordBuffer(columns)
+
+        if not append and os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path, exist_ok=True)
+
+        self.manifest = {"columns": columns, "parts": [], "complete": False}
+        if append and isChunked(path):
+            self.manifest = loadManifest(path)
+            self.manifest["complete"] = False
+
+    def __len__(self) -> int:
+        return sum(part["rows"] for part in self.manifest["parts"])
+
+    def append(self, records: RecordBuffer) -> int:
+        """
+        take the records of a buffer and write a part once chunkSize rows are collected
+
+        Args:
+            records (RecordBuffer): records with the columns of the writer, the buffer is cleared
+
+        Returns:
+            int: number of written rows, 0 if the records are still held in memory
+        """
+        self.buffer.extend(records.data)
+        records.clear()
+        if len(self.buffer) >= self.chunkSize:
+            return self.flush()
+        return 0
+
+    def flush(self) -> int:
+        """
+        write all collected records as a new part
+
+        Returns:
+            int: number of written rows
+        """
+        rows = len(self.buffer)
+        if not rows:
+            return 0
+
+        filename = "part-%05d.csv" % len(self.manifest["parts"])
+        tmpFilename = os.path.join(self.path, filename + ".tmp")
+        self.buffer.toDataFrame().to_csv(tmpFilename, index=False)
+        os.replace(tmpFilename, os.path.join(self.path, filename))
+        self.buffer.clear()
+
+        self.manifest["parts"].append({"filename": filename, "rows": rows})
+        self.saveManifest()
+        return rows
+
+    def close(self) -> None:
+        """
+        write the remaining records and mark the dataset as complete
+        """
+        self.flush()
+        self.manifest["complete"] = True
+        self.saveManifest()
+
+    def saveManifest(self) -> None:
+        filename = os.path.join(self.path, self.manifestName)
+        with open(filename + ".tmp", "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(filename + ".tmp", filename)
+
+
+def isChunked(path: str) -> bool:
+    return os.path.exists(os.path.join(path, ChunkedCSVWriter.manifestName))
+
+
+def loadManifest(path: str) -> dict:
+    with open(os.path.join(path, ChunkedCSVWriter.manifestName)) as f:
+        return json.load(f)
+
+
+def truncateDataset(path: str, numParts: int) -> None:
+    """
+    remove the parts of a chunked dataset after the first numParts
+
+    Args:
+        path (str): directory of the dataset
+        numParts (int): number of parts to keep
+    """
+    manifest = loadManifest(path)
+    removed = manifest["parts"][numParts:]
+    manifest["parts"] = manifest["parts"][:numParts]
+    manifest["complete"] = False
+
+    filename = os.path.join(path, ChunkedCSVWriter.manifestName)
+    with open(filename + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(filename + ".tmp", filename)
+    for part in removed:
+        os.remove(os.path.join(path, part["filename"]))
+
+
+def iterChunks(path: str, **kwargs):
+    """
+    read the parts of a chunked dataset one after another
+
+    Args:
+        path (str): directory of the dataset
+        **kwargs: passed to pd.read_csv
+
+    Yields:
+        pd.DataFrame: content of a part file
+    """
+    for part in loadManifest(path)["parts"]:
+        yield pd.read_csv(os.path.join(path, part["filename"]), **kwargs)
+
+
+def readDataset(filename: str, **kwargs) -> pd.DataFrame:
+    """
+    read a single csv file or a chunked dataset directory into one DataFrame
+
+    Args:
+        filename (str): csv file or directory written by ChunkedCSVWriter
+        **kwargs: passed to pd.read_csv
+
+    Returns:
+        pd.DataFrame: all rows with a fresh index
+    """
+    if not isChunked(filename):
+        return pd.read_csv(filename, **kwargs)
+
+    chunks = list(iterChunks(filename, **kwargs))
+    if not chunks:
+        return pd.DataFrame(columns=loadManifest(filename)["columns"])
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import shutil
+
+from spacy.tokens import DocBin
+from spacy.vocab import Vocab
+
+
+class DocStore:
+    """
+    Sharded on-disk store of the parsed sentences of every review
+
+    Every shard is a spacy DocBin holding one Doc per sentence for shardSize consecutive reviews.
+    index.json keeps the model the sentences were parsed with and the number of sentences of every
+    review, so a single sentence can be found without reading the other shards, and a checksum of
+    the sentence texts to tell whenever the store still matches the preprocessed data.
+    """
+
+    attrs = ["ORTH", "TAG", "POS", "MORPH", "LEMMA", "DEP", "HEAD", "SENT_START"]
+
+    def __init__(self, path: str = "src/data/docs/", cachedShards: int = 2):
+        """
+        Constructor for DocStore class
+
+        Args:
+            path (str, optional): directory of the store. Defaults to "src/data/docs/".
+            cachedShards (int, optional): number of loaded shards kept in memory. Defaults to 2.
+        """
+        self.path = path
+        self.cachedShards = cachedShards
+        self.index = None
+        self.vocab = None
+        self.shards = {}
+        self.starts = []
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "index.json"))
+
+    def write(self, reviews, model: str, shardSize: int = 1000) -> int:
+        """
+        write the parsed sentences of all reviews, an existing store is replaced
+
+        Args:
+            reviews (iterable[list[spacy.tokens.Doc]]): parsed sentences of every review in order
+            model (str): name of the spacy model the sentences were parsed with
+            shardSize (int, optional): reviews per shard. Defaults to 1000.
+
+        Returns:
+            int: number of written reviews
+        """
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        os.makedirs(self.path)
+
+        index = {"model": model, "shardSize": shardSize, "sentences": []}
+        digest = hashlib.sha256()
+        docBin = DocBin(attrs=self.attrs)
+        for docs in reviews:
+            for doc in docs:
+                docBin.add(doc)
+            index["sentences"].append(len(docs))
+            self.updateChecksum(digest, [doc.text for doc in docs])
+
+            if len(index["sentences"]) % shardSize == 0:
+                self.writeShard(docBin, len(index["sentences"]) // shardSize - 1)
+                docBin = DocBin(attrs=self.attrs)
+
+        if len(index["sentences"]) % shardSize:
+            self.writeShard(docBin, len(index["sentences"]) // shardSize)
+
+        index["checksum"] = digest.hexdigest()
+        # the index is written last, an interrupted run leaves no valid store behind
+        with open(os.path.join(self.path, "index.json"), "w") as f:
+            json.dump(index, f)
+        self.index = index
+        self.shards = {}
+        self.computeStarts()
+        return len(index["sentences"])
+
+    @staticmethod
+    def updateChecksum(digest, sentences: list[str]) -> None:
+        # one json line per review, so the review boundaries are part of the checksum
+        digest.update(json.dumps(sentences).encode("utf-8") + b"\n")
+
+    @classmethod
+    def sentenceChecksum(cls, reviews) -> str:
+        """
+        checksum of the sentences of all reviews, the same as written by write
+
+        Args:
+            reviews (iterable[list[str]]): sentence texts of every review in order
+
+        Returns:
+            str: sha256 hex digest
+        """
+        digest = hashlib.sha256()
+        for sentences in reviews:
+            cls.updateChecksum(digest, sentences)
+        return digest.hexdigest()
+
+    def writeShard(self, docBin: DocBin, shard: int) -> None:
+        docBin.to_disk(os.path.join(self.path, "shard-%05d.spacy" % shard))
+
+    def load(self, vocab: Vocab = None) -> bool:
+        """
+        read the index of the store
+
+        Args:
+            vocab (Vocab, optional): vocab of the loaded docs, e.g. nlp.vocab. Defaults to a new Vocab.
+
+        Returns:
+            bool: whenever the store exists
+        """
+        if not self.exists():
+            return False
+
+        with open(os.path.join(self.path, "index.json")) as f:
+            self.index = json.load(f)
+        self.vocab = vocab if vocab is not None else Vocab()
+        self.shards = {}
+        self.computeStarts()
+        return True
+
+    def computeStarts(self) -> None:
+        """
+        position of the first sentence of every review inside its shard
+        """
+        self.starts = []
+        start = 0
+        for review, sentences in enumerate(self.index["sentences"]):
+            if review % self.index["shardSize"] == 0:
+                start = 0
+            self.starts.append(start)
+            start += sentences
+
+    def __len__(self) -> int:
+        return len(self.index["sentences"])
+
+    @property
+    def model(self) -> str:
+        return self.index["model"]
+
+    @property
+    def checksum(self) -> str:
+        # stores written without a checksum never match
+        return self.index.get("checksum")
+
+    def loadShard(self, shard: int) -> list:
+        """
+        get all docs of a shard, the most recently used shards stay in memory
+
+        Args:
+            shard (int): number of the shard
+
+        Returns:
+            list[spacy.tokens.Doc]: sentences of the shard in order
+        """
+        if shard in self.shards:
+            self.shards[shard] = self.shards.pop(shard)
+            return self.shards[shard]
+
+        docBin = DocBin().from_disk(os.path.join(self.path, "shard-%05d.spacy" % shard))
+        self.shards[shard] = list(docBin.get_docs(self.vocab))
+        while len(self.shards) > self.cachedShards:
+            self.shards.pop(next(iter(self.shards)))
+        return self.shards[shard]
+
+    def getReview(self, review: int) -> list:
+        """
+        get the parsed sentences of a review
+
+        Args:
+            review (int): position of the review in the preprocessed data
+
+        Returns:
+            list[spacy.tokens.Doc]: one doc per sentence
+        """
+        start = self.starts[review]
+        docs = self.loadShard(review // self.index["shardSize"])
+        return docs[start : start + self.index["sentences"][review]]
+
+    def getDoc(self, review: int, sent_idx: int):
+        """
+        get a single parsed sentence
+
+        Args:
+            review (int): position of the review in the preprocessed data
+            sent_idx (int): index of the sentence in the review
+
+        Returns:
+            spacy.tokens.Doc: the parsed sentence
+        """
+        return self.getReview(review)[sent_idx]
+
+    def iterReviews(self):
+        """
+        Yields:
+            list[spacy.tokens.Doc]: parsed sentences of every review in order
+        """
+        for review in range(len(self)):
+            yield self.getReview(review)
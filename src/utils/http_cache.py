@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+from urllib.parse import parse_qsl, urlsplit
+
+
+class CacheMissError(KeyError):
+    """
+    Raised in replay mode if a request was never recorded
+    """
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for requests.Response, as far as the WebScraper needs it
+    """
+
+    def __init__(
+        self,
+        content: bytes,
+        status_code: int = 200,
+        encoding: str = "utf-8",
+        content_type: str = "text/html",
+    ):
+        self.content = content
+        self.status_code = status_code
+        self.encoding = encoding
+        self.content_type = content_type
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+class ResponseCache:
+    """
+    Content addressed on-disk store of HTTP responses
+
+    Every request is identified by its path and sorted query parameters, so recorded responses
+    can be replayed for any host (e.g. the ReplayServer). Bodies are stored once per sha256 of
+    their content in objects/, the requests/ directory maps every request to its body.
+
+    Modes:
+        off: always use the network, nothing is stored
+        record: always use the network and store every successful response
+        replay: only use stored responses, a miss raises CacheMissError
+        auto: use stored responses and record the misses
+    """
+
+    MODES = ("off", "record", "replay", "auto")
+
+    def __init__(self, path: str = "src/data/http_cache/", mode: str = "auto"):
+        """
+        Constructor for ResponseCache class
+
+        Args:
+            path (str, optional): directory of the cache. Defaults to "src/data/http_cache/".
+            mode (str, optional): one of ResponseCache.MODES. Defaults to "auto".
+        """
+        if mode not in self.MODES:
+            raise ValueError(
+                "Unknown cache mode %s, expected one of %s" % (mode, self.MODES)
+            )
+
+        self.path = path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    def requestKey(self, url: str, params: dict = None) -> str:
+        """
+        key of a request, independent of scheme, host and fragment
+
+        Args:
+            url (str): url of the request, may contain a query
+            params (dict, optional): additional query parameters. Defaults to None.
+
+        Returns:
+            str: sha256 of path and sorted query parameters
+        """
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if params:
+            query += [(str(key), str(value)) for key, value in params.items()]
+        request = parts.path + "?" + "&".join("%s=%s" % item for item in sorted(query))
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    def requestFilename(self, key: str) -> str:
+        return os.path.join(self.path, "requests", key[:2], key + ".json")
+
+    def objectFilename(self, digest: str) -> str:
+        return os.path.join(self.path, "objects", digest[:2], digest)
+
+    def lookup(self, url: str, params: dict = None) -> CachedResponse:
+        """
+        get the stored response of a request
+
+        Args:
+            url (str): url of the request
+            params (dict, optional): query parameters. Defaults to None.
+
+        Returns:
+            CachedResponse: the stored response or None if the request was never recorded
+        """
+        requestFilename = self.requestFilename(self.requestKey(url, params))
+        if not os.path.exists(requestFilename):
+            return None
+
+        with open(requestFilename) as f:
+            meta = json.load(f)
+        with open(self.objectFilename(meta["body"]), "rb") as f:
+            content = f.read()
+        return CachedResponse(
+            content, meta["status_code"], meta["encoding"], meta["content_type"]
+        )
+
+    def store(
+        self,
+        url: str,
+        params: dict,
+        content: bytes,
+        status_code: int = 200,
+        encoding: str = "utf-8",
+        content_type: str = "text/html",
+    ) -> str:
+        """
+        store the response of a request
+
+        Args:
+            url (str): url of the request
+            params (dict): query parameters
+            content (bytes): body of the response
+            status_code (int, optional): Defaults to 200.
+            encoding (str, optional): Defaults to "utf-8".
+            content_type (str, optional): Defaults to "text/html".
+
+        Returns:
+            str: sha256 of the stored body
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        objectFilename = self.objectFilename(digest)
+        if not os.path.exists(objectFilename):
+            self.writeAtomic(objectFilename, content)
+
+        meta = {
+            "url": url,
+            "params": params,
+            "status_code": status_code,
+            "encoding": encoding,
+            "content_type": content_type,
+            "body": digest,
+        }
+        self.writeAtomic(
+            self.requestFilename(self.requestKey(url, params)),
+            json.dumps(meta).encode("utf-8"),
+        )
+        return digest
+
+    def writeAtomic(self, filename: str, content: bytes) -> None:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        tmpFilename = "%s.%d.tmp" % (filename, os.getpid())
+        with open(tmpFilename, "wb") as f:
+            f.write(content)
+        os.replace(tmpFilename, filename)
+
+    def get(self, fetch, url: str, params: dict = None):
+        """
+        get a response according to the mode of the cache
+
+        Args:
+            fetch (callable): called as fetch(url, params=params) for requests to the network,
+                e.g. requests.Session.get
+            url (str): url of the request
+            params (dict, optional): query parameters. Defaults to None.
+
+        Raises:
+            CacheMissError: in replay mode if the request was never recorded
+
+        Returns:
+            requests.Response or CachedResponse: response with 'text' and 'status_code'
+        """
+        if self.mode in ("replay", "auto"):
+            cached = self.lookup(url, params)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+            self.misses += 1
+            if self.mode == "replay":
+                raise CacheMissError(url)
+
+        response = fetch(url, params=params)
+        if self.mode != "off" and response.status_code == 200:
+            self.store(
+                url,
+                params,
+                response.content,
+                response.status_code,
+                response.encoding,
+                response.headers.get("Content-Type", "text/html"),
+            )
+        return response
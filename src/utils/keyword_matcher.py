@@ -0,0 +1,127 @@
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over the keywords of all aspects
+
+    A word matches a keyword if the keyword is a substring of the lowercased word, the same test
+    as `keyword in word.lower()`. Every word is scanned once for all keywords of all aspects and
+    the result is memoized per word, so repeated words cost a dict lookup.
+    """
+
+    def __init__(self, keyWords: dict):
+        """
+        Constructor for KeywordMatcher class
+
+        Args:
+            keyWords (dict): lists of keywords by aspect, e.g. {"Grafik": ["grafik", "optik"]}
+        """
+        self.aspects = list(keyWords)
+        self.keywords = []
+        # (aspect index, number of times the keyword is listed for the aspect) by keyword id
+        self.keywordAspects = []
+        ids = {}
+        for a, aspect in enumerate(self.aspects):
+            for keyword in keyWords[aspect]:
+                if keyword not in ids:
+                    ids[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    self.keywordAspects.append({})
+                counts = self.keywordAspects[ids[keyword]]
+                counts[a] = counts.get(a, 0) + 1
+
+        self.build()
+        self.memo = {}
+
+    def build(self) -> None:
+        """
+        build the goto, fail and output tables of the automaton
+        """
+        self.goto = [{}]
+        outputs = [set()]
+        for keywordId, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                nextState = self.goto[state].get(char)
+                if nextState is None:
+                    nextState = self.goto[state][char] = len(self.goto)
+                    self.goto.append({})
+                    outputs.append(set())
+                state = nextState
+            outputs[state].add(keywordId)
+
+        # breadth first, so the fail state of a state is complete before its children
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                outputs[child] |= outputs[self.fail[child]]
+                queue.append(child)
+        self.outputs = [frozenset(output) for output in outputs]
+
+    def scan(self, text: str) -> set:
+        """
+        ids of all keywords contained in text
+
+        Args:
+            text (str): lowercased word
+
+        Returns:
+            set: keyword ids
+        """
+        # the outputs of the root (an empty keyword) match every word
+        found = set(self.outputs[0])
+        state = 0
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
+
+    def match(self, word: str) -> tuple:
+        """
+        aspects of a word
+
+        Args:
+            word (str): token
+
+        Returns:
+            tuple: (aspect index, number of matching keywords) sorted by aspect index
+        """
+        result = self.memo.get(word)
+        if result is None:
+            counts = {}
+            for keywordId in self.scan(word.lower()):
+                for a, count in self.keywordAspects[keywordId].items():
+                    counts[a] = counts.get(a, 0) + count
+            result = self.memo[word] = tuple(sorted(counts.items()))
+        return result
+
+    def findAspects(self, tokens: list[list[str]]) -> list[tuple]:
+        """
+        all keyword matches of a review in the order of AspectAnnotator.findAspects: by aspect,
+        then sentence and word, one row for every matching keyword
+
+        Args:
+            tokens (list[list[str]]): tokens of every sentence of the review
+
+        Returns:
+            list[tuple]: (word_found, sent_idx, word_idx, aspect)
+        """
+        hits = []
+        for i, sent in enumerate(tokens):
+            for j, word in enumerate(sent):
+                for a, count in self.match(word):
+                    hits.append((a, i, j, word, count))
+        # stable, so sentence and word order is kept within every aspect
+        hits.sort(key=lambda hit: hit[0])
+
+        rows = []
+        for a, i, j, word, count in hits:
+            rows.extend([(word, i, j, self.aspects[a])] * count)
+        return rows
@@ -0,0 +1,119 @@
+import json
+import os
+from collections import OrderedDict
+
+
+class LemmaCache:
+    """
+    Memoizes GermaLemma lookups by (word, pos) in two layers
+
+    The first layer is a least recently used dict of maxSize entries. The optional second layer is
+    a json file with every lemma looked up so far, it is read once and written by save, so later
+    runs and other workers start with the lemmas of the earlier ones. GermaLemma itself takes about
+    a second to load its dictionary, it is only created on the first lookup both layers miss.
+    """
+
+    def __init__(self, filename: str = None, maxSize: int = 100000):
+        """
+        Constructor for LemmaCache class
+
+        Args:
+            filename (str, optional): json file of the persistent layer, None for memory only. Defaults to None.
+            maxSize (int, optional): entries of the in-process layer. Defaults to 100000.
+        """
+        self.filename = filename
+        self.maxSize = maxSize
+        self.lemmatizer = None
+        self.memory = OrderedDict()
+        self.persisted = None
+        self.added = {}
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(word: str, pos: str) -> str:
+        return pos + "\t" + word
+
+    def loadPersisted(self) -> dict:
+        if self.persisted is None:
+            self.persisted = {}
+            if self.filename is not None and os.path.exists(self.filename):
+                with open(self.filename, encoding="utf-8") as f:
+                    self.persisted = json.load(f)
+        return self.persisted
+
+    def loadLemmatizer(self) -> None:
+        """
+        load GermaLemma now instead of on the first miss, e.g. to keep the latency of a service low
+        """
+        if self.lemmatizer is None:
+            from germalemma import GermaLemma
+
+            self.lemmatizer = GermaLemma()
+
+    def findLemma(self, word: str, pos: str) -> str:
+        """
+        lemma of a word, like GermaLemma.find_lemma
+
+        Args:
+            word (str): the word
+            pos (str): part of speech of the word, e.g. "ADJ" or "ADV"
+
+        Returns:
+            str: the lemma
+        """
+        key = self.key(word, pos)
+        lemma = self.memory.get(key)
+        if lemma is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return lemma
+
+        lemma = self.loadPersisted().get(key)
+        if lemma is not None:
+            self.diskHits += 1
+        else:
+            self.misses += 1
+            self.loadLemmatizer()
+            lemma = self.lemmatizer.find_lemma(word, pos)
+            if self.filename is not None:
+                self.persisted[key] = self.added[key] = lemma
+
+        self.memory[key] = lemma
+        if len(self.memory) > self.maxSize:
+            self.memory.popitem(last=False)
+        return lemma
+
+    def save(self) -> None:
+        """
+        add the new lemmas to the file of the persistent layer, lemmas saved by others meanwhile are kept
+        """
+        if self.filename is None or not self.added:
+            return
+        persisted = {}
+        if os.path.exists(self.filename):
+            with open(self.filename, encoding="utf-8") as f:
+                persisted = json.load(f)
+        persisted.update(self.added)
+        with open(self.filename + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(persisted, f, ensure_ascii=False)
+        os.replace(self.filename + ".tmp", self.filename)
+        self.added = {}
+
+    def hitRate(self) -> float:
+        return (self.hits + self.diskHits) / max(
+            self.hits + self.diskHits + self.misses, 1
+        )
+
+    def __str__(self) -> str:
+        return (
+            "%d lemma lookups, %d memory hits, %d disk hits, %d lemmatized (%.1f%% hits)"
+            % (
+                self.hits + self.diskHits + self.misses,
+                self.hits,
+                self.diskHits,
+                self.misses,
+                100 * self.hitRate(),
+            )
+        )
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import re
+from functools import partial
+from operator import methodcaller
+
+specialCharacters = {
+    ord("ä"): "ae",
+    ord("ü"): "ue",
+    ord("ö"): "oe",
+    ord("ß"): "ss",
+}
+
+defaultStrings = [
+    r"[vV]on\s[\w\d-]+\s+(\(\d+\))?:",
+    r"[iI]st diese [mM]einung hilfreich(\?)?",
+    r"\d+\s\w+\s\d+(\s\w+)+\.(\s\w+)+\?",
+]
+
+
+class Normalizer:
+    """
+    Normalization plan compiled from the flags of the Preprocessor
+
+    All regular expressions and character substitutions are compiled once, a text is then normalized
+    by a single call of normalize(). The steps run in the same order as the separate Preprocessor
+    passes: default strings, special characters, non-alphanumeric characters, capitalization.
+    """
+
+    def __init__(
+        self,
+        rmdefault: bool = True,
+        substitutedict: dict = None,
+        rmnonalphanumeric: bool = True,
+        lower: bool = True,
+    ):
+        """
+        Constructor for Normalizer class
+
+        Args:
+            rmdefault (bool, optional): rm default phrase from the text. Defaults to True.
+            substitutedict (dict, optional): translate table of the special characters, None keeps them. Defaults to None.
+            rmnonalphanumeric (bool, optional): removeNonAlphanumeric. Defaults to True.
+            lower (bool, optional): remove capitalization. Defaults to True.
+        """
+        self.steps = []
+        if rmdefault:
+            self.steps.append(methodcaller("replace", "\n", " "))
+            self.steps.extend(
+                partial(re.compile(pattern).sub, " ") for pattern in defaultStrings
+            )
+
+        if substitutedict:
+            self.steps.append(self.compileSubstitution(substitutedict))
+
+        if rmnonalphanumeric:
+            self.steps.append(partial(re.compile(r"[^\w\s]").sub, " "))
+
+        if lower:
+            self.steps.append(str.lower)
+
+    def compileSubstitution(self, substitutedict: dict):
+        """
+        compile a translate table into chained str.replace calls, which are much faster than
+        str.translate for non-ascii text. Falls back to str.translate if a replacement contains
+        one of the substituted characters, since the calls would not be independent anymore.
+
+        Args:
+            substitutedict (dict): translate table, e.g. specialCharacters
+
+        Returns:
+            callable: function substituting the characters of a text
+        """
+        table = str.maketrans(substitutedict)
+        characters = {}
+        for key, value in table.items():
+            if value is None:
+                value = ""
+            elif isinstance(value, int):
+                value = chr(value)
+            characters[chr(key)] = value
+
+        if any(c in value for value in characters.values() for c in characters):
+            return methodcaller("translate", table)
+
+        replacements = [
+            methodcaller("replace", character, value)
+            for character, value in characters.items()
+        ]
+
+        def substitute(text: str) -> str:
+            for replace in replacements:
+                text = replace(text)
+            return text
+
+        return substitute
+
+    def normalize(self, text: str) -> str:
+        for step in self.steps:
+            text = step(text)
+        return text
+
+    def normalizeStream(self, texts):
+        """
+        normalize texts as they arrive
+
+        Args:
+            texts (iterable[str]): e.g. a generator reading reviews from disk
+
+        Yields:
+            str: normalized text
+        """
+        for text in texts:
+            yield self.normalize(text)
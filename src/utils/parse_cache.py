@@ -0,0 +1,77 @@
+from collections import OrderedDict
+
+
+class ParseCache:
+    """
+    Least recently used cache of parsed sentences, bounded by the number of tokens it holds
+
+    The rows of the annotator are sorted by review, so all aspects of a sentence are looked up
+    shortly after each other and a small cache parses every distinct sentence once. The memory of
+    a Doc grows with its tokens, so the limit is given in tokens rather than in sentences.
+    """
+
+    def __init__(self, maxTokens: int = 100000):
+        """
+        Constructor for ParseCache class
+
+        Args:
+            maxTokens (int, optional): tokens of all cached docs, 0 disables the cache. Defaults to 100000.
+        """
+        self.maxTokens = maxTokens
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def clear(self) -> None:
+        self.docs = OrderedDict()
+        self.tokens = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, parse):
+        """
+        get a parsed sentence, parse it on a miss
+
+        Args:
+            key (hashable): e.g. (reviewnumber, sent_idx)
+            parse (callable): returns the parsed sentence for a missing key
+
+        Returns:
+            spacy.tokens.Doc: the parsed sentence
+        """
+        doc = self.docs.get(key)
+        if doc is not None:
+            self.docs.move_to_end(key)
+            self.hits += 1
+            return doc
+
+        self.misses += 1
+        doc = parse()
+        if len(doc) > self.maxTokens:
+            return doc
+
+        self.docs[key] = doc
+        self.tokens += len(doc)
+        while self.tokens > self.maxTokens:
+            _, evicted = self.docs.popitem(last=False)
+            self.tokens -= len(evicted)
+            self.evictions += 1
+        return doc
+
+    def hitRate(self) -> float:
+        return self.hits / max(self.hits + self.misses, 1)
+
+    def __str__(self) -> str:
+        return (
+            "%d parses, %d cache hits (%.1f%%), %d evictions, %d sentences with %d tokens cached"
+            % (
+                self.misses,
+                self.hits,
+                100 * self.hitRate(),
+                self.evictions,
+                len(self.docs),
+                self.tokens,
+            )
+        )
@@ -8,6 +8,12 @@ import spacy
 from nltk.tokenize import sent_tokenize, word_tokenize
 from tqdm import tqdm
 
+from .chunked_store import isChunked, iterChunks, readDataset
+from .doc_store import DocStore
+from .normalizer import Normalizer, defaultStrings, specialCharacters
+from .resources import ResourceError, ResourceManager
+from .token_store import TokenStoreWriter
+
 
 class Preprocessor:
     """
@@ -23,6 +29,12 @@ class Preprocessor:
         lemmatize: bool = False,
         rmstopwords: bool = True,
         rmdefault: bool = True,
+        batchSize: int = 1000,
+        nProcess: int = 1,
+        storeDocs: bool = False,
+        docModel: str = "de_core_news_lg",
+        tokenStore: bool = False,
+        resources: ResourceManager = None,
     ):
         """
         Constructor for Preprocessor class
@@ -35,6 +47,12 @@ class Preprocessor:
             lemmatize (bool, optional): find the lemma of all words in text. Defaults to False.
             rmstopwords (bool, optional): rm stopwords from spacey stopword list. Defaults to True.
             rmdefault (bool, optional): rm default phrase from the text. Defaults to True.
+            batchSize (int, optional): sentences per batch of the spacy pipeline. Defaults to 1000.
+            nProcess (int, optional): worker processes of the spacy pipeline, -1 for all cores. Defaults to 1.
+            storeDocs (bool, optional): parse the sentences once with docModel and store the analyses. Defaults to False.
+            docModel (str, optional): spacy model for storeDocs. Defaults to "de_core_news_lg".
+            tokenStore (bool, optional): save the tokens in a TokenStore instead of a json column. Defaults to False.
+            resources (ResourceManager, optional): load nltk data and spacy models only from there. Defaults to None.
         """
 
         self.path = path
@@ -43,34 +61,71 @@ class Preprocessor:
         self.substituespecial = substituespecial
         self.rmstopwords = rmstopwords
         self.rmdefault = rmdefault
+        self.batchSize = batchSize
+        self.nProcess = nProcess
+        self.storeDocs = storeDocs
+        self.docModel = docModel
+        self.tokenStore = tokenStore
         self.stopwords = None
         self.substitutedict = {}
+        self.normalizer = None
         self.nlp = None
         self.normalizeColumn = "text_normalized"
         self.data = None
+        self.resources = resources
 
-        nltk.data.path.append(".venv/")
-        nltk.download("punkt", download_dir=".venv/")
+        if resources is not None:
+            resources.loadNltk("punkt")
+        else:
+            nltk.data.path.append(".venv/")
+            nltk.download("punkt", download_dir=".venv/")
 
     def loadCSV(self, filename: str = "data_raw.csv"):
         """
         read csv of self.path + filename, drop all invalid entries and create a normalized text column
 
         Args:
-            filename (str, optional): Defaults to "data_raw.csv".
+            filename (str, optional): csv file or directory of a chunked dataset. Defaults to "data_raw.csv".
         """
-        df_DataRaw = pd.read_csv(self.path + filename)
+        self.setRawData(readDataset(self.path + filename))
+
+    def setRawData(self, df_DataRaw: pd.DataFrame) -> None:
         df_DataRaw.dropna(inplace=True)
         df_DataRaw[self.normalizeColumn] = df_DataRaw["review_text_raw"]
         self.data = df_DataRaw
 
-    def saveCSV(self, filename: str = "data_preprocessed.csv"):
+    def iterRawChunks(self, filename: str = "data_raw.csv", chunkSize: int = 10000):
         """
-        safe the data as csv
+        read the raw data in parts of at most chunkSize rows, a chunked dataset in its own parts
+
+        Args:
+            filename (str, optional): csv file or directory of a chunked dataset. Defaults to "data_raw.csv".
+            chunkSize (int, optional): rows per part of a csv file. Defaults to 10000.
+
+        Returns:
+            iterator of pd.DataFrame
+        """
+        if isChunked(self.path + filename):
+            return iterChunks(self.path + filename)
+        return pd.read_csv(self.path + filename, chunksize=chunkSize)
+
+    def saveCSV(
+        self, filename: str = "data_preprocessed.csv", tokenDirname: str = "tokens/"
+    ):
+        """
+        safe the data as csv, with self.tokenStore the tokens are written to a TokenStore
 
         Args:
             filename (str, optional): Defaults to "data_preprocessed.csv".
+            tokenDirname (str, optional): directory of the TokenStore in self.path. Defaults to "tokens/".
         """
+        if self.tokenStore:
+            writer = TokenStoreWriter(self.path + tokenDirname)
+            writer.addMany(tqdm(self.data["tokens"], desc="Storing tokens.."))
+            writer.close()
+            self.data.drop(columns="tokens").to_csv(self.path + filename, index=False)
+            return
+
         tqdm.pandas(desc="JSON dumping tokens..")
         self.data["tokens"] = self.data["tokens"].progress_apply(
             lambda x: json.dumps(x)
@@ -128,20 +183,11 @@ class Preprocessor:
             bool: Successful exectuion of command
         """
         self.removeString("\n")
-        self.removeString(r"[vV]on\s[\w\d-]+\s+(\(\d+\))?:")
-        self.removeString(r"[iI]st diese [mM]einung hilfreich(\?)?")
-        self.removeString(r"\d+\s\w+\s\d+(\s\w+)+\.(\s\w+)+\?")
+        for regstring in defaultStrings:
+            self.removeString(regstring)
         return bool
 
-    def substitueSpecial(
-        self,
-        transldict: dict = {
-            ord("ä"): "ae",
-            ord("ü"): "ue",
-            ord("ö"): "oe",
-            ord("ß"): "ss",
-        },
-    ) -> bool:
+    def substitueSpecial(self, transldict: dict = specialCharacters) -> bool:
         """
         substitue the special characters for text and stopwords with their non utf-8 counterparts
 
@@ -157,6 +203,40 @@ class Preprocessor:
             lambda x: x.translate(self.substitutedict)
         )
 
+    def compileNormalizer(self) -> Normalizer:
+        """
+        compile the normalization flags given at initialization into a single Normalizer
+
+        Returns:
+            Normalizer: normalizer applying all configured steps in one pass
+        """
+        if self.substituespecial and not self.substitutedict:
+            self.substitutedict = specialCharacters
+
+        self.normalizer = Normalizer(
+            rmdefault=self.rmdefault,
+            substitutedict=self.substitutedict if self.substituespecial else None,
+            rmnonalphanumeric=self.rmnonalphanumeric,
+            lower=self.lower,
+        )
+        return self.normalizer
+
+    def normalize(self) -> bool:
+        """
+        normalize self.data[self.normalizeColumn] in a single pass, same result as calling
+        removeDefaultStrings, substitueSpecial, rmNonAlphaNumeric and removeCapitalization
+
+        Returns:
+            bool: Successful execution of command
+        """
+        if self.normalizer is None:
+            self.compileNormalizer()
+
+        self.data[self.normalizeColumn] = list(
+            self.normalizer.normalizeStream(self.data[self.normalizeColumn])
+        )
+        return True
+
     def tokenize(self) -> bool:
         """
         tokenize the series
@@ -168,10 +248,86 @@ class Preprocessor:
             return
 
         self.splitSentences()
-        tqdm.pandas(desc="Creating Word Tokens")
-        self.data["tokens"] = self.data["tokens"].progress_apply(
-            lambda x: [[t.text for t in self.nlp(i)] for i in x]
+        self.tokenizeSentences()
+
+    def tokenizeSentences(self) -> None:
+        """
+        tokenize the sentences of self.data["tokens"] in batches of self.batchSize with self.nProcess workers
+        """
+        sentences = [sentence for review in self.data["tokens"] for sentence in review]
+        docs = self.nlp.pipe(
+            sentences, batch_size=self.batchSize, n_process=self.nProcess
+        )
+        tokens = iter(
+            [
+                [t.text for t in doc]
+                for doc in tqdm(docs, total=len(sentences), desc="Creating Word Tokens")
+            ]
+        )
+
+        # nlp.pipe keeps the order of the sentences, so they can be regrouped by review
+        self.data["tokens"] = pd.Series(
+            [[next(tokens) for _ in review] for review in self.data["tokens"]],
+            index=self.data.index,
+        )
+
+    def parseDocs(
+        self, disableList: list[str] = ["ner", "textcat"], dirname: str = "docs/"
+    ) -> bool:
+        """
+        run the full pipeline of self.docModel once on every sentence of self.data["tokens"] and
+        store the analyses in a DocStore, so that the SentimentDetector doesn't need to parse again
+
+        Args:
+            disableList (list[str], optional): must match the SentimentDetector. Defaults to ["ner", "textcat"].
+            dirname (str, optional): directory of the DocStore in self.path. Defaults to "docs/".
+
+        Returns:
+            bool: Sucessful execution of command
+        """
+        parser = self.loadDocParser(disableList)
+        if parser is None:
+            return False
+
+        DocStore(self.path + dirname).write(self.iterDocs(parser), self.docModel)
+        return True
+
+    def loadDocParser(self, disableList: list[str] = ["ner", "textcat"]):
+        """
+        load self.docModel without replacing the tokenizer model in self.nlp
+
+        Args:
+            disableList (list[str], optional): must match the SentimentDetector. Defaults to ["ner", "textcat"].
+
+        Returns:
+            spacy.language.Language: the model or None if it couldn't be loaded
+        """
+        tokenizer = self.nlp
+        if not self.loadSpacyModel(self.docModel, disableList):
+            self.nlp = tokenizer
+            return None
+        parser, self.nlp = self.nlp, tokenizer
+        return parser
+
+    def iterDocs(self, parser):
+        """
+        parse the sentences of self.data["tokens"]
+
+        Args:
+            parser (spacy.language.Language): model returned by loadDocParser
+
+        Yields:
+            list[spacy.tokens.Doc]: parsed sentences of a review
+        """
+        # the SentimentDetector parses the joined tokens of a sentence, so the same is stored here
+        sentences = (
+            " ".join(sentence) for review in self.data["tokens"] for sentence in review
         )
+        docs = parser.pipe(
+            sentences, batch_size=self.batchSize, n_process=self.nProcess
+        )
+        for review in tqdm(self.data["tokens"], desc="Parsing Sentences"):
+            yield [next(docs) for _ in review]
 
     def loadSpacyModel(
         self,
@@ -185,6 +341,14 @@ class Preprocessor:
             model (str, optional): name of the mode. Defaults to "de_core_news_sm".
             disableList (list[str], optional): list of things to be disabled. Defaults to ["tagger", "parser", "ner"].
         """
+        if self.resources is not None:
+            try:
+                self.nlp = self.resources.loadSpacyModel(model, disableList)
+                return True
+            except ResourceError as e:
+                print(e)
+                return False
+
         try:
             self.nlp = spacy.load(model, disable=disableList)
             return True
@@ -220,16 +384,15 @@ class Preprocessor:
         Returns:
             bool: Sucessful execution of command
         """
-        if self.stopwords is not None:
-            return True
-
-        if not self.loadStopwords():
-            print("Skipping. Unable to loady Stopwords!")
+        if self.stopwords is None:
+            if not self.loadStopwords():
+                print("Skipping. Unable to loady Stopwords!")
+                return False
 
-        if self.substituespecial:
-            self.stopwords = {
-                word.translate(self.substitutedict) for word in self.stopwords
-            }
+            if self.substituespecial:
+                self.stopwords = {
+                    word.translate(self.substitutedict) for word in self.stopwords
+                }
 
         self.data["tokens"] = self.data["tokens"].apply(
             lambda s: [
@@ -237,6 +400,7 @@ class Preprocessor:
                 for sentence in s
             ]
         )
+        return True
 
     def prep(self) -> bool:
         """
@@ -248,22 +412,96 @@ class Preprocessor:
         if self.data is None or self.data.empty:
             self.loadCSV()
 
-        if self.rmdefault:
-            self.removeDefaultStrings()
+        self.normalize()
 
-        if self.substituespecial:
-            self.substitueSpecial()
+        if self.rmstopwords:
+            self.tokenize()
+            self.removeStopwords()
+        else:
+            self.tokenize()
 
-        if self.rmnonalphanumeric:
-            self.rmNonAlphaNumeric()
+        if self.storeDocs:
+            self.parseDocs()
 
-        if self.lower:
-            self.removeCapitalization()
+        return True
 
+    def prepChunk(self) -> None:
+        """
+        run the steps of prep on the current chunk in self.data, the spacy model is already loaded
+        """
+        self.normalize()
+        self.splitSentences()
+        self.tokenizeSentences()
         if self.rmstopwords:
-            self.tokenize()
             self.removeStopwords()
+
+    def prepChunked(
+        self,
+        rawFilename: str = "data_raw.csv",
+        filename: str = "data_preprocessed.csv",
+        chunkSize: int = 10000,
+        tokenDirname: str = "tokens/",
+        docDirname: str = "docs/",
+    ) -> bool:
+        """
+        stream the raw data through prep in chunks of chunkSize reviews and append every chunk to
+        the output, only one chunk is held in memory. The files written are the same as with
+        loadCSV, prep and saveCSV.
+
+        Args:
+            rawFilename (str, optional): csv file or directory of a chunked dataset. Defaults to "data_raw.csv".
+            filename (str, optional): Defaults to "data_preprocessed.csv".
+            chunkSize (int, optional): reviews per chunk. Defaults to 10000.
+            tokenDirname (str, optional): directory of the TokenStore in self.path. Defaults to "tokens/".
+            docDirname (str, optional): directory of the DocStore in self.path. Defaults to "docs/".
+
+        Returns:
+            bool: Sucessful execution of command
+        """
+        if not self.loadSpacyModel():
+            return False
+
+        parser = None
+        if self.storeDocs:
+            parser = self.loadDocParser()
+            if parser is None:
+                return False
+
+        writer = None
+        if self.tokenStore:
+            writer = TokenStoreWriter(self.path + tokenDirname)
+
+        def processChunks():
+            for i, chunk in enumerate(self.iterRawChunks(rawFilename, chunkSize)):
+                self.setRawData(chunk)
+                self.prepChunk()
+
+                if writer is not None:
+                    writer.addMany(self.data["tokens"])
+                    output = self.data.drop(columns="tokens")
+                else:
+                    output = self.data.assign(
+                        tokens=self.data["tokens"].map(json.dumps)
+                    )
+                output.to_csv(
+                    self.path + filename,
+                    mode="w" if i == 0 else "a",
+                    header=i == 0,
+                    index=False,
+                )
+                yield
+
+        if parser is not None:
+            # the DocStore shards span the chunks, the docs of a chunk are parsed after it is written
+            reviews = (
+                review for _ in processChunks() for review in self.iterDocs(parser)
+            )
+            DocStore(self.path + docDirname).write(reviews, self.docModel)
         else:
-            self.tokenize()
+            for _ in processChunks():
+                pass
 
+        if writer is not None:
+            writer.close()
+        self.data = None
         return True
@@ -0,0 +1,131 @@
+import os
+from array import array
+
+import numpy as np
+import pandas as pd
+
+
+class RecordBuffer:
+    """
+    Collects records column by column and turns them into a DataFrame in one go
+    """
+
+    def __init__(self, columns: list[str]):
+        """
+        Constructor for RecordBuffer class
+
+        Args:
+            columns (list[str]): names of the columns, every record needs a value for each of them
+        """
+        self.columns = columns
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.data[self.columns[0]])
+
+    def clear(self) -> None:
+        self.data = {column: [] for column in self.columns}
+
+    def append(self, record: dict) -> None:
+        """
+        append a single record to the buffer
+
+        Args:
+            record (dict): record with a value for every column
+        """
+        for column in self.columns:
+            self.data[column].append(record[column])
+
+    def extend(self, columns: dict) -> None:
+        """
+        append the values of several records at once
+
+        Args:
+            columns (dict): lists of values for every column, all of the same length
+        """
+        for column in self.columns:
+            self.data[column].extend(columns[column])
+
+    def toDataFrame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.data, columns=self.columns)
+
+    def flush(self, filename: str) -> int:
+        """
+        append the buffered records to a csv file and clear the buffer
+
+        Args:
+            filename (str): csv file, the header is written if it doesn't exist yet
+
+        Returns:
+            int: number of written records
+        """
+        size = len(self)
+        if size:
+            self.toDataFrame().to_csv(
+                filename, mode="a", header=not os.path.exists(filename), index=False
+            )
+            self.clear()
+        return size
+
+
+class RaggedBuffer:
+    """
+    Multi-valued columns of a fixed number of rows, stored as one flat list of values and the row
+    of every value per column instead of a python list in every cell
+
+    Values can be added to the rows in any order, offsets groups them by row once. Rows without
+    values cost nothing until the columns are formatted.
+    """
+
+    def __init__(self, numRows: int, columns: list[str]):
+        """
+        Constructor for RaggedBuffer class
+
+        Args:
+            numRows (int): number of rows
+            columns (list[str]): names of the multi-valued columns
+        """
+        self.numRows = numRows
+        self.columns = columns
+        self.values = {column: [] for column in columns}
+        self.rows = {column: array("q") for column in columns}
+
+    def add(self, column: str, row: int, value) -> None:
+        self.values[column].append(value)
+        self.rows[column].append(row)
+
+    def offsets(self, column: str) -> tuple:
+        """
+        the values of a column grouped by row, in the order they were added to each row
+
+        Args:
+            column (str): name of the column
+
+        Returns:
+            tuple: list of values and np.ndarray of numRows + 1 offsets, the values of row i are
+            values[offsets[i]:offsets[i + 1]]
+        """
+        rows = np.frombuffer(self.rows[column], dtype=np.int64)
+        values = self.values[column]
+        if len(rows) and np.any(np.diff(rows) < 0):
+            order = np.argsort(rows, kind="stable")
+            values = [values[i] for i in order]
+        counts = np.bincount(rows, minlength=self.numRows)
+        return values, np.concatenate([[0], np.cumsum(counts)])
+
+    def formatColumn(self, column: str, formatter) -> list:
+        """
+        one formatted value per row, e.g. str for "[0.5]" or json.dumps for '["gut"]'
+
+        Args:
+            column (str): name of the column
+            formatter (callable): formats the list of values of a row
+
+        Returns:
+            list: formatted rows, all empty rows share one object
+        """
+        values, offsets = self.offsets(column)
+        formatted = [formatter([])] * self.numRows
+        for row in np.flatnonzero(np.diff(offsets)).tolist():
+            formatted[row] = formatter(values[offsets[row] : offsets[row + 1]])
+        return formatted
@@ -0,0 +1,111 @@
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .http_cache import ResponseCache
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET request with the response recorded in the cache of the server
+    """
+
+    def do_GET(self) -> None:
+        response = self.server.cache.lookup(self.path)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        if random.random() < self.server.errorRate:
+            self.send_error(503, "Simulated server error")
+            return
+
+        if response is None:
+            self.send_error(404, "Request was not recorded")
+            return
+
+        self.send_response(response.status_code)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(response.content)))
+        self.end_headers()
+        self.wfile.write(response.content)
+
+    def log_message(self, format: str, *args) -> None:
+        # keep the progress bars of the scraper readable
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local stand-in for www.spieletipps.de that serves the responses of a ResponseCache
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        delay: float = 0.0,
+        errorRate: float = 0.0,
+    ):
+        """
+        Constructor for ReplayServer class
+
+        Args:
+            cache (ResponseCache): cache with the recorded responses
+            host (str, optional): Defaults to "127.0.0.1".
+            port (int, optional): port to listen on, 0 picks a free one. Defaults to 0.
+            delay (float, optional): seconds every response is delayed to simulate latency. Defaults to 0.0.
+            errorRate (float, optional): share of requests answered with HTTP 503. Defaults to 0.0.
+        """
+        super().__init__((host, port), ReplayHandler)
+        self.cache = cache
+        self.delay = delay
+        self.errorRate = errorRate
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def start(self) -> str:
+        """
+        serve in a background thread
+
+        Returns:
+            str: base url of the server
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded spieletipps responses")
+    parser.add_argument("--cache", default="src/data/http_cache/")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        ResponseCache(args.cache, mode="replay"),
+        args.host,
+        args.port,
+        args.delay,
+        args.error_rate,
+    )
+    print("Replaying %s on %s" % (args.cache, server.url))
+    server.serve_forever()
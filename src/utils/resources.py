@@ -0,0 +1,325 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+
+class ResourceError(Exception):
+    """
+    Raised if an asset is missing from the resource directory or doesn't match its checksums
+    """
+
+
+class ResourceManager:
+    """
+    Resolves the NLP assets (nltk data, spacy models, sentiment lexicon) from a local directory
+
+    Layout of the directory:
+        nltk/: nltk data directory, e.g. nltk/tokenizers/punkt/
+        spacy/<model>/: spacy model data, loaded by path
+        lexicon/<filename>: sentiment lexicon
+        manifest.json: sha256, size and mtime of every file of every asset
+        verified.json: mtimes of the files hashed on this machine, if the directory is writable
+
+    The assets are provisioned once on a machine with network access (see __main__) and copied
+    to the workers. At runtime nothing is downloaded unless offline=False. Files whose size and
+    mtime match the manifest or an earlier verification are trusted, others are hashed again and
+    compared. Verification never changes the manifest, the directory may be read-only.
+    """
+
+    manifestName = "manifest.json"
+    verifiedName = "verified.json"
+
+    def __init__(
+        self,
+        path: str = "src/data/resources/",
+        offline: bool = True,
+        verify: bool = True,
+    ):
+        """
+        Constructor for ResourceManager class
+
+        Args:
+            path (str, optional): directory of the assets. Defaults to "src/data/resources/".
+            offline (bool, optional): never download missing assets. Defaults to True.
+            verify (bool, optional): check the assets against the manifest. Defaults to True.
+        """
+        self.path = path
+        self.offline = offline
+        self.verify = verify
+        self.timings = {}
+        self.manifest = {}
+        if os.path.exists(os.path.join(path, self.manifestName)):
+            with open(os.path.join(path, self.manifestName)) as f:
+                self.manifest = json.load(f)
+        self.verified = {}
+        if os.path.exists(os.path.join(path, self.verifiedName)):
+            with open(os.path.join(path, self.verifiedName)) as f:
+                self.verified = json.load(f)
+
+    def saveVerified(self) -> None:
+        """
+        keep the mtimes of the hashed files, skipped if the directory is read-only
+        """
+        filename = os.path.join(self.path, self.verifiedName)
+        try:
+            with open(filename + ".tmp", "w") as f:
+                json.dump(self.verified, f, indent=1, sort_keys=True)
+            os.replace(filename + ".tmp", filename)
+        except OSError:
+            pass
+
+    def saveManifest(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        filename = os.path.join(self.path, self.manifestName)
+        with open(filename + ".tmp", "w") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(filename + ".tmp", filename)
+
+    @contextmanager
+    def timed(self, key: str):
+        """
+        add the time spent in the with block to self.timings[key]
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[key] = self.timings.get(key, 0.0) + (
+                time.perf_counter() - start
+            )
+
+    def report(self) -> str:
+        lines = ["%-32s %8s" % ("asset", "seconds")]
+        for key, seconds in sorted(self.timings.items(), key=lambda x: -x[1]):
+            lines.append("%-32s %8.3f" % (key, seconds))
+        lines.append("%-32s %8.3f" % ("total", sum(self.timings.values())))
+        return "\n".join(lines)
+
+    def assetPath(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    def filePath(self, key: str, name: str) -> str:
+        # single file assets have the file name ""
+        return os.path.join(self.assetPath(key), name) if name else self.assetPath(key)
+
+    @staticmethod
+    def sha256(filename: str) -> str:
+        digest = hashlib.sha256()
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def listFiles(self, key: str) -> list[str]:
+        path = self.assetPath(key)
+        if os.path.isfile(path):
+            return [""]
+        return sorted(
+            os.path.relpath(os.path.join(root, name), path)
+            for root, _, names in os.walk(path)
+            for name in names
+        )
+
+    def fileEntry(self, filename: str, checksum: str = None) -> dict:
+        stat = os.stat(filename)
+        return {
+            "sha256": checksum or self.sha256(filename),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+        }
+
+    def register(self, key: str, source: str = None) -> None:
+        """
+        copy an asset into the directory and record its checksums in the manifest
+
+        Args:
+            key (str): e.g. "spacy/de_core_news_lg" or "lexicon/sentiment_lexicon.csv"
+            source (str, optional): file or directory to copy, None if it is already in place. Defaults to None.
+        """
+        path = self.assetPath(key)
+        if source is not None:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.isdir(source):
+                shutil.copytree(source, path)
+            else:
+                shutil.copyfile(source, path)
+
+        self.manifest[key] = {
+            name: self.fileEntry(self.filePath(key, name))
+            for name in self.listFiles(key)
+        }
+        self.saveManifest()
+
+    def verifyAsset(self, key: str, full: bool = False) -> None:
+        """
+        check that an asset is complete and unchanged
+
+        Args:
+            key (str): key of the asset in the manifest
+            full (bool, optional): hash every file, even if its size and mtime are trusted. Defaults to False.
+
+        Raises:
+            ResourceError: if the asset is unknown, missing or modified
+        """
+        path = self.assetPath(key)
+        if key not in self.manifest or not os.path.exists(path):
+            raise ResourceError("%s is not in %s" % (key, self.path))
+        if not self.verify:
+            return
+
+        files = self.manifest[key]
+        if set(self.listFiles(key)) != set(files):
+            raise ResourceError("%s doesn't match the manifest" % key)
+
+        verified = self.verified.setdefault(key, {})
+        rehashed = False
+        for name, entry in files.items():
+            filename = self.filePath(key, name)
+            stat = os.stat(filename)
+            if stat.st_size != entry["size"]:
+                raise ResourceError("%s has a wrong size" % filename)
+            trusted = [entry["mtime"]]
+            if verified.get(name, {}).get("sha256") == entry["sha256"]:
+                trusted.append(verified[name]["mtime"])
+            if not full and stat.st_mtime_ns in trusted:
+                continue
+
+            # copied assets get new mtimes, they are hashed once and trusted afterwards
+            checksum = self.sha256(filename)
+            if checksum != entry["sha256"]:
+                raise ResourceError("%s has a wrong checksum" % filename)
+            verified[name] = {"sha256": checksum, "mtime": stat.st_mtime_ns}
+            rehashed = True
+
+        if rehashed:
+            self.saveVerified()
+
+    def resolve(self, key: str, provision) -> str:
+        """
+        path of a verified asset, provisioned first if it's missing and downloads are allowed
+        """
+        if key not in self.manifest and not self.offline:
+            provision()
+        self.verifyAsset(key)
+        return self.assetPath(key)
+
+    def loadSpacyModel(self, model: str, disableList: list[str] = []):
+        """
+        load a spacy model from the directory
+
+        Args:
+            model (str): name of the model, e.g. "de_core_news_lg"
+            disableList (list[str], optional): components to disable. Defaults to [].
+
+        Raises:
+            ResourceError: if the model isn't available
+
+        Returns:
+            spacy.language.Language: the loaded model
+        """
+        import spacy
+
+        key = "spacy/" + model
+        with self.timed(key):
+            path = self.resolve(key, lambda: self.provisionSpacyModel(model))
+            return spacy.load(path, disable=disableList)
+
+    def loadNltk(self, package: str = "punkt", category: str = "tokenizers") -> str:
+        """
+        make the nltk data in the directory available to nltk, nothing is downloaded
+
+        Args:
+            package (str, optional): name of the nltk package. Defaults to "punkt".
+            category (str, optional): nltk data category of the package. Defaults to "tokenizers".
+
+        Returns:
+            str: the nltk data directory
+        """
+        import nltk
+
+        key = "nltk/%s/%s" % (category, package)
+        with self.timed(key):
+            self.resolve(key, lambda: self.provisionNltk(package, category))
+            path = self.assetPath("nltk")
+            if path not in nltk.data.path:
+                nltk.data.path.insert(0, path)
+            return path
+
+    def lexiconPath(self, filename: str = "sentiment_lexicon.csv") -> str:
+        key = "lexicon/" + filename
+        with self.timed(key):
+            return self.resolve(key, lambda: self.provisionLexicon(filename))
+
+    def provisionSpacyModel(self, model: str) -> None:
+        import spacy
+
+        try:
+            spacy.util.get_package_path(model)
+        except Exception:
+            spacy.cli.download(model)
+        # the package directory contains the versioned model data next to its python files
+        configs = glob.glob(
+            os.path.join(str(spacy.util.get_package_path(model)), "*", "config.cfg")
+        )
+        if not configs:
+            raise ResourceError("No model data found for %s" % model)
+        self.register("spacy/" + model, os.path.dirname(configs[0]))
+
+    def provisionNltk(self, package: str = "punkt", category: str = "tokenizers"):
+        import nltk
+
+        if not nltk.download(package, download_dir=self.assetPath("nltk")):
+            raise ResourceError("Unable to download nltk package %s" % package)
+        zipfile = self.assetPath("nltk/%s/%s.zip" % (category, package))
+        if os.path.exists(zipfile):
+            os.remove(zipfile)
+        self.register("nltk/%s/%s" % (category, package))
+
+    def provisionLexicon(
+        self,
+        filename: str = "sentiment_lexicon.csv",
+        url: str = "https://raw.githubusercontent.com/sebastiansauer/pradadata/master/data-raw/germanlex.csv",
+    ) -> None:
+        import requests
+
+        response = requests.get(url, timeout=60)
+        response.raise_for_status()
+        path = self.assetPath("lexicon/" + filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(response.content)
+        self.register("lexicon/" + filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Provision or verify the local NLP resource directory"
+    )
+    parser.add_argument("--path", default="src/data/resources/")
+    parser.add_argument("--spacy", nargs="*", default=[])
+    parser.add_argument("--nltk", nargs="*", default=[])
+    parser.add_argument("--lexicon", action="store_true")
+    parser.add_argument(
+        "--verify", action="store_true", help="hash every file of every asset"
+    )
+    args = parser.parse_args()
+
+    resources = ResourceManager(args.path)
+    for model in args.spacy:
+        resources.provisionSpacyModel(model)
+    for package in args.nltk:
+        resources.provisionNltk(package)
+    if args.lexicon:
+        resources.provisionLexicon()
+    if args.verify:
+        for key in sorted(resources.manifest):
+            with resources.timed(key):
+                resources.verifyAsset(key, full=True)
+        print(resources.report())
@@ -0,0 +1,297 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+
+class RequestFailedError(Exception):
+    """
+    Raised if a request still fails after all retries
+    """
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter, shared by all threads
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Constructor for TokenBucket class
+
+        Args:
+            rate (float): tokens added per second
+            capacity (float, optional): maximum number of tokens (burst size). Defaults to rate.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        take tokens from the bucket, waits until enough tokens are available
+
+        Args:
+            tokens (float, optional): Defaults to 1.0.
+
+        Returns:
+            float: seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.last) * self.rate
+                )
+                self.last = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait = (tokens - self.tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+
+class HostLimiter:
+    """
+    Limits the requests in flight to a host, the limit adapts to latency and errors (AIMD):
+    it grows by one per window of fast successful requests and is halved on errors or slow responses
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        targetLatency: float = 1.0,
+    ):
+        """
+        Constructor for HostLimiter class
+
+        Args:
+            initial (int, optional): initial concurrency. Defaults to 4.
+            minimum (int, optional): lower bound of the concurrency. Defaults to 1.
+            maximum (int, optional): upper bound of the concurrency. Defaults to 16.
+            targetLatency (float, optional): seconds, slower responses reduce the concurrency. Defaults to 1.0.
+        """
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.targetLatency = targetLatency
+        self.inflight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self.condition:
+            while self.inflight >= int(self.limit):
+                self.condition.wait()
+            self.inflight += 1
+
+    def release(self, latency: float, success: bool) -> None:
+        """
+        free the slot of a finished request and adapt the limit
+
+        Args:
+            latency (float): seconds the request took
+            success (bool): False for throttling, server errors and connection errors
+        """
+        with self.condition:
+            self.inflight -= 1
+            if not success or latency > 2 * self.targetLatency:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif latency <= self.targetLatency:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+
+class SchedulerStats:
+    """
+    Thread safe counters of a RequestScheduler
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "throttled": 0,
+            "bytes": 0,
+            "latency": 0.0,
+        }
+
+    def add(self, **counts) -> None:
+        with self.lock:
+            for key, value in counts.items():
+                self.counters[key] += value
+
+    def __getitem__(self, key: str):
+        return self.counters[key]
+
+    def __str__(self) -> str:
+        with self.lock:
+            counters = dict(self.counters)
+        meanLatency = counters["latency"] / max(counters["requests"], 1)
+        return (
+            "%(requests)d requests, %(retries)d retries, %(failures)d failures, "
+            "%(throttled)d throttled, %(bytes)d bytes" % counters
+            + ", %.3fs mean latency" % meanLatency
+        )
+
+
+class RequestScheduler:
+    """
+    Sends requests with a global rate limit, adaptive concurrency per host and
+    retries with exponential backoff and jitter
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: float = None,
+        maxRetries: int = 5,
+        backoffBase: float = 0.5,
+        backoffMax: float = 30.0,
+        initialConcurrency: int = 4,
+        maxConcurrency: int = 16,
+        targetLatency: float = 1.0,
+        timeout: float = 30.0,
+    ):
+        """
+        Constructor for RequestScheduler class
+
+        Args:
+            rate (float, optional): requests per second, None disables the rate limit. Defaults to 10.0.
+            burst (float, optional): requests that may be sent at once. Defaults to rate.
+            maxRetries (int, optional): retries of a failed request. Defaults to 5.
+            backoffBase (float, optional): seconds waited before the first retry. Defaults to 0.5.
+            backoffMax (float, optional): upper bound of the backoff in seconds. Defaults to 30.0.
+            initialConcurrency (int, optional): requests in flight per host at the start. Defaults to 4.
+            maxConcurrency (int, optional): upper bound of requests in flight per host. Defaults to 16.
+            targetLatency (float, optional): seconds, slower responses reduce the concurrency. Defaults to 1.0.
+            timeout (float, optional): seconds until a request is aborted. Defaults to 30.0.
+        """
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.maxRetries = maxRetries
+        self.backoffBase = backoffBase
+        self.backoffMax = backoffMax
+        self.initialConcurrency = initialConcurrency
+        self.maxConcurrency = maxConcurrency
+        self.targetLatency = targetLatency
+        self.timeout = timeout
+        self.stats = SchedulerStats()
+        self.limiters = {}
+        self.lock = threading.Lock()
+
+    def getLimiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.limiters:
+                self.limiters[host] = HostLimiter(
+                    self.initialConcurrency,
+                    maximum=self.maxConcurrency,
+                    targetLatency=self.targetLatency,
+                )
+            return self.limiters[host]
+
+    def backoff(self, attempt: int, retryAfter: str = None) -> float:
+        """
+        seconds to wait before the next attempt (exponential backoff with full jitter)
+
+        Args:
+            attempt (int): number of the failed attempt, starting at 0
+            retryAfter (str, optional): Retry-After header of the response. Defaults to None.
+
+        Returns:
+            float: seconds
+        """
+        delay = random.uniform(0, min(self.backoffMax, self.backoffBase * 2**attempt))
+        if retryAfter is not None and retryAfter.isdigit():
+            delay = max(delay, min(self.backoffMax, float(retryAfter)))
+        return delay
+
+    def attempt(
+        self, session: requests.Session, url: str, params: dict, validate
+    ) -> tuple:
+        """
+        send a request once
+
+        Returns:
+            tuple[requests.Response, str]: the response (None on connection errors) and
+                the reason why it has to be retried (None if it succeeded)
+        """
+        try:
+            response = session.get(url, params=params, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            return None, str(e)
+
+        if response.status_code in self.RETRY_STATUS:
+            return response, "HTTP %d" % response.status_code
+
+        if validate is not None and response.status_code < 400:
+            try:
+                validate(response.text)
+            except ValueError as e:
+                return response, "invalid body: %s" % e
+        return response, None
+
+    def get(
+        self, session: requests.Session, url: str, params: dict = None, validate=None
+    ) -> requests.Response:
+        """
+        GET a url, retrying connection errors, throttling, server errors and invalid bodies,
+        other client errors (e.g. 404) fail right away
+
+        Args:
+            session (requests.Session): session used for the request
+            url (str): url of the request
+            params (dict, optional): query parameters. Defaults to None.
+            validate (callable, optional): called with the text of a successful response, raising
+                a ValueError marks the body as invalid (e.g. json.loads). Defaults to None.
+
+        Raises:
+            RequestFailedError: if the request failed maxRetries + 1 times or with a client error
+
+        Returns:
+            requests.Response: the response
+        """
+        limiter = self.getLimiter(url)
+        for attempt in range(self.maxRetries + 1):
+            if self.bucket is not None:
+                self.bucket.acquire()
+            limiter.acquire()
+            start = time.monotonic()
+            response, error = self.attempt(session, url, params, validate)
+            latency = time.monotonic() - start
+            limiter.release(latency, error is None)
+
+            self.stats.add(requests=1, latency=latency)
+            if response is not None:
+                self.stats.add(bytes=len(response.content))
+            if error is None and response.status_code >= 400:
+                # client errors like 404 don't go away by retrying
+                self.stats.add(failures=1)
+                raise RequestFailedError(
+                    "%s failed: HTTP %d" % (url, response.status_code)
+                )
+            if error is None:
+                return response
+
+            retryAfter = None
+            if response is not None and response.status_code == 429:
+                self.stats.add(throttled=1)
+                retryAfter = response.headers.get("Retry-After")
+            if attempt < self.maxRetries:
+                self.stats.add(retries=1)
+                time.sleep(self.backoff(attempt, retryAfter))
+
+        self.stats.add(failures=1)
+        raise RequestFailedError("%s failed: %s" % (url, error))
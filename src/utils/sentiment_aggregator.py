@@ -0,0 +1,79 @@
+import math
+
+import pandas as pd
+
+
+class SentimentAggregator:
+    """
+    Running means of the sentiment of every review and of every aspect of a review
+
+    Rows are added as soon as they are detected, so the score of a review is available without
+    the table of all aspect rows. The sentiment of a row is the mean of its polarities, a review
+    (or aspect of a review) gets the mean of its rows with a sentiment, like the grouped means of
+    SentimentDetector.returnSentimentsforReviews.
+    """
+
+    def __init__(self):
+        # [sum, count] of the row sentiments by reviewnumber and by (reviewnumber, aspect)
+        self.reviews = {}
+        self.aspects = {}
+
+    def __len__(self) -> int:
+        return len(self.reviews)
+
+    def add(self, reviewnumber: int, aspect: str, sentiment: float) -> None:
+        """
+        add the sentiment of an aspect row
+
+        Args:
+            reviewnumber (int): review of the row
+            aspect (str): aspect of the row
+            sentiment (float): mean polarity of the row, nan if it has none
+        """
+        for totals, key in [
+            (self.reviews, reviewnumber),
+            (self.aspects, (reviewnumber, aspect)),
+        ]:
+            total = totals.setdefault(key, [0.0, 0])
+            if not math.isnan(sentiment):
+                total[0] += sentiment
+                total[1] += 1
+
+    @staticmethod
+    def mean(total: list) -> float:
+        return total[0] / total[1] if total[1] else math.nan
+
+    def reviewSentiment(self, reviewnumber: int) -> float:
+        return self.mean(self.reviews.get(reviewnumber, [0.0, 0]))
+
+    def aspectSentiment(self, reviewnumber: int, aspect: str) -> float:
+        return self.mean(self.aspects.get((reviewnumber, aspect), [0.0, 0]))
+
+    def reviewFrame(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: review_number and sentiment sorted by review
+        """
+        reviews = sorted(self.reviews)
+        return pd.DataFrame(
+            {
+                "review_number": reviews,
+                "sentiment": [self.mean(self.reviews[r]) for r in reviews],
+            },
+            columns=["review_number", "sentiment"],
+        )
+
+    def aspectFrame(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: review_number, aspect and sentiment sorted by review and aspect
+        """
+        keys = sorted(self.aspects)
+        return pd.DataFrame(
+            {
+                "review_number": [key[0] for key in keys],
+                "aspect": [key[1] for key in keys],
+                "sentiment": [self.mean(self.aspects[key]) for key in keys],
+            },
+            columns=["review_number", "aspect", "sentiment"],
+        )
@@ -0,0 +1,144 @@
+import json
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+# polarity: signed polarity of the word as a descriptor
+# multiplier: factor of the word as an intensifier (INT) or shifter (SHI), None for other words
+# shifter: whenever the multiplier comes from a shifter
+LexiconEntry = namedtuple("LexiconEntry", ["polarity", "multiplier", "shifter"])
+
+
+class SentimentLexicon:
+    """
+    The germanlex sentiment lexicon compiled into a dict from word to LexiconEntry
+
+    A word can be listed with several qualifiers. The detector takes the first POS or NEG row as
+    its polarity and the first INT or SHI row as its multiplier, this choice is made once here
+    instead of for every lookup. The compiled table is cached as json next to the data and is
+    used as long as size and mtime of the lexicon csv don't change.
+    """
+
+    version = 2
+
+    def __init__(self, entries: dict = None):
+        """
+        Constructor for SentimentLexicon class
+
+        Args:
+            entries (dict, optional): LexiconEntry by word. Defaults to None.
+        """
+        self.entries = entries or {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.entries
+
+    def get(self, word: str) -> LexiconEntry:
+        return self.entries.get(word)
+
+    @staticmethod
+    def compileEntry(qualifiers: list, polarities: list) -> LexiconEntry:
+        """
+        resolve the rows of a word in the order of the lexicon
+
+        Args:
+            qualifiers (list): qualifier of every row, e.g. "POS", "NEG", "INT", "SHI"
+            polarities (list): polarity_strength of every row
+
+        Returns:
+            LexiconEntry: the resolved entry
+        """
+        if len(qualifiers) == 1:
+            polarity = -polarities[0] if qualifiers[0] == "NEG" else polarities[0]
+        else:
+            polarity = 0.0
+            for qualifier, strength in zip(qualifiers, polarities):
+                if qualifier in ["POS", "NEG"]:
+                    polarity = -strength if qualifier == "NEG" else strength
+                    break
+
+        multiplier, shifter = None, False
+        for qualifier, strength in zip(qualifiers, polarities):
+            if qualifier == "INT":
+                multiplier = strength
+                break
+            if qualifier == "SHI":
+                multiplier, shifter = -1.0, True
+                break
+        return LexiconEntry(polarity, multiplier, shifter)
+
+    @classmethod
+    def fromDataFrame(cls, df: pd.DataFrame):
+        """
+        compile the lexicon from its rows
+
+        Args:
+            df (pd.DataFrame): columns word, qualifier and polarity_strength
+
+        Returns:
+            SentimentLexicon: the compiled lexicon
+        """
+        df = df.drop_duplicates(subset=["word", "qualifier"])
+        rows = {}
+        for word, qualifier, strength in zip(
+            df["word"], df["qualifier"], df["polarity_strength"].astype(float)
+        ):
+            qualifiers, polarities = rows.setdefault(word, ([], []))
+            qualifiers.append(qualifier)
+            polarities.append(strength)
+
+        return cls(
+            {
+                word: cls.compileEntry(qualifiers, polarities)
+                for word, (qualifiers, polarities) in rows.items()
+                if isinstance(word, str)
+            }
+        )
+
+    @staticmethod
+    def sourceKey(filename: str) -> dict:
+        stat = os.stat(filename)
+        return {
+            "file": os.path.abspath(filename),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "version": SentimentLexicon.version,
+        }
+
+    def save(self, filename: str, source: dict) -> None:
+        # one list per field, json reads a few long lists much faster than many short ones
+        columns = {"source": source, "words": list(self.entries)}
+        for i, field in enumerate(LexiconEntry._fields):
+            columns[field] = [entry[i] for entry in self.entries.values()]
+        with open(filename + ".tmp", "w") as f:
+            json.dump(columns, f)
+        os.replace(filename + ".tmp", filename)
+
+    @classmethod
+    def load(cls, csvFilename: str, cacheFilename: str = None):
+        """
+        load the compiled lexicon of a csv from its cache, compile and cache it if it's outdated
+
+        Args:
+            csvFilename (str): the germanlex csv
+            cacheFilename (str, optional): the compiled table, None to always compile. Defaults to None.
+
+        Returns:
+            SentimentLexicon: the compiled lexicon
+        """
+        source = cls.sourceKey(csvFilename)
+        if cacheFilename is not None and os.path.exists(cacheFilename):
+            with open(cacheFilename) as f:
+                cached = json.load(f)
+            if cached["source"] == source:
+                fields = [cached[field] for field in LexiconEntry._fields]
+                return cls(dict(zip(cached["words"], map(LexiconEntry, *fields))))
+
+        lexicon = cls.fromDataFrame(pd.read_csv(csvFilename))
+        if cacheFilename is not None:
+            lexicon.save(cacheFilename, source)
+        return lexicon
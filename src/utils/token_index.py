@@ -0,0 +1,223 @@
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from .keyword_matcher import KeywordMatcher
+from .token_store import TokenStore
+
+
+class TokenIndex:
+    """
+    Inverted index from every distinct token of a TokenStore to its (review, sentence, word) positions
+
+    Files of the index:
+        reviews.npy, sentences.npy, words.npy: int32 positions of all tokens, grouped by token
+        offsets.npy: int64 position of the first entry of every token (plus end)
+        meta.json: sizes and checksum of the TokenStore the index was built from
+
+    The tokens themselves are the vocabulary of the TokenStore, so the index ids are its ids.
+    Queries match the lowercased tokens, "*" stands for any number of characters:
+    "steuerung" is an exact match, "steuerung*" a prefix and "*steuer*" a substring query.
+    """
+
+    def __init__(self, path: str = "src/data/token_index/"):
+        """
+        Constructor for TokenIndex class
+
+        Args:
+            path (str, optional): directory of the index. Defaults to "src/data/token_index/".
+        """
+        self.path = path
+        self.meta = None
+        self.vocab = None
+
+    @classmethod
+    def build(cls, tokenStore: TokenStore, path: str = "src/data/token_index/"):
+        """
+        index all tokens of a loaded TokenStore
+
+        Args:
+            tokenStore (TokenStore): the tokens
+            path (str, optional): directory of the index. Defaults to "src/data/token_index/".
+
+        Returns:
+            TokenIndex: the loaded index
+        """
+        ids = np.asarray(tokenStore.ids)
+        sentOffsets = np.asarray(tokenStore.sentOffsets)
+        reviewOffsets = np.asarray(tokenStore.reviewOffsets)
+
+        # position of every token, computed from the offsets of the store
+        sentences = np.repeat(
+            np.arange(len(sentOffsets) - 1, dtype=np.int64), np.diff(sentOffsets)
+        )
+        reviewOfSentence = np.repeat(
+            np.arange(len(reviewOffsets) - 1, dtype=np.int32), np.diff(reviewOffsets)
+        )
+        words = np.arange(len(ids), dtype=np.int64) - sentOffsets[sentences]
+
+        # stable, so the positions of a token stay in corpus order
+        order = np.argsort(ids, kind="stable")
+        counts = np.bincount(ids, minlength=len(tokenStore.vocab))
+
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        np.save(
+            os.path.join(path, "reviews.npy"),
+            reviewOfSentence[sentences[order]].astype(np.int32),
+        )
+        np.save(
+            os.path.join(path, "sentences.npy"),
+            (sentences - reviewOffsets[reviewOfSentence[sentences]])[order].astype(
+                np.int32
+            ),
+        )
+        np.save(os.path.join(path, "words.npy"), words[order].astype(np.int32))
+        np.save(
+            os.path.join(path, "offsets.npy"),
+            np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+        )
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(tokenStore.meta, f)
+
+        index = cls(path)
+        index.load(tokenStore)
+        return index
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "meta.json"))
+
+    def load(self, tokenStore: TokenStore) -> bool:
+        """
+        open the index of a loaded TokenStore
+
+        Args:
+            tokenStore (TokenStore): the store the index was built from
+
+        Returns:
+            bool: whenever an index of this store was found
+        """
+        if not self.exists():
+            return False
+        with open(os.path.join(self.path, "meta.json")) as f:
+            self.meta = json.load(f)
+        # stores written without a checksum can't be told apart from another corpus of the same size
+        if "checksum" not in tokenStore.meta or self.meta != tokenStore.meta:
+            return False
+
+        for name in ["reviews", "sentences", "words", "offsets"]:
+            setattr(
+                self,
+                name,
+                np.load(os.path.join(self.path, name + ".npy"), mmap_mode="r"),
+            )
+        self.vocab = tokenStore.vocab
+        self.vocabArray = np.array(self.vocab, dtype=object)
+
+        # all lowercased tokens in one string, so queries are a single regex search
+        self.lowerVocab = "\n".join(word.lower() for word in self.vocab)
+        self.lineStarts = np.cumsum([0] + [len(word) + 1 for word in self.vocab[:-1]])
+        return True
+
+    def findTokens(self, pattern: str) -> np.ndarray:
+        """
+        ids of the tokens matching a query
+
+        Args:
+            pattern (str): lowercase query, "*" matches any characters
+
+        Returns:
+            np.ndarray: token ids in ascending order
+        """
+        if not self.vocab:
+            return np.zeros(0, dtype=np.int64)
+        regex = "[^\n]*".join(re.escape(part) for part in pattern.split("*"))
+        starts = [
+            match.start()
+            for match in re.finditer("^%s$" % regex, self.lowerVocab, re.MULTILINE)
+        ]
+        return np.searchsorted(self.lineStarts, starts, side="right") - 1
+
+    def positions(self, tokenIds) -> np.ndarray:
+        """
+        indices into the position arrays of all occurrences of the tokens
+        """
+        tokenIds = np.asarray(tokenIds, dtype=np.int64)
+        starts = np.asarray(self.offsets[tokenIds])
+        counts = np.asarray(self.offsets[tokenIds + 1]) - starts
+        return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(
+            counts.sum()
+        )
+
+    def query(self, pattern: str) -> pd.DataFrame:
+        """
+        all positions of the tokens matching a query
+
+        Args:
+            pattern (str): e.g. "steuerung*"
+
+        Returns:
+            pd.DataFrame: reviewnumber, sent_idx, word_idx and word sorted by position
+        """
+        tokenIds = self.findTokens(pattern)
+        counts = np.asarray(self.offsets[tokenIds + 1] - self.offsets[tokenIds])
+        entries = self.positions(tokenIds)
+        result = pd.DataFrame(
+            {
+                "reviewnumber": self.reviews[entries],
+                "sent_idx": self.sentences[entries],
+                "word_idx": self.words[entries],
+                "word": self.vocabArray[np.repeat(tokenIds, counts)],
+            }
+        )
+        return result.sort_values(
+            ["reviewnumber", "sent_idx", "word_idx"], kind="stable"
+        ).reset_index(drop=True)
+
+    def annotate(self, keyWords: dict) -> pd.DataFrame:
+        """
+        the aspect rows of AspectAnnotator.annotate from the index instead of a scan of the corpus
+
+        Args:
+            keyWords (dict): lists of keywords by aspect
+
+        Returns:
+            pd.DataFrame: reviewnumber, word_found, sent_idx, word_idx and aspect in the order of the annotator
+        """
+        matcher = KeywordMatcher(keyWords)
+        tokenIds, aspects, repeats = [], [], []
+        for tokenId, word in enumerate(self.vocab):
+            for a, count in matcher.match(word):
+                tokenIds.append(tokenId)
+                aspects.append(a)
+                repeats.append(count)
+
+        tokenIds = np.asarray(tokenIds, dtype=np.int64)
+        counts = np.asarray(self.offsets[tokenIds + 1] - self.offsets[tokenIds])
+        entries = self.positions(tokenIds)
+        # every occurrence is repeated once per matching keyword, like the annotator loop
+        repeats = np.repeat(np.asarray(repeats, dtype=np.int64), counts)
+        entries = np.repeat(entries, repeats)
+        aspectIdx = np.repeat(
+            np.repeat(np.asarray(aspects, dtype=np.int64), counts), repeats
+        )
+        wordIds = np.repeat(np.repeat(tokenIds, counts), repeats)
+
+        reviews = np.asarray(self.reviews[entries])
+        sentences = np.asarray(self.sentences[entries])
+        words = np.asarray(self.words[entries])
+        order = np.lexsort((words, sentences, aspectIdx, reviews))
+        return pd.DataFrame(
+            {
+                "reviewnumber": reviews[order],
+                "word_found": self.vocabArray[wordIds[order]],
+                "sent_idx": sentences[order],
+                "word_idx": words[order],
+                "aspect": np.array(matcher.aspects, dtype=object)[aspectIdx[order]],
+            }
+        )
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+class TokenStoreWriter:
+    """
+    Writes tokenized reviews into a TokenStore directory, review by review
+
+    Files of the store:
+        ids.bin: int32 vocabulary id of every token of the corpus
+        sent_offsets.bin: int64 position of the first token of every sentence (plus end)
+        review_offsets.bin: int64 position of the first sentence of every review (plus end)
+        vocab.bin, vocab_offsets.bin: utf-8 bytes of all distinct tokens and their int64 offsets
+        meta.json: sizes and checksum of the store, written by close() and marking the store as complete
+    """
+
+    files = [
+        "ids.bin",
+        "sent_offsets.bin",
+        "review_offsets.bin",
+        "vocab.bin",
+        "vocab_offsets.bin",
+    ]
+
+    def __init__(self, path: str, bufferSize: int = 1000000):
+        """
+        Constructor for TokenStoreWriter class, an existing store at path is replaced
+
+        Args:
+            path (str): directory of the store
+            bufferSize (int, optional): tokens collected before they are written. Defaults to 1000000.
+        """
+        self.path = path
+        self.bufferSize = bufferSize
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+
+        self.vocab = {}
+        self.numTokens = 0
+        self.numSentences = 0
+        self.numReviews = 0
+        self.vocabBytes = 0
+        # sha256 of every file, updated with the bytes as they are written
+        self.hashes = {filename: hashlib.sha256() for filename in self.files}
+        self.clearBuffers()
+
+        self.sentOffsets.append(0)
+        self.reviewOffsets.append(0)
+        self.vocabOffsets.append(0)
+
+    def clearBuffers(self) -> None:
+        self.ids = []
+        self.sentOffsets = []
+        self.reviewOffsets = []
+        self.vocabWords = []
+        self.vocabOffsets = []
+
+    def add(self, review: list[list[str]]) -> None:
+        """
+        append a tokenized review
+
+        Args:
+            review (list[list[str]]): tokens of every sentence
+        """
+        for sentence in review:
+            for token in sentence:
+                tokenId = self.vocab.get(token)
+                if tokenId is None:
+                    tokenId = self.vocab[token] = len(self.vocab)
+                    encoded = token.encode("utf-8")
+                    self.vocabWords.append(encoded)
+                    self.vocabBytes += len(encoded)
+                    self.vocabOffsets.append(self.vocabBytes)
+                self.ids.append(tokenId)
+            self.numTokens += len(sentence)
+            self.sentOffsets.append(self.numTokens)
+        self.numSentences += len(review)
+        self.reviewOffsets.append(self.numSentences)
+        self.numReviews += 1
+
+        if len(self.ids) >= self.bufferSize:
+            self.flush()
+
+    def addMany(self, reviews) -> None:
+        for review in reviews:
+            self.add(review)
+
+    def flush(self) -> None:
+        """
+        append the collected tokens, offsets and new words to the files
+        """
+        for filename, content in [
+            ("ids.bin", np.asarray(self.ids, dtype=np.int32).tobytes()),
+            (
+                "sent_offsets.bin",
+                np.asarray(self.sentOffsets, dtype=np.int64).tobytes(),
+            ),
+            (
+                "review_offsets.bin",
+                np.asarray(self.reviewOffsets, dtype=np.int64).tobytes(),
+            ),
+            ("vocab.bin", b"".join(self.vocabWords)),
+            (
+                "vocab_offsets.bin",
+                np.asarray(self.vocabOffsets, dtype=np.int64).tobytes(),
+            ),
+        ]:
+            with open(os.path.join(self.path, filename), "ab") as f:
+                f.write(content)
+            self.hashes[filename].update(content)
+        self.clearBuffers()
+
+    def close(self) -> None:
+        self.flush()
+        meta = {
+            "reviews": self.numReviews,
+            "sentences": self.numSentences,
+            "tokens": self.numTokens,
+            "vocab": len(self.vocab),
+            # identifies the content, stores of different corpora can have the same sizes
+            "checksum": hashlib.sha256(
+                b"".join(self.hashes[filename].digest() for filename in self.files)
+            ).hexdigest(),
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+
+class TokenStore:
+    """
+    Read-only, memory mapped view of the tokenized reviews written by TokenStoreWriter
+
+    Only the vocabulary is decoded when the store is loaded, the token ids and offsets stay on disk
+    and are shared through the page cache by all processes reading the store.
+    """
+
+    def __init__(self, path: str = "src/data/tokens/"):
+        """
+        Constructor for TokenStore class
+
+        Args:
+            path (str, optional): directory of the store. Defaults to "src/data/tokens/".
+        """
+        self.path = path
+        self.meta = None
+        self.vocab = None
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "meta.json"))
+
+    def openArray(self, filename: str, dtype) -> np.ndarray:
+        filename = os.path.join(self.path, filename)
+        if os.path.getsize(filename) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(filename, dtype=dtype, mode="r")
+
+    def load(self) -> bool:
+        """
+        open the store
+
+        Returns:
+            bool: whenever a complete store was found
+        """
+        if not self.exists():
+            return False
+
+        with open(os.path.join(self.path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.ids = self.openArray("ids.bin", np.int32)
+        self.sentOffsets = self.openArray("sent_offsets.bin", np.int64)
+        self.reviewOffsets = self.openArray("review_offsets.bin", np.int64)
+
+        with open(os.path.join(self.path, "vocab.bin"), "rb") as f:
+            vocabBytes = f.read()
+        vocabOffsets = self.openArray("vocab_offsets.bin", np.int64).tolist()
+        self.vocab = [
+            vocabBytes[start:end].decode("utf-8")
+            for start, end in zip(vocabOffsets[:-1], vocabOffsets[1:])
+        ]
+        return True
+
+    def __getstate__(self) -> dict:
+        # worker processes map the files themselves instead of receiving a copy
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"])
+        self.load()
+
+    def __len__(self) -> int:
+        return self.meta["reviews"]
+
+    def numSentences(self, review: int) -> int:
+        return int(self.reviewOffsets[review + 1] - self.reviewOffsets[review])
+
+    def sentenceIds(self, review: int, sent_idx: int) -> np.ndarray:
+        """
+        vocabulary ids of the tokens of a sentence
+
+        Args:
+            review (int): position of the review
+            sent_idx (int): index of the sentence in the review
+
+        Returns:
+            np.ndarray: view on the ids
+        """
+        if not 0 <= sent_idx < self.numSentences(review):
+            raise IndexError("review %d has no sentence %d" % (review, sent_idx))
+
+        sentence = self.reviewOffsets[review] + sent_idx
+        return self.ids[self.sentOffsets[sentence] : self.sentOffsets[sentence + 1]]
+
+    def sentence(self, review: int, sent_idx: int) -> list[str]:
+        return [self.vocab[i] for i in self.sentenceIds(review, sent_idx).tolist()]
+
+    def review(self, review: int) -> list[list[str]]:
+        """
+        tokens of every sentence of a review, same as the "tokens" column of the preprocessed data
+
+        Args:
+            review (int): position of the review
+
+        Returns:
+            list[list[str]]: tokens of every sentence
+        """
+        return [
+            self.sentence(review, sent_idx)
+            for sent_idx in range(self.numSentences(review))
+        ]
+
+    def iterReviews(self):
+        for review in range(len(self)):
+            yield self.review(review)
+
+    def toSeries(self) -> pd.Series:
+        return pd.Series(list(self.iterReviews()), dtype=object)
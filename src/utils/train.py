@@ -1,9 +1,7 @@
 from typing import Tuple
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, confusion_matrix
 
@@ -152,6 +150,10 @@ class Evaluator:
         Args:
             predictions (list): list containing the predicted labels for the test data
         """
+        # the plotting libraries are only imported when plots are made
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         fig, ax = plt.subplots()
         cm = confusion_matrix(self.test[1], predictions)
         conf = confusion_matrix(self.test[1], predictions).ravel()
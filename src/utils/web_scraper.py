@@ -1,33 +1,127 @@
+import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from os import replace
+from urllib.parse import urlsplit, urlunsplit
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+from .checkpoint import CheckpointStore
+from .chunked_store import (
+    ChunkedCSVWriter,
+    isChunked,
+    loadManifest,
+    truncateDataset,
+)
+from .http_cache import ResponseCache
+from .record_buffer import RecordBuffer
+from .scheduler import RequestFailedError, RequestScheduler
+
 
 class WebScraper:
     """
     Webscraper class
     """
 
-    def __init__(self, urls: list[str]):
+    def __init__(
+        self,
+        urls: list[str],
+        maxWorkers: int = 8,
+        checkpoint: CheckpointStore = None,
+        path: str = "src/data/",
+        filename: str = "data_raw.csv",
+        cache: ResponseCache = None,
+        baseUrl: str = "https://www.spieletipps.de",
+        scheduler: RequestScheduler = None,
+        chunkSize: int = None,
+    ):
+        """
+        Constructor for WebScraper class
+
+        Args:
+            urls (list[str]): urls of the games to be scraped
+            maxWorkers (int, optional): number of requests in flight when scraping concurrently. Defaults to 8.
+            checkpoint (CheckpointStore, optional): progress store, if given every scraped page is
+                appended to path + filename right away and finished games are only refreshed. Defaults to None.
+            path (str, optional): Defaults to "src/data/".
+            filename (str, optional): Defaults to "data_raw.csv".
+            cache (ResponseCache, optional): record or replay all responses. Defaults to None.
+            baseUrl (str, optional): scheme and host all requests are sent to, e.g. a ReplayServer.
+                Defaults to "https://www.spieletipps.de".
+            scheduler (RequestScheduler, optional): rate limit and retries of all requests.
+                Defaults to RequestScheduler() with 10 requests per second.
+            chunkSize (int, optional): if given, path + filename is a directory the reviews are streamed to
+                in part files of about chunkSize rows (see ChunkedCSVWriter). Defaults to None.
+        """
         self.urls = urls
-        self.data = pd.DataFrame(
-            columns=[
-                "titel",
-                "review_text_raw",
-                "Grafik",
-                "Sound",
-                "Steuerung",
-                "Atmosphäre",
-            ]
+        self.maxWorkers = maxWorkers
+        self.checkpoint = checkpoint
+        self.path = path
+        self.filename = filename
+        self.cache = cache
+        self.baseUrl = baseUrl
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+        self.chunkSize = chunkSize
+        self.sink = None
+        self.pageSize = 10
+        self.session = self.createSession()
+        self.columns = [
+            "titel",
+            "review_text_raw",
+            "Grafik",
+            "Sound",
+            "Steuerung",
+            "Atmosphäre",
+        ]
+        self.buffer = RecordBuffer(self.columns)
+
+    def createSession(self) -> requests.Session:
+        """
+        create a session that keeps up to self.maxWorkers connections alive per host
+
+        Returns:
+            requests.Session: session with a pooled HTTPAdapter mounted
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.maxWorkers, pool_maxsize=self.maxWorkers
         )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def data(self) -> pd.DataFrame:
+        return self.buffer.toDataFrame()
+
+    def reviewIdentity(self, review: dict) -> str:
+        """
+        identity of a review as returned by the API, used as high-water mark of a game
+
+        Args:
+            review (dict): single review of the API response
+
+        Returns:
+            str: id of the review or a hash of its content if there is none
+        """
+        if review.get("id") is not None:
+            return str(review["id"])
+        return hashlib.sha1(
+            (str(review["game"]) + str(review["content"])).encode("utf-8")
+        ).hexdigest()
 
     def parseResponse(self, content: dict) -> None:
-        # create a dict for every review and append the data to the dataframe
-        for i in content["response"]["data"]["data"]:
+        self.parseReviews(content["response"]["data"]["data"])
+
+    def parseReviews(self, reviews: list[dict]) -> None:
+        # create a dict for every review and append the data to the buffer
+        for i in reviews:
             reviewDict = {
                 "titel": i["game"],
                 "review_text_raw": i["content"]
@@ -40,17 +134,69 @@ class WebScraper:
                 "Steuerung": i["ratingDetail"]["score_gameplay"],
                 "Atmosphäre": i["ratingDetail"]["score_atmosphere"],
             }
-            self.data = self.data.append(reviewDict, ignore_index=True)
+            self.buffer.append(reviewDict)
+
+    def resolveUrl(self, url: str) -> str:
+        """
+        send the request to self.baseUrl instead of the host given in the url
+
+        Args:
+            url (str): url of a page
+
+        Returns:
+            str: url with scheme and host of self.baseUrl and without fragment
+        """
+        base = urlsplit(self.baseUrl)
+        parts = urlsplit(url)
+        return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, ""))
+
+    def download(
+        self, url: str, params: dict = None, validate=None
+    ) -> requests.Response:
+        return self.scheduler.get(self.session, url, params, validate)
+
+    def fetch(self, url: str, params: dict = None, validate=None):
+        """
+        GET a url through the cache if there is one, network requests go through self.scheduler
+
+        Args:
+            url (str): url of the request
+            params (dict, optional): query parameters. Defaults to None.
+            validate (callable, optional): check of the body, see RequestScheduler.get. Defaults to None.
+
+        Returns:
+            requests.Response or CachedResponse: response with 'text' and 'status_code'
+        """
+        url = self.resolveUrl(url)
+        if self.cache is not None:
+            return self.cache.get(
+                partial(self.download, validate=validate), url, params
+            )
+        return self.download(url, params, validate)
+
+    def tolerate(self, function, *args):
+        """
+        call function and return None if one of its requests failed for good
+
+        Args:
+            function (callable): e.g. self.getResponse
+            *args: arguments of the function
+        """
+        try:
+            return function(*args)
+        except RequestFailedError as e:
+            print("Skipping. %s" % e)
+            return None
 
     def getResponse(self, game_id: int, offset: int, limit: int) -> dict:
-        content_url = "https://www.spieletipps.de/gameopinion/opinion-xhr/"
+        content_url = self.baseUrl + "/gameopinion/opinion-xhr/"
         game_data = {"id": game_id, "offset": offset, "limit": limit}
 
-        content = requests.get(content_url, params=game_data)
+        content = self.fetch(content_url, params=game_data, validate=json.loads)
         return json.loads(content.text)
 
     def getGameID(self, url: str) -> int:
-        website = requests.get(url)
+        website = self.fetch(url)
         soup = BeautifulSoup(website.text, "html.parser")
 
         # find the "more" button
@@ -62,6 +208,189 @@ class WebScraper:
         else:
             return None
 
+    def probeGame(self, game_id: int) -> tuple[int, str]:
+        """
+        get the content once to find out how many total reviews there are
+
+        Args:
+            game_id (int): id of the game
+
+        Returns:
+            tuple[int, str]: number of reviews reported by the API and identity of the newest review
+        """
+        content = self.getResponse(game_id, 0, 1)
+        reviews = content["response"]["data"]["data"]
+        newest = self.reviewIdentity(reviews[0]) if reviews else None
+        return content["response"]["data"]["more"], newest
+
+    def getOffsets(self, total_num_reviews: int) -> list[int]:
+        """
+        offsets of all pages that are fetched for a game with the given number of reviews
+
+        Args:
+            total_num_reviews (int): number of reviews reported by the API
+
+        Returns:
+            list[int]: offsets in steps of self.pageSize
+        """
+        return list(
+            range(self.pageSize, total_num_reviews + self.pageSize, self.pageSize)
+        )
+
+    def planGame(self, game_id: int, total_num_reviews: int, newest: str) -> list[int]:
+        """
+        find the pages of a game that still have to be fetched
+
+        Args:
+            game_id (int): id of the game
+            total_num_reviews (int): number of reviews reported by the API
+            newest (str): identity of the newest review reported by the API
+
+        Returns:
+            list[int]: offsets of the missing pages or None if the game only needs a refresh
+        """
+        if self.checkpoint is None:
+            return self.getOffsets(total_num_reviews)
+
+        progress = self.checkpoint.get(game_id)
+        if progress is None:
+            offsets = self.getOffsets(total_num_reviews)
+            self.checkpoint.update(
+                game_id,
+                offset=0,
+                total=total_num_reviews,
+                newest=newest,
+                complete=not offsets,
+            )
+            return offsets
+
+        if progress["complete"]:
+            return None
+
+        # resume an interrupted crawl with the number of reviews it was planned with
+        return sorted(progress.get("failed", [])) + [
+            offset
+            for offset in self.getOffsets(progress["total"])
+            if offset > progress["offset"]
+        ]
+
+    def fetchNewReviews(self, game_id: int, total_num_reviews: int) -> list[dict]:
+        """
+        fetch the reviews of a finished game that are newer than its high-water mark
+
+        Args:
+            game_id (int): id of the game
+            total_num_reviews (int): number of reviews reported by the API
+
+        Returns:
+            list[dict]: new reviews, newest first
+        """
+        known = self.checkpoint.get(game_id)["newest"]
+        reviews = []
+        for offset in range(0, total_num_reviews + self.pageSize, self.pageSize):
+            content = self.getResponse(game_id, offset, self.pageSize)
+            page = content["response"]["data"]["data"]
+            if not page:
+                break
+
+            for review in page:
+                if self.reviewIdentity(review) == known:
+                    return reviews
+                reviews.append(review)
+        return reviews
+
+    def commitPage(self, game_id: int, offset: int, failed: bool = False) -> None:
+        """
+        persist a parsed page of a game together with the progress
+
+        Args:
+            game_id (int): id of the game
+            offset (int): offset of the page
+            failed (bool, optional): the page could not be fetched and is retried by the next run. Defaults to False.
+        """
+        if self.checkpoint is not None:
+            progress = self.checkpoint.get(game_id)
+            failedOffsets = [i for i in progress.get("failed", []) if i != offset]
+            if failed:
+                failedOffsets.append(offset)
+            offset = max(offset, progress["offset"])
+
+            lastOffset = self.getOffsets(progress["total"])[-1]
+            self.checkpoint.update(
+                game_id,
+                offset=offset,
+                failed=failedOffsets,
+                complete=offset == lastOffset and not failedOffsets,
+            )
+        self.flushData()
+
+    def commitRefresh(self, game_id: int, newest: str, reviews: list[dict]) -> None:
+        """
+        persist the new reviews of a finished game and move its high-water mark
+
+        Args:
+            game_id (int): id of the game
+            newest (str): identity of the newest review reported by the API
+            reviews (list[dict]): new reviews as returned by fetchNewReviews
+        """
+        self.parseReviews(reviews)
+        self.checkpoint.update(game_id, newest=newest)
+        self.flushData()
+
+    def flushData(self) -> None:
+        """
+        hand the parsed reviews to the output and save the checkpoint once they are on disk
+        """
+        if self.sink is not None:
+            if not self.sink.append(self.buffer):
+                # the reviews are still held by the sink
+                return
+        elif self.checkpoint is not None:
+            self.buffer.flush(self.path + self.filename)
+        else:
+            return
+
+        if self.checkpoint is not None:
+            self.saveCheckpoint()
+
+    def outputSize(self) -> int:
+        """
+        Returns:
+            int: bytes of the csv file or parts of the chunked dataset written so far
+        """
+        filename = self.path + self.filename
+        if self.chunkSize:
+            return len(loadManifest(filename)["parts"]) if isChunked(filename) else 0
+        return os.path.getsize(filename) if os.path.isfile(filename) else 0
+
+    def saveCheckpoint(self) -> None:
+        # the output is complete at this point, the checkpoint commits it
+        self.checkpoint.outputSize = self.outputSize()
+        self.checkpoint.save()
+
+    def restoreOutput(self) -> bool:
+        """
+        roll the output back to the size saved with the checkpoint, rows written after the
+        checkpoint was saved belong to pages that are fetched again
+
+        Returns:
+            bool: False if the output is missing rows of the checkpoint
+        """
+        committed = self.checkpoint.outputSize
+        if committed is None:
+            return True
+
+        size = self.outputSize()
+        if size < committed:
+            return False
+        if size > committed:
+            if self.chunkSize:
+                truncateDataset(self.path + self.filename, committed)
+            else:
+                with open(self.path + self.filename, "r+b") as f:
+                    f.truncate(committed)
+        return True
+
     def scrapePage(self, url: str) -> None:
         """
         Extract the Game_id from the Website link, then use the Spieletipps API to get the content
@@ -71,26 +400,130 @@ class WebScraper:
         """
 
         # if there is a more button extract the game_id
-        game_id = self.getGameID(url)
+        game_id = self.tolerate(self.getGameID, url)
         if not game_id:
             return
 
-        # get the content once to find out how many total reviews there are
-        content = self.getResponse(game_id, 0, 1)
-        total_num_reviews = content["response"]["data"]["more"]
+        probe = self.tolerate(self.probeGame, game_id)
+        if probe is None:
+            return
+
+        total_num_reviews, newest = probe
+        offsets = self.planGame(game_id, total_num_reviews, newest)
+        if offsets is None:
+            reviews = self.tolerate(self.fetchNewReviews, game_id, total_num_reviews)
+            if reviews is not None:
+                self.commitRefresh(game_id, newest, reviews)
+            return
 
         # iterate over the total reviews in steps of 10
-        offset = 0
-        while total_num_reviews - offset > 0:
-            offset += 10
-            content = self.getResponse(game_id, offset, 10)
-            self.parseResponse(content)
+        for offset in offsets:
+            content = self.tolerate(self.getResponse, game_id, offset, self.pageSize)
+            if content is not None:
+                self.parseResponse(content)
+            self.commitPage(game_id, offset, failed=content is None)
+
+    def scrapeConcurrent(self) -> None:
+        """
+        Scrape all urls with up to self.maxWorkers requests in flight. Pages of all games
+        are fetched in parallel but parsed in the same order as in the sequential mode.
+        """
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            game_ids = list(
+                tqdm(
+                    executor.map(partial(self.tolerate, self.getGameID), self.urls),
+                    total=len(self.urls),
+                    desc="Resolving Game IDs..",
+                )
+            )
+            game_ids = [game_id for game_id in game_ids if game_id]
+            probes = executor.map(partial(self.tolerate, self.probeGame), game_ids)
+
+            pages = []
+            refreshes = []
+            for game_id, probe in zip(game_ids, probes):
+                if probe is None:
+                    continue
+
+                total, newest = probe
+                offsets = self.planGame(game_id, total, newest)
+                if offsets is None:
+                    refreshes.append((game_id, total, newest))
+                    continue
+                pages.extend((game_id, offset) for offset in offsets)
+
+            newReviews = executor.map(
+                lambda game: self.tolerate(self.fetchNewReviews, game[0], game[1]),
+                refreshes,
+            )
+            for (game_id, _, newest), reviews in zip(refreshes, newReviews):
+                if reviews is not None:
+                    self.commitRefresh(game_id, newest, reviews)
+
+            # executor.map yields in submission order, so the rows stay deterministic
+            contents = executor.map(
+                lambda page: self.tolerate(
+                    self.getResponse, page[0], page[1], self.pageSize
+                ),
+                pages,
+            )
+            for (game_id, offset), content in tqdm(
+                zip(pages, contents), total=len(pages), desc="Scraping Pages.."
+            ):
+                if content is not None:
+                    self.parseResponse(content)
+                self.commitPage(game_id, offset, failed=content is None)
+
+    def startScraping(self, concurrent: bool = False):
+        """
+        Scrape all urls
+
+        Args:
+            concurrent (bool, optional): fetch several games and pages at once. Defaults to False.
+        """
+        # a new crawl must not append to the output of an older one
+        resume = self.checkpoint is not None and not self.checkpoint.isEmpty()
+        if resume and not self.restoreOutput():
+            print("The output of the checkpoint is missing, starting a new crawl.")
+            self.checkpoint.reset()
+            resume = False
+        if self.chunkSize:
+            self.sink = ChunkedCSVWriter(
+                self.path + self.filename, self.columns, self.chunkSize, append=resume
+            )
+        elif self.checkpoint is not None and not resume:
+            if os.path.isfile(self.path + self.filename):
+                os.remove(self.path + self.filename)
+
+        if concurrent:
+            self.scrapeConcurrent()
+            return
 
-    def startScraping(self):
         for url in tqdm(self.urls, desc="Scraping Urls.."):
             self.scrapePage(url)
 
-    def storeData(self, path: str = "src/data/", filename: str = "data_raw.csv"):
+    def storeData(self, path: str = None, filename: str = None):
+        """
+        store the parsed reviews, with a checkpoint the remaining reviews are appended to path + filename,
+        with a chunkSize the remaining reviews are written as last part of the dataset
+
+        Args:
+            path (str, optional): Defaults to self.path.
+            filename (str, optional): Defaults to self.filename.
+        """
+        if self.sink is not None:
+            self.sink.append(self.buffer)
+            self.sink.close()
+            if self.checkpoint is not None:
+                self.saveCheckpoint()
+            return
+
+        if self.checkpoint is not None:
+            self.flushData()
+            return
+
+        path = self.path if path is None else path
+        filename = self.filename if filename is None else filename
         self.data.to_csv(path + filename, index=False)
 
     # web_scraper.store_data() # currently not neccessary, since start_scraping already stores gathered data for each url
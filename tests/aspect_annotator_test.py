@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 import os
+import tempfile
 import unittest
 
+import pandas as pd
+
 from src.utils.aspect_annotator import AspectAnnotator
+from src.utils.token_store import TokenStoreWriter
 
 
 class AnnotatorTest(unittest.TestCase):
@@ -21,6 +25,49 @@ class AnnotatorTest(unittest.TestCase):
         self.annotator.annotate()
         self.assertTrue(self.annotator.df.iloc[0]["aspect"] == "Grafik")
 
+    def testFindAspectsApply(self):
+        self.annotator.annotate()
+        annotator = AspectAnnotator(self.path)
+        annotator.loadCSV("test_preprocessed.csv")
+        annotator.data.apply(annotator.findAspects, axis=1)
+        self.assertTrue(annotator.df.equals(self.annotator.df))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            annotator.path = tmpdir + "/"
+            annotator.saveCSV()
+            saved = pd.read_csv(annotator.path + "data_aspects_tokens.csv")
+        self.assertEqual(len(saved), len(self.annotator.df))
+        self.assertEqual(saved["aspect"].tolist(), self.annotator.df["aspect"].tolist())
+
+    def testAnnotateWorkers(self):
+        self.annotator.annotate()
+        for workers in [1, 2]:
+            annotator = AspectAnnotator(self.path, workers=workers, shardSize=1)
+            annotator.loadCSV("test_preprocessed.csv")
+            annotator.annotate()
+            self.assertTrue(annotator.df.equals(self.annotator.df))
+
+    def testAnnotateTokenStoreWorkers(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer = TokenStoreWriter(tmpdir + "/tokens/")
+            writer.addMany(self.annotator.data["tokens"].tolist() * 3)
+            writer.close()
+            pd.concat([self.annotator.data.drop(columns="tokens")] * 3).to_csv(
+                tmpdir + "/data_preprocessed.csv", index=False
+            )
+
+            results = []
+            for useIndex, workers in [(True, 1), (False, 1), (False, 2)]:
+                annotator = AspectAnnotator(
+                    tmpdir + "/", useIndex=useIndex, workers=workers, shardSize=2
+                )
+                annotator.loadCSV()
+                annotator.annotate()
+                results.append(list(annotator.df.itertuples(index=False, name=None)))
+        self.assertGreater(len(results[0]), 0)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from src.utils.chunked_store import (
+    ChunkedCSVWriter,
+    isChunked,
+    loadManifest,
+    readDataset,
+)
+from src.utils.record_buffer import RecordBuffer
+
+
+class ChunkedStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data_raw")
+        self.records = RecordBuffer(["titel", "Grafik"])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, writer: ChunkedCSVWriter, start: int, stop: int) -> int:
+        written = 0
+        for i in range(start, stop):
+            self.records.append({"titel": "game %d" % i, "Grafik": i % 6})
+            written += writer.append(self.records)
+        return written
+
+    def testChunks(self):
+        writer = ChunkedCSVWriter(self.path, self.records.columns, chunkSize=4)
+        self.assertEqual(self.write(writer, 0, 10), 8)
+        self.assertFalse(loadManifest(self.path)["complete"])
+        writer.close()
+
+        manifest = loadManifest(self.path)
+        self.assertTrue(manifest["complete"])
+        self.assertEqual([part["rows"] for part in manifest["parts"]], [4, 4, 2])
+        self.assertEqual(readDataset(self.path)["Grafik"].tolist()[-3:], [1, 2, 3])
+
+    def testAppend(self):
+        writer = ChunkedCSVWriter(self.path, self.records.columns, chunkSize=4)
+        self.write(writer, 0, 5)
+        writer.close()
+        writer = ChunkedCSVWriter(self.path, self.records.columns, 4, append=True)
+        self.write(writer, 5, 7)
+        writer.close()
+        self.assertEqual(len(readDataset(self.path)), 7)
+
+        ChunkedCSVWriter(self.path, self.records.columns).close()
+        self.assertEqual(len(readDataset(self.path)), 0)
+
+    def testSingleFile(self):
+        filename = os.path.join(self.tmpdir.name, "data_raw.csv")
+        self.records.append({"titel": "a", "Grafik": 1})
+        self.records.flush(filename)
+        self.assertFalse(isChunked(filename))
+        self.assertEqual(len(readDataset(filename)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+import spacy
+
+# the detector imports its helpers like main.py, relative to src/
+sys.path.insert(0, "src")
+
+from src.sentiment_detection import SentimentDetector  # noqa: E402
+from src.utils.aspect_annotator import AspectAnnotator  # noqa: E402
+from src.utils.doc_store import DocStore  # noqa: E402
+
+
+class DocStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name + "/"
+        self.nlp = spacy.blank("de")
+        self.reviews = [
+            ["die grafik ist schön", "der sound auch"],
+            [],
+            ["steuerung gut"],
+            ["a b", "c", "d e f"],
+            ["letzte"],
+        ]
+        DocStore(self.path + "docs/").write(
+            ([self.nlp(i) for i in review] for review in self.reviews),
+            "blank",
+            shardSize=2,
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def testLoad(self):
+        docStore = DocStore(self.path + "docs/", cachedShards=1)
+        self.assertTrue(docStore.load(self.nlp.vocab))
+        self.assertEqual(len(docStore), 5)
+        self.assertEqual(docStore.model, "blank")
+        self.assertEqual(docStore.getDoc(3, 2).text, "d e f")
+        self.assertEqual(docStore.getDoc(0, 1)[1].text, "sound")
+        self.assertEqual(len(docStore.shards), 1)
+        self.assertEqual(
+            [[doc.text for doc in review] for review in docStore.iterReviews()],
+            self.reviews,
+        )
+
+    def testMissing(self):
+        self.assertFalse(DocStore(self.path + "nodocs/").load())
+
+    def testDetectorChecksum(self):
+        detector = SentimentDetector(self.path)
+        detector.nlp = self.nlp
+        detector.modelName = "blank"
+        tokens = [[sentence.split() for sentence in review] for review in self.reviews]
+        detector.df_preprocessed = pd.DataFrame({"tokens": tokens})
+        self.assertTrue(detector.loadDocStore())
+
+        # preprocessed again with other settings, the same number of reviews and sentences
+        tokens[3][2] = ["d", "f"]
+        detector.df_preprocessed = pd.DataFrame({"tokens": tokens})
+        detector.docStore = None
+        self.assertFalse(detector.loadDocStore())
+        self.assertIsNone(detector.docStore)
+
+    def testAnnotatorTokens(self):
+        annotator = AspectAnnotator(self.path)
+        self.assertTrue(annotator.loadDocStore())
+        self.assertEqual(
+            annotator.data["tokens"][0],
+            [["die", "grafik", "ist", "schön"], ["der", "sound", "auch"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+
+import requests
+
+from benchmarks.scraper_benchmark import recordSyntheticGames
+from src.utils.http_cache import CacheMissError, ResponseCache
+from src.utils.replay_server import ReplayServer
+from src.utils.web_scraper import WebScraper
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmpdir.name, mode="replay")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def testRequestKey(self):
+        self.assertEqual(
+            self.cache.requestKey("https://a.de/x/?limit=1&id=2#meinungen"),
+            self.cache.requestKey("http://localhost:8000/x/", {"id": 2, "limit": 1}),
+        )
+        self.assertNotEqual(
+            self.cache.requestKey("/x/", {"id": 2}),
+            self.cache.requestKey("/x/", {"id": 3}),
+        )
+
+    def testStoreLookup(self):
+        first = self.cache.store("https://a.de/x/", {"id": 1}, b"body")
+        second = self.cache.store("https://a.de/y/", None, b"body")
+        self.assertEqual(first, second)
+        self.assertEqual(self.cache.lookup("/x/", {"id": 1}).text, "body")
+        self.assertIsNone(self.cache.lookup("/x/", {"id": 2}))
+
+    def testReplayMiss(self):
+        with self.assertRaises(CacheMissError):
+            self.cache.get(requests.get, "https://a.de/x/")
+        self.assertEqual(self.cache.misses, 1)
+
+
+class ReplayServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmpdir.name, mode="replay")
+        self.urls = recordSyntheticGames(self.cache, 2, 25)
+        self.server = ReplayServer(self.cache)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def testScrapeFromServer(self):
+        # the scraper starts at offset 10, so the first 10 reviews of a game are skipped
+        scraper = WebScraper(self.urls, maxWorkers=4, baseUrl=self.server.url)
+        scraper.startScraping(concurrent=True)
+        self.assertEqual(scraper.getGameID(self.urls[1]), "1")
+        self.assertEqual(len(scraper.data), 2 * (25 - 10))
+
+    def testScrapeFromCache(self):
+        scraper = WebScraper(self.urls, cache=self.cache, baseUrl="http://offline")
+        scraper.startScraping()
+        self.assertEqual(len(scraper.data), 2 * (25 - 10))
+        self.assertGreater(self.cache.hits, 0)
+
+    def testNotRecorded(self):
+        response = requests.get(self.server.url + "/game/unknown/")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
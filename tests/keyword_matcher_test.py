@@ -0,0 +1,72 @@
+import json
+import random
+import unittest
+
+from src.utils.keyword_matcher import KeywordMatcher
+
+
+def findAspectsLoop(keyWords: dict, tokens: list[list[str]]) -> list[tuple]:
+    # the loop of AspectAnnotator.findAspects before the matcher
+    rows = []
+    for aspect in keyWords:
+        for i, sent in enumerate(tokens):
+            for j, word in enumerate(sent):
+                for e in keyWords[aspect]:
+                    if e in word.lower():
+                        rows.append((word, i, j, aspect))
+    return rows
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    def setUp(self):
+        with open("src/data/aspectDict.json") as f:
+            self.keyWords = json.load(f)
+
+    def testSameRows(self):
+        tokens = [
+            ["Die", "Grafik", "und", "der", "Soundtrack"],
+            [],
+            ["Atmosphäre", "Lichtstimmung", "grafikeffekte", "Ton", "Tonne"],
+            ["soundsoundtrack", "Steuerung,", "nichts"],
+        ]
+        rows = KeywordMatcher(self.keyWords).findAspects(tokens)
+        self.assertEqual(rows, findAspectsLoop(self.keyWords, tokens))
+        self.assertEqual(rows.count(("Soundtrack", 0, 4, "Sound")), 2)
+
+    def testOverlappingKeywords(self):
+        keyWords = {
+            "A": ["he", "she", "his", "hers", "he"],
+            "B": ["ers", "s", ""],
+            "C": ["Upper", "hers"],
+        }
+        matcher = KeywordMatcher(keyWords)
+        for word in ["ushers", "HIS", "she", "", "upper", "xyz", "hehe"]:
+            self.assertEqual(
+                matcher.findAspects([[word]]), findAspectsLoop(keyWords, [[word]])
+            )
+
+    def testRandomDictionary(self):
+        rng = random.Random(0)
+        alphabet = "abcäöß"
+        keyWords = {
+            aspect: [
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                for _ in range(30)
+            ]
+            for aspect in ["A", "B", "C"]
+        }
+        tokens = [
+            [
+                "".join(rng.choice(alphabet + "ABC") for _ in range(rng.randint(0, 9)))
+                for _ in range(20)
+            ]
+            for _ in range(20)
+        ]
+        self.assertEqual(
+            KeywordMatcher(keyWords).findAspects(tokens),
+            findAspectsLoop(keyWords, tokens),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
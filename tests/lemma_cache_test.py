@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from src.utils.lemma_cache import LemmaCache
+
+
+class FakeLemmatizer:
+    def __init__(self):
+        self.calls = []
+
+    def find_lemma(self, word: str, pos: str) -> str:
+        self.calls.append((word, pos))
+        return word.rstrip("e") if pos == "ADJ" else word
+
+
+class LemmaCacheTest(unittest.TestCase):
+    def cache(self, filename: str = None, maxSize: int = 100) -> LemmaCache:
+        cache = LemmaCache(filename, maxSize)
+        cache.lemmatizer = FakeLemmatizer()
+        return cache
+
+    def testMemoryLayer(self):
+        cache = self.cache(maxSize=2)
+        self.assertEqual(cache.findLemma("gute", "ADJ"), "gut")
+        self.assertEqual(cache.findLemma("gute", "ADV"), "gute")
+        self.assertEqual(cache.findLemma("gute", "ADJ"), "gut")
+        cache.findLemma("sehr", "ADV")
+        # ("gute", "ADV") was the least recently used
+        cache.findLemma("gute", "ADV")
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        self.assertEqual(len(cache.lemmatizer.calls), 4)
+
+    def testDiskLayer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "lemmas.json")
+            cache = self.cache(filename)
+            cache.findLemma("schöne", "ADJ")
+            cache.findLemma("sehr", "ADV")
+            cache.save()
+
+            other = self.cache(filename)
+            other.findLemma("tolle", "ADJ")
+            other.save()
+
+            cache = LemmaCache(filename)
+            self.assertEqual(cache.findLemma("schöne", "ADJ"), "schön")
+            self.assertEqual(cache.findLemma("tolle", "ADJ"), "toll")
+            self.assertEqual(cache.findLemma("schöne", "ADJ"), "schön")
+            self.assertEqual((cache.hits, cache.diskHits, cache.misses), (1, 2, 0))
+            # nothing was lemmatized, so GermaLemma was never loaded
+            self.assertIsNone(cache.lemmatizer)
+            self.assertEqual(cache.hitRate(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import itertools
+import random
+import unittest
+
+import pandas as pd
+
+from src.utils.normalizer import Normalizer, specialCharacters
+from src.utils.preprocessing import Preprocessor
+
+
+class NormalizerTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        pieces = [
+            "Von Max-1  (2):",
+            "von x :",
+            "Ist diese Meinung hilfreich?",
+            "3 von 4 Lesern fanden das. Echt jetzt?",
+            "Grafik",
+            "ÄÖÜäöüß",
+            "\n",
+            "\r",
+            " ",
+            "!?.,;-",
+            "İ",
+            "42",
+        ]
+        self.texts = [
+            "".join(rng.choice(pieces) for _ in range(rng.randint(0, 10)))
+            for _ in range(300)
+        ]
+
+    def separatePasses(self, **flags) -> list[str]:
+        preprocessor = Preprocessor("./tests/data/", **flags)
+        preprocessor.data = pd.DataFrame({preprocessor.normalizeColumn: self.texts})
+        if preprocessor.rmdefault:
+            preprocessor.removeDefaultStrings()
+        if preprocessor.substituespecial:
+            preprocessor.substitueSpecial()
+        if preprocessor.rmnonalphanumeric:
+            preprocessor.rmNonAlphaNumeric()
+        if preprocessor.lower:
+            preprocessor.removeCapitalization()
+        return preprocessor.data[preprocessor.normalizeColumn].tolist()
+
+    def testSameAsSeparatePasses(self):
+        names = ["rmdefault", "substituespecial", "rmnonalphanumeric", "lower"]
+        for values in itertools.product([True, False], repeat=len(names)):
+            flags = dict(zip(names, values))
+            preprocessor = Preprocessor("./tests/data/", **flags)
+            preprocessor.data = pd.DataFrame({preprocessor.normalizeColumn: self.texts})
+            preprocessor.normalize()
+            self.assertEqual(
+                preprocessor.data[preprocessor.normalizeColumn].tolist(),
+                self.separatePasses(**flags),
+                flags,
+            )
+
+    def testSubstitution(self):
+        normalizer = Normalizer(False, specialCharacters, False, False)
+        self.assertEqual(normalizer.normalize("Größe"), "Groesse")
+        dependent = Normalizer(False, {ord("a"): "b", ord("b"): "a"}, False, False)
+        self.assertEqual(dependent.normalize("abba"), "baab")
+        deleting = Normalizer(False, {ord("a"): None, ord("b"): ord("c")}, False, False)
+        self.assertEqual(deleting.normalize("abba"), "cc")
+
+    def testStream(self):
+        normalizer = Normalizer()
+        self.assertEqual(
+            list(normalizer.normalizeStream(iter(["Die GRAFIK!", "Ton?"]))),
+            ["die grafik ", "ton "],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
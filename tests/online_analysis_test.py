@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+import json
+import sys
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+import pandas as pd
+
+# the analyzer imports its helpers like main.py, relative to src/
+sys.path.insert(0, "src")
+
+from src.online_analysis import AnalysisServer, OnlineAnalyzer  # noqa: E402
+from src.utils.keyword_matcher import KeywordMatcher  # noqa: E402
+from src.utils.normalizer import Normalizer  # noqa: E402
+from tests.sentiment_detection_test import ParsingSentimentDetector  # noqa: E402
+
+
+class FakePreprocessor:
+    def __init__(self):
+        self.normalizer = None
+
+    def compileNormalizer(self) -> Normalizer:
+        self.normalizer = Normalizer(lower=False, rmnonalphanumeric=False)
+        return self.normalizer
+
+
+class FakeOnlineAnalyzer(OnlineAnalyzer):
+    """
+    Analyzer with the fake parser of the detector tests and without nltk
+    """
+
+    def loadPreprocessor(self):
+        return FakePreprocessor()
+
+    def loadDetector(self):
+        return ParsingSentimentDetector(self.path, useDocStore=False)
+
+    def splitSentences(self, text: str) -> list[str]:
+        return [sentence for sentence in text.split(". ") if sentence]
+
+
+class FailingAnalyzer:
+    def analyze(self, text: str) -> dict:
+        raise RuntimeError("no model")
+
+
+class OnlineAnalyzerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name + "/"
+        pd.DataFrame(
+            {
+                "word": ["%%", "gut", "schlecht", "schön", "sehr", "kaum"],
+                "qualifier": ["", "POS", "NEG", "POS", "INT", "SHI"],
+                "polarity_strength": [0, 0.5, 0.7, 0.9, 2, 0],
+            }
+        ).to_csv(self.path + "sentiment_lexicon.csv", index=False)
+        self.analyzer = FakeOnlineAnalyzer(self.path)
+        self.assertTrue(self.analyzer.load())
+        self.analyzer.annotator.matcher = KeywordMatcher(
+            {"Grafik": ["grafik", "optik"], "Sound": ["sound"]}
+        )
+
+    def tearDown(self):
+        self.analyzer.close()
+        self.tmpdir.cleanup()
+
+    def testAnalyze(self):
+        result = self.analyzer.analyze(
+            "die sehr gute grafik und schlechte optik. kaum guter sound"
+        )
+        self.assertEqual(
+            [(a["aspect"], round(a["sentiment"], 6)) for a in result["aspects"]],
+            [("Grafik", 0.15), ("Sound", -0.5)],
+        )
+        # mean of the rows: gute (1.0), schlechte (-0.7) and guter (-0.5)
+        self.assertAlmostEqual(result["sentiment"], -0.2 / 3)
+
+        mentions = result["aspects"][0]["mentions"]
+        self.assertEqual([m["word_found"] for m in mentions], ["grafik", "optik"])
+        self.assertEqual(mentions[0]["sent_idx"], 0)
+        self.assertEqual(mentions[0]["word_idx"], 3)
+        self.assertEqual(mentions[0]["polarity_strength"], [1.0])
+        self.assertEqual(mentions[0]["intensifier_words"], ["sehr"])
+        self.assertEqual(mentions[1]["sentiment_words"], ["schlechte"])
+        self.assertEqual(
+            result["aspects"][1]["mentions"][0]["intensifier_words"], ["kaum"]
+        )
+
+        # the detector keeps no state of the previous review
+        self.assertEqual(
+            self.analyzer.analyze("die grafik")["aspects"],
+            [
+                {
+                    "aspect": "Grafik",
+                    "sentiment": None,
+                    "mentions": [
+                        {
+                            "word_found": "grafik",
+                            "sent_idx": 0,
+                            "word_idx": 1,
+                            "polarity_strength": [],
+                            "sentiment_words": [],
+                            "intensifier_words": [],
+                        }
+                    ],
+                }
+            ],
+        )
+        self.assertEqual(
+            self.analyzer.analyze("nichts"),
+            {"text_normalized": "nichts", "sentiment": None, "aspects": []},
+        )
+
+    def testServer(self):
+        server = AnalysisServer(self.analyzer)
+        url = server.start()
+        try:
+            with urllib.request.urlopen(url + "/health") as response:
+                self.assertEqual(json.load(response), {"status": "ok"})
+
+            request = urllib.request.Request(
+                url + "/analyze",
+                data=json.dumps({"text": "schöne grafik"}).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+            )
+            with urllib.request.urlopen(request) as response:
+                result = json.load(response)
+            self.assertEqual(result["aspects"][0]["aspect"], "Grafik")
+            self.assertAlmostEqual(result["aspects"][0]["sentiment"], 0.9)
+            self.assertEqual(
+                result["aspects"][0]["mentions"][0]["sentiment_words"], ["schöne"]
+            )
+
+            request = urllib.request.Request(url + "/analyze", data=b"{}")
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(request)
+            self.assertEqual(error.exception.code, 400)
+        finally:
+            server.stop()
+
+    def testServerError(self):
+        server = AnalysisServer(FailingAnalyzer())
+        url = server.start()
+        try:
+            request = urllib.request.Request(
+                url + "/analyze", data=json.dumps({"text": "grafik"}).encode("utf-8")
+            )
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(request)
+            self.assertEqual(error.exception.code, 500)
+            self.assertEqual(
+                json.load(error.exception), {"error": "Analysis failed: no model"}
+            )
+            error.exception.close()
+
+            with urllib.request.urlopen(url + "/health") as response:
+                self.assertEqual(json.load(response), {"status": "ok"})
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
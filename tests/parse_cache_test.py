@@ -0,0 +1,51 @@
+import unittest
+
+from src.utils.parse_cache import ParseCache
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.parsed = []
+
+    def parse(self, words: list[str]):
+        # any sized object stands in for a Doc
+        def parse():
+            self.parsed.append(words)
+            return list(words)
+
+        return parse
+
+    def testHitsAndMisses(self):
+        cache = ParseCache(maxTokens=10)
+        first = cache.get((0, 0), self.parse(["die", "grafik"]))
+        self.assertIs(cache.get((0, 0), self.parse(["die", "grafik"])), first)
+        cache.get((0, 1), self.parse(["guter", "sound"]))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(len(self.parsed), 2)
+        self.assertEqual(cache.tokens, 4)
+        self.assertAlmostEqual(cache.hitRate(), 1 / 3)
+
+    def testEvictsLeastRecentlyUsed(self):
+        cache = ParseCache(maxTokens=5)
+        cache.get("a", self.parse(["a", "a"]))
+        cache.get("b", self.parse(["b", "b"]))
+        cache.get("a", self.parse(["a", "a"]))
+        cache.get("c", self.parse(["c", "c"]))
+        self.assertEqual(list(cache.docs), ["a", "c"])
+        self.assertEqual((cache.tokens, cache.evictions), (4, 1))
+
+    def testDocLargerThanLimit(self):
+        cache = ParseCache(maxTokens=0)
+        cache.get("a", self.parse(["a"]))
+        cache.get("a", self.parse(["a"]))
+        self.assertEqual((len(cache), cache.misses, cache.hits), (0, 2, 0))
+
+    def testClear(self):
+        cache = ParseCache()
+        cache.get("a", self.parse(["a"]))
+        cache.clear()
+        self.assertEqual((len(cache), cache.tokens, cache.misses), (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
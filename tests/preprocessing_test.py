@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 import json
 import os
+import tempfile
 import unittest
 
 import pandas as pd
+import spacy
 
+from src.utils.chunked_store import ChunkedCSVWriter
 from src.utils.preprocessing import Preprocessor
+from src.utils.record_buffer import RecordBuffer
+from src.utils.token_store import TokenStore
 
 
 class PreprocessingTest(unittest.TestCase):
@@ -21,6 +26,61 @@ class PreprocessingTest(unittest.TestCase):
         tmpprep.loadCSV("test.csv")
         self.assertTrue(tmpprep.prep())
 
+    def testLoadChunked(self):
+        single = Preprocessor(self.path)
+        single.loadCSV("test.csv")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            records = RecordBuffer(pd.read_csv(self.path + "test.csv").columns.tolist())
+            writer = ChunkedCSVWriter(tmpdir + "/test", records.columns, chunkSize=1)
+            records.extend(pd.read_csv(self.path + "test.csv").to_dict("list"))
+            writer.append(records)
+            writer.close()
+
+            chunked = Preprocessor(tmpdir + "/")
+            chunked.loadCSV("test")
+        self.assertTrue(chunked.data.equals(single.data))
+
+    def testTokenizeSentences(self):
+        nlp = spacy.blank("de")
+        sentences = [["Die Grafik ist schön.", "Der Sound, naja!"], [], ["Gut"]]
+        expected = [[[t.text for t in nlp(i)] for i in x] for x in sentences]
+        for nProcess in [1, 2]:
+            tmpprep = Preprocessor(self.path, batchSize=2, nProcess=nProcess)
+            tmpprep.nlp = nlp
+            tmpprep.data = pd.DataFrame({"tokens": sentences})
+            tmpprep.tokenizeSentences()
+            self.assertEqual(tmpprep.data["tokens"].tolist(), expected)
+
+    def testPrepChunked(self):
+        for tokenStore in [False, True]:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                single = Preprocessor(tmpdir + "/single/", tokenStore=tokenStore)
+                chunked = Preprocessor(tmpdir + "/chunked/", tokenStore=tokenStore)
+                for preper in [single, chunked]:
+                    os.makedirs(preper.path)
+                    pd.read_csv(self.path + "test_raw.csv").to_csv(
+                        preper.path + "data_raw.csv", index=False
+                    )
+                single.loadCSV()
+                self.assertTrue(single.prep())
+                single.saveCSV()
+                self.assertTrue(chunked.prepChunked(chunkSize=3))
+
+                preprocessed = [
+                    pd.read_csv(i.path + "data_preprocessed.csv")
+                    for i in [single, chunked]
+                ]
+                self.assertTrue(preprocessed[0].equals(preprocessed[1]))
+                self.assertEqual("tokens" in preprocessed[0].columns, not tokenStore)
+                if not tokenStore:
+                    continue
+
+                tokens = [TokenStore(i.path + "tokens/") for i in [single, chunked]]
+                self.assertTrue(all(store.load() for store in tokens))
+                self.assertEqual(
+                    list(tokens[0].iterReviews()), list(tokens[1].iterReviews())
+                )
+
     def testPrepNoStopwordRemoval(self):
         tmpprep = Preprocessor(self.path, rmstopwords=False)
         tmpprep.loadCSV("test.csv")
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.utils.record_buffer import RaggedBuffer, RecordBuffer
+
+
+class RecordBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.buffer = RecordBuffer(["titel", "Grafik"])
+        self.buffer.append({"titel": "a", "Grafik": 1})
+        self.buffer.extend({"titel": ["b", "c"], "Grafik": [2, 3]})
+
+    def testToDataFrame(self):
+        df = self.buffer.toDataFrame()
+        self.assertEqual(len(self.buffer), 3)
+        self.assertEqual(df.columns.tolist(), ["titel", "Grafik"])
+        self.assertEqual(df["Grafik"].tolist(), [1, 2, 3])
+
+    def testFlush(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "out.csv")
+            self.assertEqual(self.buffer.flush(filename), 3)
+            self.assertEqual(len(self.buffer), 0)
+            self.buffer.append({"titel": "d", "Grafik": 4})
+            self.buffer.flush(filename)
+            self.assertEqual(pd.read_csv(filename)["titel"].tolist(), list("abcd"))
+
+
+class RaggedBufferTest(unittest.TestCase):
+    def testOffsets(self):
+        buffer = RaggedBuffer(4, ["words", "scores"])
+        buffer.add("words", 2, "gut")
+        buffer.add("words", 0, "sehr")
+        buffer.add("words", 2, "toll")
+        buffer.add("words", 0, "schön")
+        values, offsets = buffer.offsets("words")
+        self.assertEqual(values, ["sehr", "schön", "gut", "toll"])
+        self.assertEqual(offsets.tolist(), [0, 2, 2, 4, 4])
+        values, offsets = buffer.offsets("scores")
+        self.assertEqual((values, offsets.tolist()), ([], [0, 0, 0, 0, 0]))
+
+    def testFormatColumn(self):
+        buffer = RaggedBuffer(3, ["scores"])
+        buffer.add("scores", 1, 0.5)
+        buffer.add("scores", 1, 1)
+        self.assertEqual(buffer.formatColumn("scores", str), ["[]", "[0.5, 1]", "[]"])
+        self.assertEqual(buffer.formatColumn("scores", len), [0, 2, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
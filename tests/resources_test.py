@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+import nltk
+import spacy
+
+from src.utils.resources import ResourceError, ResourceManager
+
+
+class ResourceManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name + "/resources/"
+        self.source = self.tmpdir.name + "/source/"
+        os.makedirs(self.source)
+        self.resources = ResourceManager(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def testLexicon(self):
+        with open(self.source + "lexicon.csv", "w") as f:
+            f.write("word,qualifier\ngut,POS\n")
+        self.resources.register("lexicon/lexicon.csv", self.source + "lexicon.csv")
+
+        # a copied directory has new mtimes, the files are hashed again
+        os.utime(self.path + "lexicon/lexicon.csv", ns=(0, 0))
+        resources = ResourceManager(self.path)
+        self.assertEqual(
+            resources.lexiconPath("lexicon.csv"), self.path + "lexicon/lexicon.csv"
+        )
+        self.assertIn("lexicon/lexicon.csv", resources.timings)
+
+        with open(self.path + "lexicon/lexicon.csv", "w") as f:
+            f.write("word,qualifier\nbad,POS\n")
+        with self.assertRaises(ResourceError):
+            ResourceManager(self.path).lexiconPath("lexicon.csv")
+
+    def testVerifyKeepsManifest(self):
+        with open(self.source + "lexicon.csv", "w") as f:
+            f.write("word,qualifier\ngut,POS\n")
+        self.resources.register("lexicon/lexicon.csv", self.source + "lexicon.csv")
+        with open(self.path + "manifest.json") as f:
+            manifest = f.read()
+
+        os.utime(self.path + "lexicon/lexicon.csv", ns=(0, 0))
+        resources = ResourceManager(self.path)
+        resources.verifyAsset("lexicon/lexicon.csv")
+        with open(self.path + "manifest.json") as f:
+            self.assertEqual(f.read(), manifest)
+        # single file assets have the file name ""
+        verified = ResourceManager(self.path).verified["lexicon/lexicon.csv"]
+        self.assertEqual(verified[""]["mtime"], 0)
+
+        # same size and mtime, only a full verification hashes the file
+        with open(self.path + "lexicon/lexicon.csv", "w") as f:
+            f.write("word,qualifier\nbad,POS\n")
+        os.utime(self.path + "lexicon/lexicon.csv", ns=(0, 0))
+        resources = ResourceManager(self.path)
+        resources.verifyAsset("lexicon/lexicon.csv")
+        with self.assertRaises(ResourceError):
+            resources.verifyAsset("lexicon/lexicon.csv", full=True)
+
+    @unittest.skipIf(os.geteuid() == 0, "root can write to read-only directories")
+    def testReadOnly(self):
+        with open(self.source + "lexicon.csv", "w") as f:
+            f.write("word,qualifier\ngut,POS\n")
+        self.resources.register("lexicon/lexicon.csv", self.source + "lexicon.csv")
+        os.utime(self.path + "lexicon/lexicon.csv", ns=(0, 0))
+
+        os.chmod(self.path, 0o555)
+        try:
+            ResourceManager(self.path).verifyAsset("lexicon/lexicon.csv")
+        finally:
+            os.chmod(self.path, 0o755)
+        self.assertFalse(os.path.exists(self.path + "verified.json"))
+
+    def testMissing(self):
+        with self.assertRaises(ResourceError):
+            self.resources.lexiconPath("lexicon.csv")
+        with self.assertRaises(ResourceError):
+            self.resources.loadSpacyModel("de_core_news_lg")
+
+    def testSpacyModel(self):
+        spacy.blank("de").to_disk(self.source + "blank_de")
+        self.resources.register("spacy/blank_de", self.source + "blank_de")
+
+        nlp = ResourceManager(self.path).loadSpacyModel("blank_de")
+        self.assertEqual([t.text for t in nlp("Die Grafik ist gut.")][-1], ".")
+
+        os.remove(self.path + "spacy/blank_de/config.cfg")
+        with self.assertRaises(ResourceError):
+            ResourceManager(self.path).loadSpacyModel("blank_de")
+
+    def testNltk(self):
+        os.makedirs(self.path + "nltk/tokenizers/punkt/")
+        with open(self.path + "nltk/tokenizers/punkt/german.pickle", "wb") as f:
+            f.write(b"punkt")
+        self.resources.register("nltk/tokenizers/punkt")
+
+        path = ResourceManager(self.path).loadNltk("punkt")
+        self.assertIn(path, nltk.data.path)
+        nltk.data.path.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
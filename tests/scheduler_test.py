@@ -0,0 +1,106 @@
+import json
+import time
+import unittest
+
+import requests
+
+from src.utils.scheduler import (
+    HostLimiter,
+    RequestFailedError,
+    RequestScheduler,
+    TokenBucket,
+)
+from src.utils.web_scraper import WebScraper
+
+
+def createResponse(status_code: int, content: bytes = b"{}") -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+class FakeSession:
+    """
+    Session answering with a fixed list of responses or exceptions
+    """
+
+    def __init__(self, responses: list):
+        self.responses = responses
+        self.calls = 0
+
+    def get(self, url: str, params: dict = None, timeout: float = None):
+        response = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = RequestScheduler(rate=None, maxRetries=3, backoffBase=0.001)
+
+    def testRetryServerError(self):
+        session = FakeSession(
+            [createResponse(503), requests.ConnectionError(), createResponse(200)]
+        )
+        response = self.scheduler.get(session, "https://a.de/x/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.scheduler.stats["requests"], 3)
+        self.assertEqual(self.scheduler.stats["retries"], 2)
+
+    def testRetryInvalidBody(self):
+        session = FakeSession([createResponse(200, b"<html>"), createResponse(200)])
+        self.scheduler.get(session, "https://a.de/x/", validate=json.loads)
+        self.assertEqual(session.calls, 2)
+
+    def testFailure(self):
+        session = FakeSession([createResponse(429)])
+        with self.assertRaises(RequestFailedError):
+            self.scheduler.get(session, "https://a.de/x/")
+        self.assertEqual(session.calls, 4)
+        self.assertEqual(self.scheduler.stats["throttled"], 4)
+        self.assertEqual(self.scheduler.stats["failures"], 1)
+
+    def testNotFoundIsNotRetried(self):
+        session = FakeSession([createResponse(404, b"<html>")])
+        with self.assertRaises(RequestFailedError):
+            self.scheduler.get(session, "https://a.de/x/", validate=json.loads)
+        self.assertEqual(session.calls, 1)
+        self.assertEqual(self.scheduler.stats["failures"], 1)
+
+    def testNotFoundPageIsSkipped(self):
+        scraper = WebScraper([], scheduler=self.scheduler)
+        scraper.session = FakeSession([createResponse(404, b"<html>")])
+        self.assertIsNone(scraper.tolerate(scraper.getResponse, 1, 0, 10))
+
+    def testBackoff(self):
+        for attempt in range(10):
+            delay = self.scheduler.backoff(attempt)
+            self.assertTrue(0 <= delay <= min(30.0, 0.001 * 2**attempt))
+        self.assertEqual(self.scheduler.backoff(0, "5"), 5.0)
+
+
+class LimiterTest(unittest.TestCase):
+    def testTokenBucket(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def testHostLimiter(self):
+        limiter = HostLimiter(initial=4, maximum=8, targetLatency=1.0)
+        limiter.acquire()
+        limiter.release(0.1, False)
+        self.assertEqual(limiter.limit, 2)
+        for _ in range(20):
+            limiter.acquire()
+            limiter.release(0.1, True)
+        self.assertGreater(limiter.limit, 4)
+        self.assertLessEqual(limiter.limit, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
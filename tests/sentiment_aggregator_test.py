@@ -0,0 +1,32 @@
+import math
+import unittest
+
+from src.utils.sentiment_aggregator import SentimentAggregator
+
+
+class SentimentAggregatorTest(unittest.TestCase):
+    def testRunningMeans(self):
+        aggregator = SentimentAggregator()
+        aggregator.add(1, "Sound", 0.5)
+        self.assertEqual(aggregator.reviewSentiment(1), 0.5)
+        aggregator.add(1, "Grafik", math.nan)
+        aggregator.add(1, "Grafik", -1.0)
+        aggregator.add(0, "Grafik", math.nan)
+
+        self.assertEqual(len(aggregator), 2)
+        self.assertEqual(aggregator.reviewSentiment(1), -0.25)
+        self.assertEqual(aggregator.aspectSentiment(1, "Grafik"), -1.0)
+        self.assertTrue(math.isnan(aggregator.reviewSentiment(0)))
+        self.assertTrue(math.isnan(aggregator.reviewSentiment(7)))
+
+        reviews = aggregator.reviewFrame()
+        self.assertEqual(reviews["review_number"].tolist(), [0, 1])
+        aspects = aggregator.aspectFrame()
+        self.assertEqual(
+            list(zip(aspects["review_number"], aspects["aspect"])),
+            [(0, "Grafik"), (1, "Grafik"), (1, "Sound")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+import spacy
+from spacy.language import Language
+
+# the detector imports its helpers like main.py, relative to src/
+sys.path.insert(0, "src")
+
+from src.sentiment_detection import SentimentDetector  # noqa: E402
+from src.utils.aspect_annotator import AspectAnnotator  # noqa: E402
+
+
+class FakeSentimentDetector(SentimentDetector):
+    """
+    Detector with a blank model and a deterministic result for every row
+    """
+
+    def loadSpacyModel(self, model="de_core_news_lg", disableList=[]) -> bool:
+        self.modelName = model
+        self.nlp = spacy.blank("de")
+        return True
+
+    def detectSentiment(self, rowDF: pd.Series) -> None:
+        doc = self.getSentenceDoc(rowDF["reviewnumber"], rowDF["sent_idx"])
+        self.results.add("polarity_strength", rowDF.name, rowDF["word_idx"] / 10)
+        self.results.add("sentiment_words", rowDF.name, doc[rowDF["word_idx"]].text)
+
+
+@Language.component("fake_parser")
+def fakeParser(doc):
+    # adjectives and adverbs depend on the next word, a stand-in for the parser of the model
+    for token in doc:
+        if token.text in ["sehr", "kaum"]:
+            token.pos_, token.tag_ = "ADV", "ADV"
+        elif token.text.startswith(("gut", "schlecht", "schön")):
+            token.pos_, token.tag_ = "ADJ", "ADJA"
+        else:
+            token.pos_, token.tag_ = "NOUN", "NN"
+    for token in doc:
+        if token.pos_ in ["ADJ", "ADV"] and token.i + 1 < len(doc):
+            token.head, token.dep_ = doc[token.i + 1], "nk"
+        else:
+            token.dep_ = "ROOT"
+    return doc
+
+
+class ParsingSentimentDetector(SentimentDetector):
+    def loadSpacyModel(self, model="de_core_news_lg", disableList=[]) -> bool:
+        self.modelName = model
+        self.nlp = spacy.blank("de")
+        self.nlp.add_pipe("fake_parser")
+        return True
+
+
+class BatchedDetectionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name + "/"
+        tokens = [
+            [["die", "sehr", "gute", "grafik", "und", "schlechte", "optik"]],
+            [["schöne", "grafik"], ["kaum", "guter", "sound", "grafik"]],
+            [["nichts"]],
+        ]
+        pd.DataFrame(
+            {
+                "text_normalized": ["a", "b", "c"],
+                "Grafik": [4, 2, 3],
+                "Sound": [5, 1, 3],
+                "tokens": [json.dumps(i) for i in tokens],
+            }
+        ).to_csv(self.path + "data_preprocessed.csv", index=False)
+        pd.DataFrame(
+            {
+                "word": ["%%", "gut", "schlecht", "schön", "sehr", "kaum"],
+                "qualifier": ["", "POS", "NEG", "POS", "INT", "SHI"],
+                "polarity_strength": [0, 0.5, 0.7, 0.9, 2, 0],
+            }
+        ).to_csv(self.path + "sentiment_lexicon.csv", index=False)
+        annotator = AspectAnnotator(self.path)
+        annotator.keyWords = {"Grafik": ["grafik", "optik"], "Sound": ["sound"]}
+        annotator.loadCSV()
+        annotator.annotate()
+        annotator.saveCSV()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def detect(self, **kwargs) -> pd.DataFrame:
+        detector = ParsingSentimentDetector(self.path, useDocStore=False, **kwargs)
+        self.assertTrue(detector.run())
+        return detector.df_aspect_tokens
+
+    def testBatchedMatchesSequential(self):
+        expected = self.detect()
+        self.assertEqual(
+            expected["sentiment_words"].tolist(),
+            ['["gute"]', '["schlechte"]', '["sch\\u00f6ne"]', "[]", '["guter"]'],
+        )
+        self.assertEqual(expected["polarity_strength"][0], "[1.0]")
+        self.assertEqual(expected["intensifier_words"][4], "['kaum']")
+        for kwargs in [
+            {"aggregate": True},
+            {"batchSize": 2},
+            {"batchSize": 2, "blockRows": 2},
+            {"batchSize": 2, "nProcess": 2},
+        ]:
+            self.assertTrue(expected.equals(self.detect(**kwargs)), kwargs)
+
+    def testAggregation(self):
+        detector = ParsingSentimentDetector(self.path, useDocStore=False)
+        detector.run()
+        streaming = ParsingSentimentDetector(
+            self.path, useDocStore=False, aggregate=True, batchSize=2
+        )
+        streaming.run()
+
+        reviews = detector.returnSentimentsforReviews()
+        self.assertEqual(
+            reviews.columns.tolist(), ["review_number", "sentiment", "review_text"]
+        )
+        self.assertEqual(reviews["review_number"].tolist(), [0, 1])
+        self.assertEqual(reviews["review_text"].tolist(), ["a", "b"])
+        # review 0: gute (1.0) and schlechte (-0.7), review 1: schöne (0.9) and guter (-0.5)
+        self.assertEqual(reviews["sentiment"].round(6).tolist(), [0.15, 0.2])
+        pd.testing.assert_frame_equal(reviews, streaming.returnSentimentsforReviews())
+
+        aspects = detector.returnSentimentsforAspects()
+        self.assertEqual(
+            list(zip(aspects["review_number"], aspects["aspect"])),
+            [(0, "Grafik"), (1, "Grafik"), (1, "Sound")],
+        )
+        self.assertEqual(aspects["sentiment"].round(6).tolist(), [0.15, 0.9, -0.5])
+        pd.testing.assert_frame_equal(aspects, streaming.returnSentimentsforAspects())
+
+    def testRepeatedRun(self):
+        detector = ParsingSentimentDetector(
+            self.path, useDocStore=False, aggregate=True
+        )
+        detector.run()
+        # a second run only counts its own rows, here the rows of review 1
+        detector.df_aspect_tokens = detector.df_aspect_tokens.iloc[2:].reset_index(
+            drop=True
+        )
+        detector.detectRows()
+
+        reviews = detector.returnSentimentsforReviews()
+        self.assertEqual(reviews["review_number"].tolist(), [1])
+        self.assertEqual(reviews["sentiment"].round(6).tolist(), [0.2])
+        self.assertEqual(detector.aggregator.reviews, {1: [0.4, 2]})
+        self.assertEqual(len(detector.returnSentimentsforAspects()), 2)
+
+    def testRowSentiments(self):
+        detector = SentimentDetector(useDocStore=False)
+        df = pd.DataFrame(
+            {"polarity_strength": ["[0.5, -1.5]", "[]", "[1]", "[]"]},
+            index=[4, 3, 2, 1],
+        )
+        sentiments = detector.rowSentiments(df).tolist()
+        self.assertEqual(sentiments[0::2], [-0.5, 1.0])
+        self.assertTrue(all(pd.isna(sentiments[1::2])))
+
+
+class ParseCacheTest(unittest.TestCase):
+    def testSentenceParsedOnce(self):
+        detector = FakeSentimentDetector(useDocStore=False)
+        detector.loadSpacyModel()
+        detector.df_preprocessed = pd.DataFrame(
+            {"tokens": [[["die", "grafik", "und", "der", "sound"], ["gut"]]]}
+        )
+        detector.df_aspect_tokens = detector.prepareAspectRows(
+            pd.DataFrame(
+                {
+                    "reviewnumber": [0, 0, 0],
+                    "word_found": ["grafik", "sound", "gut"],
+                    "sent_idx": [0, 0, 1],
+                    "word_idx": [1, 4, 0],
+                    "aspect": ["Grafik", "Sound", "Grafik"],
+                }
+            )
+        )
+        detector.df_preprocessed["Grafik"] = 4
+        detector.df_preprocessed["Sound"] = 2
+        detector.detectRows()
+
+        self.assertEqual(
+            detector.df_aspect_tokens["sentiment_words"].tolist(),
+            ['["grafik"]', '["sound"]', '["gut"]'],
+        )
+        self.assertEqual((detector.parseCache.misses, detector.parseCache.hits), (2, 1))
+
+
+class TrueLabelTest(unittest.TestCase):
+    def testAttachTrueLabels(self):
+        detector = SentimentDetector(useDocStore=False)
+        detector.df_preprocessed = pd.DataFrame(
+            {"titel": ["a", "b", "c"], "Grafik": [4, 2, 3], "Sound": [5.0, 1.5, 3.0]},
+            index=[10, 11, 12],
+        )
+        detector.df_aspect_tokens = pd.DataFrame(
+            {
+                "reviewnumber": [2, 0, 0, 2, 1],
+                "aspect": ["Sound", "Grafik", "Grafik", "Grafik", "Sound"],
+            }
+        )
+        detector.attachTrueLabels()
+        self.assertEqual(
+            detector.df_aspect_tokens["true_label"].tolist(), [3.0, 4, 4, 3, 1.5]
+        )
+        self.assertEqual(detector.df_aspect_tokens["aspect"].tolist()[0], "Sound")
+
+
+class DeltaTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name + "/"
+        tokens = [
+            [["die", "grafik", "und", "optik"], ["der", "soundtrack", "ton"]],
+            [["steuerung", "gut"], ["die", "stimmung", "tonal", "grafik"]],
+            [["nichts"]],
+        ]
+        pd.DataFrame(
+            {
+                "text_normalized": ["a", "b", "c"],
+                "Grafik": [4, 2, 3],
+                "Sound": [5, 1, 3],
+                "Steuerung": [3, 3, 3],
+                "Atmosphäre": [1, 2, 3],
+                "tokens": [json.dumps(i) for i in tokens],
+            }
+        ).to_csv(self.path + "data_preprocessed.csv", index=False)
+        pd.DataFrame(
+            {
+                "word": ["%%", "gut"],
+                "qualifier": ["", "POS"],
+                "polarity_strength": [0, 1],
+            }
+        ).to_csv(self.path + "sentiment_lexicon.csv", index=False)
+
+        self.old = {
+            "Grafik": ["grafik", "optik"],
+            "Sound": ["sound"],
+            "Atmosphäre": ["stimmung"],
+        }
+        self.new = {
+            "Grafik": ["grafik"],
+            "Sound": ["sound", "ton", "soundtrack"],
+            "Steuerung": ["steuerung"],
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def writeCorpus(self, tokens: list) -> None:
+        pd.DataFrame(
+            {
+                "text_normalized": ["a"] * len(tokens),
+                "Grafik": [3] * len(tokens),
+                "tokens": [json.dumps(i) for i in tokens],
+            }
+        ).to_csv(self.path + "data_preprocessed.csv", index=False)
+
+    def annotator(self, keyWords: dict) -> AspectAnnotator:
+        annotator = AspectAnnotator(self.path)
+        annotator.keyWords = keyWords
+        annotator.loadCSV()
+        return annotator
+
+    def detect(self):
+        detector = FakeSentimentDetector(self.path, useDocStore=False)
+        self.assertTrue(detector.runDelta())
+        detector.saveCSV()
+
+    def testDeltaMatchesFullRun(self):
+        self.assertFalse(self.annotator(self.old).annotateDelta())
+        self.detect()
+        self.assertFalse(os.path.exists(self.path + "data_aspects_delta.csv"))
+
+        before = pd.read_csv(self.path + "data_aspects_tokens.csv")
+        self.assertTrue(self.annotator(self.new).annotateDelta())
+        self.assertTrue(
+            before.equals(pd.read_csv(self.path + "data_aspects_tokens.csv"))
+        )
+        delta = pd.read_csv(self.path + "data_aspects_delta.csv")
+        self.assertEqual(
+            sorted(delta[delta["change"] == "removed"]["aspect"]),
+            ["Atmosphäre", "Grafik"],
+        )
+        self.detect()
+        self.assertFalse(os.path.exists(self.path + "data_aspects_delta.csv"))
+
+        annotator = self.annotator(self.new)
+        annotator.annotate()
+        annotator.saveCSV("data_aspects_full.csv")
+        detector = FakeSentimentDetector(self.path, useDocStore=False)
+        detector.loadCSVs("data_aspects_full.csv")
+        detector.run()
+        detector.saveCSV("data_aspects_full.csv")
+
+        self.assertTrue(
+            pd.read_csv(self.path + "data_aspects_full.csv").equals(
+                pd.read_csv(self.path + "data_aspects_tokens.csv")
+            )
+        )
+
+    def testChangedCorpus(self):
+        keyWords = {"Grafik": ["grafik"]}
+        self.writeCorpus([[["grafik"]]])
+        self.assertFalse(self.annotator(keyWords).annotateDelta())
+        self.detect()
+
+        # e.g. a new scrape, the old rows point at the wrong reviews
+        self.writeCorpus([[["nix"]], [["die", "grafik"]], [["grafik"]]])
+        self.assertFalse(self.annotator(keyWords).annotateDelta())
+        self.assertFalse(os.path.exists(self.path + "data_aspects_delta.csv"))
+        self.detect()
+        rows = pd.read_csv(self.path + "data_aspects_tokens.csv")
+        self.assertEqual(
+            list(
+                rows[["reviewnumber", "word_found", "sent_idx", "word_idx"]].itertuples(
+                    index=False, name=None
+                )
+            ),
+            [(1, "grafik", 0, 1), (2, "grafik", 0, 0)],
+        )
+
+        # the same corpus again only needs a delta
+        self.assertTrue(self.annotator({"Grafik": ["grafik", "nix"]}).annotateDelta())
+
+    def testFullRunBetweenDeltas(self):
+        self.annotator(self.old).annotateDelta()
+        self.detect()
+        # a delta the detector never applied
+        self.assertTrue(self.annotator(self.new).annotateDelta())
+
+        self.annotator(self.old).annotateFull()
+        self.assertFalse(os.path.exists(self.path + "data_aspects_delta.csv"))
+        detector = FakeSentimentDetector(self.path, useDocStore=False)
+        self.assertTrue(detector.run())
+        detector.saveCSV()
+        before = pd.read_csv(self.path + "data_aspects_tokens.csv")
+
+        # the keywords didn't change since the full run, there is nothing to apply
+        self.assertTrue(self.annotator(self.old).annotateDelta())
+        self.assertTrue(pd.read_csv(self.path + "data_aspects_delta.csv").empty)
+        self.detect()
+        self.assertTrue(
+            before.equals(pd.read_csv(self.path + "data_aspects_tokens.csv"))
+        )
+
+    def testDeltasAddUp(self):
+        self.annotator(self.old).annotateDelta()
+        self.detect()
+        self.annotator(self.new).annotateDelta()
+        self.annotator(self.old).annotateDelta()
+        before = pd.read_csv(self.path + "data_aspects_tokens.csv")
+        self.detect()
+        self.assertTrue(
+            before.equals(pd.read_csv(self.path + "data_aspects_tokens.csv"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
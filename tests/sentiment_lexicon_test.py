@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.utils.sentiment_lexicon import LexiconEntry, SentimentLexicon
+
+
+class SentimentLexiconTest(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                "word": ["gut", "schlecht", "sehr", "nicht", "toll", "toll", "toll"]
+                + ["kaum", "kaum", "neutral", "neutral"],
+                "qualifier": ["POS", "NEG", "INT", "SHI", "INT", "NEG", "NEG"]
+                + ["NEU", "SHI", "NEU", "INT"],
+                "polarity_strength": [0.5, 0.7, 2, 0, 1.5, 0.3, 0.9] + [0.1, 0, 0.2, 3],
+            }
+        )
+
+    def testCompile(self):
+        lexicon = SentimentLexicon.fromDataFrame(self.df)
+        self.assertEqual(len(lexicon), 7)
+        self.assertEqual(lexicon.get("gut"), LexiconEntry(0.5, None, False))
+        self.assertEqual(lexicon.get("schlecht"), LexiconEntry(-0.7, None, False))
+        # a single row gives its polarity whatever the qualifier
+        self.assertEqual(lexicon.get("sehr"), LexiconEntry(2.0, 2.0, False))
+        self.assertEqual(lexicon.get("nicht"), LexiconEntry(0.0, -1.0, True))
+        # several rows: the first POS/NEG row and the first INT/SHI row, duplicates dropped
+        self.assertEqual(lexicon.get("toll"), LexiconEntry(-0.3, 1.5, False))
+        self.assertEqual(lexicon.get("kaum"), LexiconEntry(0.0, -1.0, True))
+        self.assertEqual(lexicon.get("neutral"), LexiconEntry(0.0, 3.0, False))
+        self.assertIsNone(lexicon.get("Gut"))
+
+    def testCache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csvFilename = os.path.join(tmpdir, "lexicon.csv")
+            cacheFilename = os.path.join(tmpdir, "lexicon.compiled.json")
+            self.df.to_csv(csvFilename, index=False)
+
+            compiled = SentimentLexicon.load(csvFilename, cacheFilename)
+            self.assertTrue(os.path.exists(cacheFilename))
+            cached = SentimentLexicon.load(csvFilename, cacheFilename)
+            self.assertEqual(cached.entries, compiled.entries)
+
+            # a changed lexicon is compiled again
+            self.df.loc[0, "polarity_strength"] = 0.25
+            self.df.to_csv(csvFilename, index=False)
+            os.utime(csvFilename, ns=(0, 0))
+            self.assertEqual(
+                SentimentLexicon.load(csvFilename, cacheFilename).get("gut").polarity,
+                0.25,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import json
+import subprocess
+import sys
+import unittest
+
+IMPORTED = """
+import json, sys
+sys.path.insert(0, "src")
+import %s
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+class StartupTest(unittest.TestCase):
+    def importedModules(self, module: str) -> set:
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORTED % module],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return set(json.loads(output))
+
+    def testMainIsLazy(self):
+        modules = self.importedModules("main")
+        for heavy in ["spacy", "sklearn", "matplotlib", "bs4", "pandas"]:
+            self.assertNotIn(heavy, modules)
+
+    def testAnnotatorWithoutSpacy(self):
+        self.assertNotIn("spacy", self.importedModules("utils.aspect_annotator"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import random
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.utils.aspect_annotator import AspectAnnotator
+from src.utils.token_index import TokenIndex
+from src.utils.token_store import TokenStore, TokenStoreWriter
+
+
+def annotateLoop(keyWords: dict, reviews: list) -> list[tuple]:
+    # the loop of AspectAnnotator.findAspects over every review
+    rows = []
+    for reviewnumber, tokens in enumerate(reviews):
+        for aspect in keyWords:
+            for i, sent in enumerate(tokens):
+                for j, word in enumerate(sent):
+                    for e in keyWords[aspect]:
+                        if e in word.lower():
+                            rows.append((reviewnumber, word, i, j, aspect))
+    return rows
+
+
+class TokenIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name + "/"
+        with open("src/data/aspectDict.json") as f:
+            self.keyWords = json.load(f)
+        self.reviews = [
+            [["Die", "Grafik", "ist", "schön"], ["Soundtrack", "und", "Steuerung"]],
+            [],
+            [["steuerung", "Steuerungen", "gut"], [], ["grafik"]],
+            [["Bedienung", "Musik", "soundsoundtrack"]],
+        ]
+        self.store = self.writeStore(self.reviews)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def writeStore(self, reviews: list) -> TokenStore:
+        writer = TokenStoreWriter(self.path + "tokens/")
+        writer.addMany(reviews)
+        writer.close()
+        store = TokenStore(self.path + "tokens/")
+        store.load()
+        return store
+
+    def testAnnotate(self):
+        index = TokenIndex.build(self.store, self.path + "token_index/")
+        self.assertEqual(
+            list(index.annotate(self.keyWords).itertuples(index=False, name=None)),
+            annotateLoop(self.keyWords, self.reviews),
+        )
+
+    def testAnnotateRandom(self):
+        rng = random.Random(0)
+        vocabulary = ["".join(rng.choice("abcAB") for _ in range(4)) for _ in range(50)]
+        reviews = [
+            [rng.choices(vocabulary, k=rng.randint(0, 6)) for _ in range(3)]
+            for _ in range(40)
+        ]
+        keyWords = {"X": ["ab", "a", "ab"], "Y": ["bb", "ca"], "Z": ["b"]}
+        index = TokenIndex.build(self.writeStore(reviews), self.path + "token_index/")
+        self.assertEqual(
+            list(index.annotate(keyWords).itertuples(index=False, name=None)),
+            annotateLoop(keyWords, reviews),
+        )
+
+    def testQuery(self):
+        index = TokenIndex.build(self.store, self.path + "token_index/")
+        result = index.query("steuerung*")
+        self.assertEqual(
+            list(result.itertuples(index=False, name=None)),
+            [
+                (0, 1, 2, "Steuerung"),
+                (2, 0, 0, "steuerung"),
+                (2, 0, 1, "Steuerungen"),
+            ],
+        )
+        self.assertEqual(index.query("grafik")["reviewnumber"].tolist(), [0, 2])
+        self.assertEqual(
+            index.query("*track")["word"].tolist(), ["Soundtrack", "soundsoundtrack"]
+        )
+        self.assertEqual(len(index.query("*ton*")), 0)
+        self.assertEqual(len(index.query("*")), 14)
+
+    def testOutdated(self):
+        TokenIndex.build(self.store, self.path + "token_index/")
+        self.assertTrue(TokenIndex(self.path + "token_index/").load(self.store))
+        store = self.writeStore(self.reviews[:2])
+        self.assertFalse(TokenIndex(self.path + "token_index/").load(store))
+
+    def testOutdatedSameSizes(self):
+        TokenIndex.build(self.store, self.path + "token_index/")
+        # a corpus with the same number of reviews, sentences, tokens and words
+        reviews = [self.reviews[2], [], self.reviews[0], self.reviews[3]]
+        store = self.writeStore(reviews)
+        self.assertEqual(
+            {
+                key: store.meta[key]
+                for key in ["reviews", "sentences", "tokens", "vocab"]
+            },
+            {
+                key: self.store.meta[key]
+                for key in ["reviews", "sentences", "tokens", "vocab"]
+            },
+        )
+        self.assertFalse(TokenIndex(self.path + "token_index/").load(store))
+
+    def testAnnotator(self):
+        pd.DataFrame({"review_text_raw": ["a"] * 4}).to_csv(
+            self.path + "data_preprocessed.csv", index=False
+        )
+        annotator = AspectAnnotator(self.path)
+        annotator.loadCSV()
+        annotator.annotate()
+        self.assertEqual(
+            list(annotator.df.itertuples(index=False, name=None)),
+            annotateLoop(annotator.keyWords, self.reviews),
+        )
+        self.assertTrue(TokenIndex(self.path + "token_index/").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import multiprocessing
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.utils.aspect_annotator import AspectAnnotator
+from src.utils.token_store import TokenStore, TokenStoreWriter
+
+
+def readReview(args):
+    store, review = args
+    return store.review(review)
+
+
+class TokenStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name + "/"
+        self.reviews = [
+            [["die", "grafik", "ist", "schön"], ["der", "sound", "auch"]],
+            [],
+            [["steuerung", "gut"], []],
+            [["größe", "ß", "die"]],
+        ]
+        writer = TokenStoreWriter(self.path + "tokens/", bufferSize=3)
+        writer.addMany(self.reviews)
+        writer.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def testRoundTrip(self):
+        store = TokenStore(self.path + "tokens/")
+        self.assertTrue(store.load())
+        self.assertEqual(len(store), 4)
+        self.assertEqual(list(store.iterReviews()), self.reviews)
+        self.assertEqual(store.sentence(3, 0), ["größe", "ß", "die"])
+        self.assertEqual(store.meta["vocab"], 11)
+        self.assertIsInstance(store.ids, np.memmap)
+        with self.assertRaises(IndexError):
+            store.sentence(1, 0)
+
+    def testChecksum(self):
+        store = TokenStore(self.path + "tokens/")
+        store.load()
+        # the checksum only depends on the content, not on how it was buffered
+        writer = TokenStoreWriter(self.path + "unbuffered/")
+        writer.addMany(self.reviews)
+        writer.close()
+        unbuffered = TokenStore(self.path + "unbuffered/")
+        unbuffered.load()
+        self.assertEqual(store.meta, unbuffered.meta)
+
+        writer = TokenStoreWriter(self.path + "other/")
+        writer.addMany(self.reviews[::-1])
+        writer.close()
+        other = TokenStore(self.path + "other/")
+        other.load()
+        self.assertNotEqual(store.meta["checksum"], other.meta["checksum"])
+
+    def testMissing(self):
+        self.assertFalse(TokenStore(self.path + "notokens/").load())
+
+    def testIncompleteIsMissing(self):
+        writer = TokenStoreWriter(self.path + "tokens/")
+        writer.add(self.reviews[0])
+        writer.flush()
+        self.assertFalse(TokenStore(self.path + "tokens/").load())
+
+    def testWorkers(self):
+        store = TokenStore(self.path + "tokens/")
+        store.load()
+        self.assertEqual(pickle.loads(pickle.dumps(store)).review(0), self.reviews[0])
+        with multiprocessing.Pool(2) as pool:
+            reviews = pool.map(readReview, [(store, i) for i in range(len(store))])
+        self.assertEqual(reviews, self.reviews)
+
+    def testAnnotatorTokens(self):
+        pd.DataFrame({"review_text_raw": ["a"] * 4}).to_csv(
+            self.path + "data_preprocessed.csv", index=False
+        )
+        annotator = AspectAnnotator(self.path)
+        annotator.loadCSV()
+        self.assertEqual(len(annotator.data), len(annotator.tokenStore))
+        self.assertEqual(annotator.tokenStore.review(2), self.reviews[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
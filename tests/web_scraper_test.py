@@ -1,13 +1,29 @@
 import os
+import tempfile
 import unittest
 
+import pandas as pd
+
+from benchmarks.scraper_parse_benchmark import syntheticPage
+from src.utils.checkpoint import CheckpointStore
+from src.utils.chunked_store import loadManifest, readDataset
+from src.utils.http_cache import ResponseCache
+from src.utils.scheduler import RequestFailedError
 from src.utils.web_scraper import WebScraper
 
 
 class WebScraperTest(unittest.TestCase):
     def setUp(self) -> None:
-        self.WebScraper = WebScraper(["https://www.spieletipps.de/game/dishonored/"])
+        # the game page and the first opinion pages, with the reviews of tests/data/test_raw.csv
+        self.WebScraper = WebScraper(
+            ["https://www.spieletipps.de/game/dishonored/"],
+            cache=ResponseCache("tests/data/http_cache/", mode="replay"),
+        )
         self.gameid = self.WebScraper.getGameID(self.WebScraper.urls[0])
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
 
     def testGetGameID(self):
         self.assertTrue(self.gameid == "107281")
@@ -24,5 +40,198 @@ class WebScraperTest(unittest.TestCase):
     def testStoreData(self):
         response = self.WebScraper.getResponse(self.gameid, 0, 10)
         self.WebScraper.parseResponse(response)
-        self.WebScraper.storeData("tests/data/", "test_raw.csv")
-        self.assertTrue(os.path.exists("tests/data/test_raw.csv"))
+        self.WebScraper.storeData(self.tmpdir.name + "/", "test_raw.csv")
+        stored = pd.read_csv(self.tmpdir.name + "/test_raw.csv")
+        expected = pd.read_csv("tests/data/test_raw.csv")
+        # the text of test_raw.csv was scraped before line breaks were replaced
+        columns = ["titel", "Grafik", "Sound", "Steuerung", "Atmosphäre"]
+        self.assertTrue(stored[columns].equals(expected[columns]))
+
+
+class OfflineParseTest(unittest.TestCase):
+    def testParseResponse(self):
+        scraper = WebScraper([])
+        scraper.parseResponse(syntheticPage(0))
+        scraper.parseResponse(syntheticPage(10, 5))
+        self.assertEqual(len(scraper.data), 15)
+        self.assertEqual(scraper.data["Grafik"].tolist()[:3], [0, 1, 2])
+        self.assertNotIn("<br />", scraper.data["review_text_raw"][0])
+
+
+class FakeWebScraper(WebScraper):
+    """
+    WebScraper serving generated reviews, records the order in which reviews are parsed
+    """
+
+    def __init__(self, urls: list[str], maxWorkers: int = 4, **kwargs):
+        super().__init__(urls, maxWorkers, **kwargs)
+        self.reviews = {}
+        self.failAt = None
+        self.failError = ConnectionError
+        self.parsed = []
+
+    def getGameID(self, url: str) -> int:
+        return None if url.endswith("nomore/") else url.rstrip("/").split("/")[-1]
+
+    def getResponse(self, game_id: int, offset: int, limit: int) -> dict:
+        if (game_id, offset) == self.failAt:
+            raise self.failError("connection lost")
+
+        reviews = self.reviews.setdefault(
+            game_id, ["%s-%d" % (game_id, i) for i in range(25 + len(game_id))]
+        )
+        page = [
+            {
+                "id": review,
+                "game": game_id,
+                "content": "review %s" % review,
+                "ratingDetail": {
+                    "score_graphics": 1,
+                    "score_sound": 2,
+                    "score_gameplay": 3,
+                    "score_atmosphere": 4,
+                },
+            }
+            for review in reviews[offset : offset + limit]
+        ]
+        return {"response": {"data": {"more": len(reviews), "data": page}}}
+
+    def parseReviews(self, reviews: list[dict]) -> None:
+        self.parsed.extend(self.reviewIdentity(review) for review in reviews)
+        super().parseReviews(reviews)
+
+
+class ConcurrentScrapingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.urls = [
+            "https://x/game/a/",
+            "https://x/game/nomore/",
+            "https://x/game/bb/",
+        ]
+
+    def testGetOffsets(self):
+        scraper = WebScraper([])
+        self.assertEqual(scraper.getOffsets(25), [10, 20, 30])
+        self.assertEqual(scraper.getOffsets(20), [10, 20])
+        self.assertEqual(scraper.getOffsets(0), [])
+
+    def testConcurrentMatchesSequential(self):
+        sequential = FakeWebScraper(self.urls)
+        sequential.startScraping()
+        concurrent = FakeWebScraper(self.urls, maxWorkers=3)
+        concurrent.startScraping(concurrent=True)
+        self.assertEqual(len(sequential.parsed), 26 - 10 + 27 - 10)
+        self.assertEqual(sequential.parsed, concurrent.parsed)
+
+
+class CrashingCheckpointStore(CheckpointStore):
+    """
+    CheckpointStore failing on a given save, after the output of the page was written
+    """
+
+    def __init__(self, filename: str, failAt: int):
+        super().__init__(filename)
+        self.saves = 0
+        self.failAt = failAt
+
+    def save(self) -> None:
+        self.saves += 1
+        if self.saves == self.failAt:
+            raise ConnectionError("killed")
+        super().save()
+
+
+class CheckpointScrapingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.urls = ["https://x/game/a/", "https://x/game/bb/"]
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name + "/"
+        self.full = FakeWebScraper(self.urls)
+        self.full.startScraping()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def createScraper(self, chunkSize: int = None) -> FakeWebScraper:
+        checkpoint = CheckpointStore(self.path + "checkpoint.json")
+        return FakeWebScraper(
+            self.urls, checkpoint=checkpoint, path=self.path, chunkSize=chunkSize
+        )
+
+    def testResume(self):
+        crashed = self.createScraper()
+        crashed.failAt = ("bb", 20)
+        with self.assertRaises(ConnectionError):
+            crashed.startScraping()
+
+        resumed = self.createScraper()
+        resumed.startScraping(concurrent=True)
+        resumed.storeData()
+        self.assertEqual(crashed.parsed + resumed.parsed, self.full.parsed)
+        self.assertTrue(resumed.checkpoint.get("bb")["complete"])
+        self.assertTrue(pd.read_csv(self.path + "data_raw.csv").equals(self.full.data))
+
+    def testResumeChunked(self):
+        crashed = self.createScraper(chunkSize=7)
+        crashed.failAt = ("bb", 20)
+        with self.assertRaises(ConnectionError):
+            crashed.startScraping()
+
+        resumed = self.createScraper(chunkSize=7)
+        resumed.startScraping()
+        resumed.storeData()
+        manifest = loadManifest(self.path + "data_raw.csv")
+        self.assertTrue(manifest["complete"])
+        self.assertTrue(all(part["rows"] >= 7 for part in manifest["parts"][:-1]))
+        self.assertTrue(readDataset(self.path + "data_raw.csv").equals(self.full.data))
+
+    def testCrashBeforeCheckpoint(self):
+        for chunkSize in [None, 7]:
+            crashed = self.createScraper(chunkSize)
+            crashed.checkpoint = CrashingCheckpointStore(
+                self.path + "checkpoint.json", failAt=3
+            )
+            with self.assertRaises(ConnectionError):
+                crashed.startScraping()
+
+            resumed = self.createScraper(chunkSize)
+            resumed.startScraping()
+            resumed.storeData()
+            self.assertTrue(
+                readDataset(self.path + "data_raw.csv").equals(self.full.data),
+                chunkSize,
+            )
+            os.remove(self.path + "checkpoint.json")
+            if chunkSize is None:
+                os.remove(self.path + "data_raw.csv")
+
+    def testMissingOutput(self):
+        self.createScraper().startScraping()
+        os.remove(self.path + "data_raw.csv")
+
+        rescraped = self.createScraper()
+        rescraped.startScraping()
+        self.assertEqual(rescraped.parsed, self.full.parsed)
+        self.assertTrue(pd.read_csv(self.path + "data_raw.csv").equals(self.full.data))
+
+    def testFailedPage(self):
+        first = self.createScraper()
+        first.failAt = ("a", 10)
+        first.failError = RequestFailedError
+        first.startScraping()
+        self.assertEqual(first.checkpoint.get("a")["failed"], [10])
+        self.assertFalse(first.checkpoint.get("a")["complete"])
+
+        second = self.createScraper()
+        second.startScraping()
+        self.assertEqual(second.parsed, ["a-%d" % i for i in range(10, 20)])
+        self.assertTrue(second.checkpoint.get("a")["complete"])
+
+    def testRefresh(self):
+        self.createScraper().startScraping()
+
+        refreshed = self.createScraper()
+        refreshed.reviews["a"] = ["a-new-1", "a-new-0"] + self.full.reviews["a"]
+        refreshed.startScraping()
+        self.assertEqual(refreshed.parsed, ["a-new-1", "a-new-0"])
+        self.assertEqual(refreshed.checkpoint.get("a")["newest"], "a-new-1")